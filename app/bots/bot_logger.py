@@ -12,43 +12,142 @@
 # Reason strings are ore — they record intent at call time, not baked-in purpose.
 # Higher-order bots pass log_call=False to constituents — log once at top level.
 # See terms file for reason vocabulary conventions.
+#
+# Timing lines (Phase 2 input) come from the @timed wrapper, one per call:
+#   {"ts": "...", "fn": "...", "result": "ok|error", "duration_ms": 3.2, "result_size": 14}
+# result_size is the item count: len() of a list, or of the list values in a dict result.
+#
+# Writes are off the calling thread: call()/error()/timed enqueue a record
+# (QueueHandler) and one background QueueListener thread hands each record to
+# _BatchFileHandler, which buffers them and JSON-encodes, writes and rotates up
+# to BOT_LOG_BATCH records at a time, at most BOT_LOG_FLUSH_SECONDS after the
+# first one — a line reaches disk within that delay, and the queue and buffer
+# are drained at interpreter exit.
 
 import json
+import time
+import queue
+import atexit
 import logging
+import functools
+import threading
 import os
-from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 # Log file location — relative to project root
 BOT_LOG_PATH = os.path.join('app', 'logs', 'bot_calls.log')
 BOT_LOG_MAX_BYTES = 1_000_000   # 1MB per file
 BOT_LOG_BACKUP_COUNT = 5        # keep 5 rotated files
+BOT_LOG_BATCH = 256             # records per write
+BOT_LOG_FLUSH_SECONDS = float(os.environ.get('BOT_LOG_FLUSH_SECONDS', 0.5))
 
 _logger = None
+_listener = None
+_init_lock = threading.Lock()  # first calls may race from several request threads
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """The entry dict rides on the record — encoded here, on the writer thread."""
+
+    def format(self, record):
+        entry = {'ts': datetime.fromtimestamp(record.created, timezone.utc)
+                                .replace(tzinfo=None).isoformat() + 'Z'}
+        entry.update(record.entry)
+        return json.dumps(entry)
+
+
+class _BatchFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that buffers records and writes each batch with one
+    write + flush: at BOT_LOG_BATCH records, or BOT_LOG_FLUSH_SECONDS after
+    the first record of the batch (a timer), whichever comes first.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buffer = []
+        self._timer = None
+
+    def emit(self, record):
+        # Handler.handle holds self.lock
+        self._buffer.append(record)
+        if len(self._buffer) >= BOT_LOG_BATCH:
+            self._write_buffer()
+        elif self._timer is None:
+            self._timer = threading.Timer(BOT_LOG_FLUSH_SECONDS, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self.lock:
+            self._write_buffer()
+            super().flush()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+    def _write_buffer(self):
+        # caller holds self.lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        records, self._buffer = self._buffer, []
+        if not records:
+            return
+        try:
+            text = ''.join(self.format(r) + self.terminator for r in records)
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() + len(text) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(text)
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[0])
 
 
 def _get_logger():
     global _logger
     if _logger is not None:
         return _logger
+    with _init_lock:
+        if _logger is None:
+            _logger = _build_logger()
+    return _logger
 
+
+def _build_logger():
+    global _listener
     os.makedirs(os.path.dirname(BOT_LOG_PATH), exist_ok=True)
 
-    _logger = logging.getLogger('bot_calls')
-    _logger.setLevel(logging.INFO)
+    logger = logging.getLogger('bot_calls')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
     # Avoid duplicate handlers if module is reloaded
-    if not _logger.handlers:
-        handler = RotatingFileHandler(
+    if not logger.handlers:
+        writer = _BatchFileHandler(
             BOT_LOG_PATH,
             maxBytes=BOT_LOG_MAX_BYTES,
             backupCount=BOT_LOG_BACKUP_COUNT,
             encoding='utf-8'
         )
-        handler.setFormatter(logging.Formatter('%(message)s'))
-        _logger.addHandler(handler)
+        writer.setFormatter(_JsonLineFormatter())
 
-    return _logger
+        records = queue.SimpleQueue()
+        _listener = QueueListener(records, writer)
+        _listener.start()
+        atexit.register(writer.flush)      # runs after stop() — atexit is last-in, first-out
+        atexit.register(_listener.stop)
+        logger.addHandler(QueueHandler(records))
+
+    return logger
+
+
+def _emit(entry: dict):
+    _get_logger().info('', extra={'entry': entry})
 
 
 def call(fn_id: str, reason: str = '', result: str = 'ok', detail: str = '', persona: str=""):
@@ -62,7 +161,6 @@ def call(fn_id: str, reason: str = '', result: str = 'ok', detail: str = '', per
         detail:  optional extra context (error message, count, etc.)
     """
     entry = {
-        'ts':     datetime.utcnow().isoformat() + 'Z',
         'fn':     fn_id,
         'reason': reason,
         'result': result,
@@ -72,9 +170,45 @@ def call(fn_id: str, reason: str = '', result: str = 'ok', detail: str = '', per
     if persona and persona != "unknown":
         entry['persona'] = persona
 
-    _get_logger().info(json.dumps(entry))
+    _emit(entry)
 
 
 def error(fn_id: str, reason: str = '', detail: str = ''):
     """Convenience wrapper for logging a bot error."""
     call(fn_id, reason=reason, result='error', detail=detail)
+
+
+def _result_size(value):
+    if isinstance(value, dict):
+        sized = [len(v) for v in value.values() if isinstance(v, (list, tuple))]
+        return sum(sized) if sized else len(value)
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def timed(fn_id: str):
+    """
+    Decorator: log duration_ms and result_size for every call of a bot function.
+    A raised exception or a {'error': ...} result logs result='error'.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'error'
+            value = None
+            try:
+                value = func(*args, **kwargs)
+                outcome = 'error' if isinstance(value, dict) and 'error' in value else 'ok'
+                return value
+            finally:
+                _emit({
+                    'fn':          fn_id,
+                    'result':      outcome,
+                    'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+                    'result_size': _result_size(value),
+                })
+        return wrapper
+    return decorate
@@ -10,7 +10,8 @@ import json
 from datetime import datetime
 from pathlib import Path
 from app.bots import bot_logger as log
-from app.services.neo4j_service import get_session
+from app.services.neo4j_service import get_session, bump_bot_registry_version
+from app.services.bot_dispatch import bot_table
 
 # ── Capability declaration ────────────────────────────────────────────────────
 REQUIRES = {'neo4j', 'filesystem'}
@@ -25,7 +26,7 @@ def register_bots(session=None, reason: str = "", log_call: bool = True) -> dict
     Called by: Rex
     Use case: Scan app/bots/ directory tree and sync BotFunction nodes to graph
     Library ID: rex.admin.register_bots
-    Returns: {registered: int, updated: int, errors: list}
+    Returns: {registered: int, updated: int, errors: list, registry_version: str}
     
     Walks app/bots/ directory, parses bot files, and creates/updates
     (:BotFunction) nodes with metadata extracted from code and docstrings.
@@ -74,6 +75,7 @@ def register_bots(session=None, reason: str = "", log_call: bool = True) -> dict
                                 b.use_case = $use_case,
                                 b.params = $params,
                                 b.returns = $returns,
+                                b.read_only = $read_only,
                                 b.registered = datetime()
                             RETURN b, 
                                    CASE WHEN b.registered IS NULL THEN 'created' ELSE 'updated' END AS action
@@ -89,10 +91,15 @@ def register_bots(session=None, reason: str = "", log_call: bool = True) -> dict
                 except Exception as e:
                     errors.append(f"{filepath.name}: {str(e)}")
         
+        # Tell every dispatch table its copy of the registry is stale
+        version = bump_bot_registry_version(session)
+        bot_table.invalidate()
+        
         return {
             'registered': registered,
             'updated': updated,
-            'errors': errors
+            'errors': errors,
+            'registry_version': version
         }
     
     except Exception as e:
@@ -171,12 +178,19 @@ def _parse_bot_file(filepath: Path, bots_dir: Path) -> list[dict]:
             requires_content = requires_match.group(1)
             # Extract quoted strings
             requires = re.findall(r'["\']([^"\']+)["\']', requires_content)
+
+        # READ_ONLY set of bot-ids — anything not listed is treated as a write
+        read_only = []
+        read_only_match = re.search(r'READ_ONLY\s*=\s*\{([^}]+)\}', content)
+        if read_only_match:
+            read_only = re.findall(r'["\']([^"\']+)["\']', read_only_match.group(1))
         
         bots.append({
             'bot_id': bot_id,
             'module': module,
             'function': function_name,
             'requires': requires,
+            'read_only': bot_id in read_only,
             'use_case': use_case,
             'params': params,
             'returns': returns_str
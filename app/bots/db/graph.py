@@ -25,7 +25,7 @@ Planned (see Feature nodes):
 """
 
 from app.bots import bot_logger as log
-from app.services.neo4j_service import get_session
+from app.services.neo4j_service import get_session, COPY_RELS, MASTER_LABEL, TOMBSTONE_LABEL
 
 REQUIRES = {'neo4j'}
 
@@ -117,6 +117,15 @@ def create_relationship(
     if properties:
         params['rel_props'] = properties
 
+    # a FileNode that becomes a copy is no longer a master (see neo4j_service MASTER_LABEL):
+    # its top-level export record is tombstoned and the new master is re-exported with it
+    demote_clause = f"""
+        SET target.updated_at = timestamp()
+        FOREACH (id IN CASE WHEN source:{MASTER_LABEL} THEN [source.`FILE-NODE-id`] ELSE [] END |
+            MERGE (t:{TOMBSTONE_LABEL} {{`FILE-NODE-id`: id}}) SET t.deleted_at = timestamp())
+        REMOVE source:{MASTER_LABEL}
+    """ if rel_type in COPY_RELS.split('|') else ""
+
     cypher = f"""
         MATCH (source:{source_label})
         WHERE {source_conditions}
@@ -124,6 +133,7 @@ def create_relationship(
         WHERE {target_conditions}
         MERGE (source)-[r:{rel_type}]->(target)
         {prop_clause}
+        {demote_clause}
         RETURN
             '{source_label}'   AS source_label,
             '{target_label}'   AS target_label,
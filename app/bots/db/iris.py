@@ -4,6 +4,7 @@ import string
 from app.bots import bot_logger as log
 
 REQUIRES = set()  # No external dependencies for token measurement
+READ_ONLY = {'iris.analytics.measure.tokens'}
 
 # ── iris.analytics.measure.tokens ─────────────────────────────────────────────
 
@@ -5,6 +5,15 @@ from app.services.neo4j_service import get_session
 from app.shared.datetime_utils import to_neo4j as parse_timestamp, to_python as parse_to_datetime
 
 REQUIRES = {'neo4j'}
+# bot-ids that only read — /bots/execute_batch runs them in a read transaction
+READ_ONLY = {
+    'vera.todos.get_pending',
+    'vera.todos.get_friction_items',
+    'vera.filenodes.get_unreviewed',
+    'vera.r2hodo.get_unsubmitted',
+    'vera.ideas.get_pending',
+    'vera.todos.get',
+}
 
 def _serialize_record(record: dict) -> dict:
     """Convert Neo4j temporal objects to JSON-serializable strings."""
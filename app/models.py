@@ -2,24 +2,61 @@ from neo4j import GraphDatabase as db4j
 from enum import Enum
 # from .schema_handlers import 
 # , basicFN_mockup
-from flask import current_app as app
+from flask import current_app as app, g, has_app_context
+import time
 import atexit
+import threading
 
 
 ####
 # Models + Neo4j client combined. This file exposes `neo4j` which should be
 # initialized by calling `neo4j.init_app(app)` inside the application factory.
 
+class _AcquireStats:
+    """Wait time spent in the driver pool's acquire(), across all sessions."""
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self.count    = 0
+        self.failed   = 0
+        self.total_ms = 0.0
+        self.max_ms   = 0.0
+
+    def record(self, elapsed_ms, ok=True):
+        with self._lock:
+            self.count    += 1
+            self.failed   += 0 if ok else 1
+            self.total_ms += elapsed_ms
+            self.max_ms    = max(self.max_ms, elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'acquired':    self.count - self.failed,
+                'failed':      self.failed,
+                'avg_wait_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+                'max_wait_ms': round(self.max_ms, 3),
+            }
+
+
 class Neo4jClient:
     """Singleton-ish Neo4j client with init_app lifecycle.
 
     Provides convenience methods used by existing code: `driver`, `query`,
     `get_driver`, `get_session`, and `close`. Call `init_app(app)` from
     `create_app()` to initialize the driver with app config.
+
+    Pool settings come from Config (NEO4J_MAX_POOL_SIZE,
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT, NEO4J_LIVENESS_CHECK_TIMEOUT,
+    NEO4J_FETCH_SIZE). `request_session()` hands out one session per Flask
+    request; `execute_read` / `execute_write` run managed, retried
+    transactions on it. `query` stays auto-commit unless managed= is given. `pool_metrics()` reports connection use.
     """
     def __init__(self):
         self.driver = None
         self.current_schema = None
+        self.fetch_size = 1000
+        self.max_pool_size = None
+        self._acquire_stats = _AcquireStats()
 
     def init_app(self, app):
         # DEBUG print(f"INIT_APP: Called on instance {id(self)}")
@@ -28,34 +65,138 @@ class Neo4jClient:
             # DEBUG print(f"INIT_APP: Driver already exists, returning early")
             return
         
+        self.fetch_size = app.config.get('NEO4J_FETCH_SIZE', 1000)
+        self.max_pool_size = app.config.get('NEO4J_MAX_POOL_SIZE', 100)
         self.driver = db4j.driver(
             app.config['NEO4J_URI'],
-            auth=(app.config['NEO4J_USER'], app.config['NEO4J_PASSWORD'])
+            auth=(app.config['NEO4J_USER'], app.config['NEO4J_PASSWORD']),
+            max_connection_pool_size=self.max_pool_size,
+            connection_acquisition_timeout=app.config.get('NEO4J_CONNECTION_ACQUISITION_TIMEOUT', 60),
+            liveness_check_timeout=app.config.get('NEO4J_LIVENESS_CHECK_TIMEOUT'),
         )
+        self._instrument_pool()
         # DEBUG print(f"INIT_APP: Driver created: {self.driver}")
         # DEBUG print(f"INIT_APP: Instance after init: {id(self)}, driver: {self.driver}")
 
-        # @app.teardown_appcontext
-        # def _close(exc):
-        #     self.close()
+        # request-scoped session is closed with the app context; the driver lives on
+        app.teardown_appcontext(self._close_request_session)
 
         atexit.register(lambda: self.close())
 
-    def query(self, cypher_query, parameters=None, return_result=True):
-        with self.driver.session() as session:
-            result = session.run(cypher_query, parameters)
-            if return_result:
-                return [record for record in result]
+    def query(self, cypher_query, parameters=None, return_result=True, managed=None):
+        """
+        Run one statement. Auto-commit by default, so schema statements and
+        CALL {} IN TRANSACTIONS work. managed='read' / 'write' runs it in a
+        managed transaction instead (routed, retried on transient errors).
+        """
+        if managed is None:
+            with self.get_session() as session:
+                result = session.run(cypher_query, parameters)
+                return [record for record in result] if return_result else None
+
+        def work(tx):
+            result = tx.run(cypher_query, parameters)
+            return [record for record in result] if return_result else None
+        if managed == 'read':
+            return self.execute_read(work)
+        if managed == 'write':
+            return self.execute_write(work)
+        raise ValueError(f"managed must be None, 'read' or 'write': {managed!r}")
 
     @classmethod
     def get_driver(cls):
         inst = cls.get_instance()
         return inst.driver
 
-    def get_session(self):
+    def get_session(self, **config):
         # DEBUG print(f"GET_SESSION: Called on instance {id(self)}")
         # DEBUG print(f"GET_SESSION: Driver value: {self.driver}")
-        return self.driver.session()
+        config.setdefault('fetch_size', self.fetch_size)
+        return self.driver.session(**config)
+
+    # ── Request scope ──────────────────────────────────────────────────────────
+    # One session per Flask request (app context), opened on first use and
+    # closed in teardown. Callers must not close it themselves.
+
+    def request_session(self):
+        if not has_app_context():
+            raise RuntimeError("request_session() needs an app context — use get_session()")
+        session = g.get('_neo4j_session')
+        if session is None or session.closed():
+            session = g._neo4j_session = self.get_session()
+        return session
+
+    def _close_request_session(self, exc=None):
+        session = g.pop('_neo4j_session', None)
+        if session is not None:
+            session.close()
+
+    def execute_read(self, work, *args, **kwargs):
+        """Managed read transaction — routed to a reader in a cluster."""
+        if has_app_context():
+            return self.request_session().execute_read(work, *args, **kwargs)
+        with self.get_session() as session:
+            return session.execute_read(work, *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        """Managed write transaction — routed to the leader in a cluster."""
+        if has_app_context():
+            return self.request_session().execute_write(work, *args, **kwargs)
+        with self.get_session() as session:
+            return session.execute_write(work, *args, **kwargs)
+
+    # ── Pool metrics ───────────────────────────────────────────────────────────
+    # The driver has no public pool API; counts are read from driver._pool and
+    # acquire() is wrapped to time the wait. Both are optional: if the driver
+    # internals change, the counts report None and pool_internals False.
+
+    def _instrument_pool(self):
+        pool = getattr(self.driver, '_pool', None)
+        acquire = getattr(pool, 'acquire', None)
+        if acquire is None:
+            return
+        stats = self._acquire_stats
+
+        def timed_acquire(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                connection = acquire(*args, **kwargs)
+            except Exception:
+                stats.record((time.perf_counter() - start) * 1000, ok=False)
+                raise
+            stats.record((time.perf_counter() - start) * 1000)
+            return connection
+
+        pool.acquire = timed_acquire
+
+    def pool_metrics(self):
+        """In-use / idle connections per server plus acquisition wait times."""
+        metrics = {'max_pool_size': self.max_pool_size, 'servers': None,
+                   'in_use': None, 'idle': None, 'pool_internals': False}
+        metrics.update(self._acquire_stats.snapshot())
+        pool = getattr(self.driver, '_pool', None)
+        lock = getattr(pool, 'lock', None)
+        connections = getattr(pool, 'connections', None)
+        reservations = getattr(pool, 'connections_reservations', {})
+        if lock is None or not isinstance(connections, dict):
+            return metrics
+        try:
+            with lock:
+                servers = {}
+                for address, conns in list(connections.items()):
+                    in_use = sum(1 for c in conns if getattr(c, 'in_use', False))
+                    servers[str(address)] = {
+                        'in_use':   in_use,
+                        'idle':     len(conns) - in_use,
+                        'opening':  reservations.get(address, 0),
+                    }
+        except Exception:
+            return metrics   # private API changed shape — report only the public numbers
+        metrics['pool_internals'] = True
+        metrics['servers'] = servers
+        metrics['in_use'] = sum(s['in_use'] for s in servers.values())
+        metrics['idle'] = sum(s['idle'] for s in servers.values())
+        return metrics
     
     def close(self):
         if self.driver:
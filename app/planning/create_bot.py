@@ -28,7 +28,7 @@ from datetime import datetime
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.services.neo4j_service import get_session
+from app.services.neo4j_service import get_session, bump_bot_registry_version
 
 def parse_param(param_str: str) -> dict:
     """Parse parameter string: name:type:required/optional"""
@@ -111,6 +111,9 @@ def create_bot_node(bot_id: str, module: str, description: str, params_schema: d
         """, bot_id=bot_id, module=module, function=function_name,
              description=description, params=json.dumps(params_schema))
         
+        # running bridges and dispatch tables refresh on the version change
+        bump_bot_registry_version(session)
+
         print(f"✓ Created BotFunction node: {bot_id}")
         return True
     except Exception as e:
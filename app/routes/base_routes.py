@@ -17,6 +17,12 @@ def ping():
         'server_time': neo4j_time
     })
 
+@base_bp.route('/neo4j/pool', methods=['GET'])
+def neo4j_pool():
+    """Driver pool usage — in-use / idle connections and acquisition wait."""
+    from app.models import neo4j
+    return jsonify(neo4j.pool_metrics())
+
 @base_bp.route('/bots/register', methods=['POST'])
 def register_bots():
     """Register all bots in app/bots/ directory to graph."""
@@ -1,5 +1,5 @@
-import importlib
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, make_response
+from app.services.neo4j_service import get_bot_registry_version
 from app.bots.db.vera import (
     get_pending_todos,
     get_friction_todos,
@@ -9,15 +9,42 @@ from app.bots.db.vera import (
     update_todo
 )
 from app.bots.db.rex import load_bot_registry
-from app.services.neo4j_service import get_session
+from app.services.bot_dispatch import (
+    bot_table,
+    execute_batch,
+    BotNotFound,
+    BotResolveError,
+    BATCH_MAX_CALLS,
+)
 
 bots_bp = Blueprint('bots', __name__)
 
+def _registry_etag(version: str) -> str:
+    """Unquoted entity tag — set_etag() adds the quotes, if_none_match stores tags without them."""
+    return f"bots-{version}"
+
+@bots_bp.route('/bots/registry/version', methods=['GET'])
+def bot_registry_version():
+    """Registry version only — bridges poll this to decide whether /bots/list changed."""
+    version = get_bot_registry_version()
+    response = jsonify({"version": version})
+    response.set_etag(_registry_etag(version))
+    return response
+
 @bots_bp.route('/bots/list', methods=['GET'])
 def list_bots():
     """List all registered bots - routes through bot execution for logging."""
+    version = get_bot_registry_version()
+    etag = _registry_etag(version)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
     result = load_bot_registry(reason="Tool initialization - registry_query")
-    return jsonify(result)
+    result['version'] = version
+    response = jsonify(result)
+    response.set_etag(etag)
+    return response
         
 @bots_bp.route('/bots/vera/todos/pending', methods=['POST'])
 def vera_todos_pending():
@@ -82,35 +109,42 @@ def execute_bot():
     if not bot_id:
         return jsonify({"error": "bot_id required"}), 400
     
-    # Query Neo4j for bot metadata
-    with get_session() as session:
-        result = session.run("""
-            MATCH (b:BotFunction {`bot-id`: $bot_id})
-            RETURN b.module AS module, b.function AS function
-        """, bot_id=bot_id)
-        record = result.single()
-        
-        if not record:
-            return jsonify({"error": f"Bot not found: {bot_id}"}), 404
-        
-        module_path = record['module']
-        function_name = record['function']
-    
-    if not module_path or not function_name:
-        return jsonify({"error": f"Bot {bot_id} missing module or function metadata"}), 500
+    # Resolve through the in-process dispatch table — no graph round trip on a hit
+    try:
+        func = bot_table.resolve(bot_id)
+    except BotNotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except BotResolveError as e:
+        return jsonify({"error": str(e)}), 500
     
     try:
-        # Dynamic import and execution
-        module = importlib.import_module(module_path)
-        func = getattr(module, function_name)
         params.pop('persona', None)  # Strip bridge-injected metadata — bot functions don't accept this
         result = func(**params)
         return jsonify(result)
-    except ImportError as e:
-        return jsonify({"error": f"Failed to import {module_path}: {str(e)}"}), 500
-    except AttributeError as e:
-        return jsonify({"error": f"Function {function_name} not found in {module_path}: {str(e)}"}), 500
     except TypeError as e:
         return jsonify({"error": f"Invalid parameters for {bot_id}: {str(e)}"}), 400
     except Exception as e:
         return jsonify({"error": f"Execution failed for {bot_id}: {str(e)}"}), 500
+
+@bots_bp.route('/bots/execute_batch', methods=['POST'])
+def execute_bot_batch():
+    """
+    Several bot calls in one request: {"calls": [{"bot_id", "params"}, ...]}.
+    One outcome per call, in order — a failed call never fails the batch.
+    """
+    data = request.get_json() or {}
+    calls = data.get('calls') if isinstance(data, dict) else data
+    
+    if not isinstance(calls, list) or not calls:
+        return jsonify({"error": "calls must be a non-empty list"}), 400
+    if len(calls) > BATCH_MAX_CALLS:
+        return jsonify({"error": f"at most {BATCH_MAX_CALLS} calls per batch"}), 400
+    
+    results = execute_batch(calls)
+    return jsonify({"results": results, "count": len(results),
+                    "failed": sum(1 for r in results if not r['ok'])})
+
+@bots_bp.route('/bots/dispatch/metrics', methods=['GET'])
+def bot_dispatch_metrics():
+    """Dispatch table size, registry version and hit/miss counters."""
+    return jsonify(bot_table.metrics())
@@ -1,20 +1,26 @@
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context
 from app.services.neo4j_service import (
-    create_nodes,
+    bulk_import_nodes,
     create_mfn_node,
     ensure_filenode_constraint,
+    bootstrap_filenode_schema,
+    get_filenode_epoch,
+    reset_filenode_epoch,
     ensure_mfn_constraint,
     delete_file_nodes,
     update_file_node,
     process_discovery_results,
     search_for_file_node,
+    iter_file_node_search,
     process_copy_results,
     process_move_results,
+    process_batch_results,
     create_dispatch_node,
 )
-from app.services.schema_service import load_mfn, parse_gfn, map_properties, parse_user_search_input
+from app.services.schema_service import load_mfn, iter_gfn, map_properties, parse_user_search_input
 from app.shared.mfi_shared import DiscoveryMFI, write_mfi
-from app.shared.mfi_shared import CopyMFI, MoveMFI
+from app.shared.mfi_shared import CopyMFI, MoveMFI, BatchMFI
+from dataclasses import asdict
 from pathlib import Path
 import json
 import os
@@ -30,14 +36,9 @@ def show(label='BusnessCard'):
         label = 'MetaBusinessCard'
     else:
         label = 'BusinessCard'
-    results = []
     from app.models import neo4j
-    with neo4j.get_session() as session:
-        # print (f"SHOW ROUTE: {neo4j}, {session}")
-        res = session.run(f"MATCH (b:{label}) RETURN b LIMIT 50")
-        for record in res:
-            node = record['b']
-            results.append(dict(node))
+    results = neo4j.execute_read(
+        lambda tx: [dict(record['b']) for record in tx.run(f"MATCH (b:{label}) RETURN b LIMIT 50")])
     return jsonify(results)
 
 @buscard_bp.route('/gui/')
@@ -63,44 +64,61 @@ def query_service(service_key):
     # this will eventually be more than one path. Fake it for now.
     paths = [form_data['node_path']]
     filters = parse_user_search_input(form_data['property_filter'])
-    
-    result = search_for_file_node(paths, filters)
+
+    # paging: after=<FILE-NODE-id cursor>, limit=<page size>
+    # columns=1 projects fnodes to the MFN table_columns (list view only)
+    # format=ndjson streams one JSON object per line instead of one array
+    limit = request.form.get('limit', type=int)
+    if form_data.get('limit') and limit is None:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    options = {
+        'after':   form_data.get('after') or None,
+        'limit':   limit,
+        'columns': form_data.get('columns', '').lower() in ('1', 'true', 'yes'),
+    }
+    ndjson = (form_data.get('format') == 'ndjson'
+              or request.accept_mimetypes.best == 'application/x-ndjson')
+    if ndjson:
+        rows = iter_file_node_search(paths, filters, **options)
+        lines = (json.dumps(row, default=str) + '\n' for row in rows)
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+    result = search_for_file_node(paths, filters, **options)
     return jsonify(result)
 
-@buscard_bp.route('/dispatch', methods=['POST'])
-def dispatch_action():
-    data    = request.json or {}
+def _build_instruction(data: dict):
+    """One dispatch request → (MFI, None), or (None, error message)."""
     action  = data.get('action')
     mfn_id  = data.get('mfn_id')
     node_id = data.get('node_id')
 
     if not action:
-        return jsonify({'error': 'action is required'}), 400
+        return None, 'action is required'
     if action == 'discovery':
         if not mfn_id:
-            return jsonify({'error': 'discovery requires mfn_id'}), 400
+            return None, 'discovery requires mfn_id'
     else:
         if not all([mfn_id, node_id]):
-            return jsonify({'error': 'mfn_id and node_id are required'}), 400
+            return None, 'mfn_id and node_id are required'
     if action == 'insitu_copy':
         source = data.get('source')
         target = data.get('target')
         if not all([source, target]):
-            return jsonify({'error': 'insitu_copy requires source and target'}), 400
+            return None, 'insitu_copy requires source and target'
         mfi = CopyMFI(source=source, target=target, node_id=node_id, mfn_id=mfn_id, intent='insitu_copy')
 
     elif action == 'copy_master_source':
         source = data.get('source')
         target = data.get('target')
         if not all([source, target]):
-            return jsonify({'error': 'copy requires source and target'}), 400
+            return None, 'copy requires source and target'
         mfi = CopyMFI(source=source, target=target, node_id=node_id, mfn_id=mfn_id, intent='master_source')
 
     elif action == 'copy_master_target':
         source = data.get('source')
         target = data.get('target')
         if not all([source, target]):
-            return jsonify({'error': 'copy requires source and target'}), 400
+            return None, 'copy requires source and target'
         mfi = CopyMFI(source=source, target=target, node_id=node_id, mfn_id=mfn_id, intent='master_target')
 
     elif action == 'move':
@@ -108,31 +126,85 @@ def dispatch_action():
         target = data.get('target')
         intent = data.get('intent', 'move')
         if not all([source, target]):
-            return jsonify({'error': 'move requires source and target'}), 400
+            return None, 'move requires source and target'
         mfi = MoveMFI(source=source, target=target, node_id=node_id, mfn_id=mfn_id, intent=intent)
 
     elif action == 'archive':
         source = data.get('source')
         target = data.get('target')
         if not all([source, target]):
-            return jsonify({'error': 'archive requires source and target'}), 400
+            return None, 'archive requires source and target'
         mfi = MoveMFI(source=source, target=target, node_id=node_id, mfn_id=mfn_id, intent='archive')
 
     elif action == 'discovery':
         scan_path = data.get('source')
         patterns  = data.get('patterns', [])
         if not scan_path:
-            return jsonify({'error': 'discovery requires source'}), 400
-        mfi = DiscoveryMFI(mfn_id=mfn_id, source=scan_path, patterns=patterns)
+            return None, 'discovery requires source'
+        mfi = DiscoveryMFI(mfn_id=mfn_id, source=scan_path, patterns=patterns,
+                           recursive=bool(data.get('recursive', False)),
+                           include=data.get('include') or [],
+                           exclude=data.get('exclude') or [],
+                           incremental=bool(data.get('incremental', False)),
+                           epoch=get_filenode_epoch())
 
     else:
-        return jsonify({'error': f'Unknown action: {action}'}), 400
+        return None, f'Unknown action: {action}'
+
+    return mfi, None
+
+# largest BatchMFI written in one file — bigger arrays are split
+BATCH_MAX_ITEMS = 500
+
+@buscard_bp.route('/dispatch', methods=['POST'])
+def dispatch_action():
+    data = request.json or {}
+    if isinstance(data, list):
+        return _dispatch_batch(data)
+
+    mfi, error = _build_instruction(data)
+    if error:
+        return jsonify({'error': error}), 400
+    action = data.get('action')
 
     written = write_mfi(mfi)
-    create_dispatch_node(mfi.mfi_id, mfi.action, mfn_id, data.get('source', ''))
+    create_dispatch_node(mfi.mfi_id, mfi.action, data.get('mfn_id'), data.get('source', ''))
 
     return jsonify({'status': 'queued', 'mfi_id': mfi.mfi_id, 'action': action, 'intent': getattr(mfi, 'intent', ''), 'action': action})
 
+def _dispatch_batch(entries: list):
+    """
+    An array of copy/move dispatches → BatchMFI files of up to BATCH_MAX_ITEMS,
+    one Dispatch node each. Every item is validated before anything is written.
+    """
+    if not entries:
+        return jsonify({'error': 'empty batch'}), 400
+    mfn_id = entries[0].get('mfn_id') if isinstance(entries[0], dict) else None
+
+    items = []
+    for index, data in enumerate(entries):
+        if not isinstance(data, dict):
+            return jsonify({'error': f'item {index}: expected an object'}), 400
+        mfi, error = _build_instruction(data)
+        if error:
+            return jsonify({'error': f'item {index}: {error}'}), 400
+        if not isinstance(mfi, (CopyMFI, MoveMFI)):
+            return jsonify({'error': f'item {index}: only copy/move actions can be batched'}), 400
+        if mfi.mfn_id != mfn_id:
+            return jsonify({'error': f'item {index}: a batch must share one mfn_id'}), 400
+        item = {k: v for k, v in asdict(mfi).items() if k not in ('mfi_id', 'created', 'status')}
+        item['item_id'] = str(index)
+        items.append(item)
+
+    queued = []
+    for start in range(0, len(items), BATCH_MAX_ITEMS):
+        mfi = BatchMFI(mfn_id=mfn_id, items=items[start:start + BATCH_MAX_ITEMS])
+        write_mfi(mfi)
+        create_dispatch_node(mfi.mfi_id, mfi.action, mfn_id, '')
+        queued.append(mfi.mfi_id)
+
+    return jsonify({'status': 'queued', 'action': 'batch', 'mfi_ids': queued, 'items': len(items)})
+
 @buscard_bp.route('/process', methods=['POST'])
 def process_action():
     data   = request.json or {}
@@ -150,6 +222,9 @@ def process_action():
     elif action == 'move':
         result = process_move_results()
 
+    elif action == 'batch':
+        result = process_batch_results()
+
     else:
         return jsonify({'error': f'Unknown action: {action}'}), 400
 
@@ -191,33 +266,19 @@ def load_manual():
 
 @buscard_bp.route('/export', methods=['GET'])
 def export_gfn():
-    from app.services.neo4j_service import get_export_nodes
-    from app.services.schema_service import serialize_gfn
-    import os
-
+    """
+    Export masters to a new versioned GFN. ?mode=delta writes only what changed
+    since the last export. ?background=1 returns an id for /sse/watch.
+    """
+    from app.services.export_service import export_gfn as run_full, export_delta, start_export
+
+    mode = request.args.get('mode', 'full')
+    if mode not in ('full', 'delta'):
+        return jsonify({'status': 'error', 'error': f"Unknown export mode: {mode}"}), 400
+    if request.args.get('background', '').lower() in ('1', 'true', 'yes'):
+        return jsonify({'status': 'started', 'export_id': start_export(mode=mode)}), 202
     try:
-        mfn_path = os.path.join('app', 'Schema', 'MFN-busCard.yaml')
-        export_dir = Path(os.path.dirname(mfn_path))
-        
-        rows = get_export_nodes()
-        mfn = load_mfn(mfn_path)
-        yaml_str = serialize_gfn(rows, mfn)
-
-        existing = sorted(export_dir.glob("GFN-busCard-dropbox_*.yaml"))
-        next_version = len(existing) + 1
-        versioned_name = f"GFN-busCard-dropbox_{next_version:03d}.yaml"
-        versioned_path = export_dir / versioned_name
-        active_path = export_dir / "GFN-busCard-dropbox_000.yaml"
-
-        versioned_path.write_text(yaml_str, encoding='utf-8')
-        active_path.write_text(yaml_str, encoding='utf-8')
-
-        return jsonify({
-            'status': 'ok',
-            'records': len(rows),
-            'versioned': versioned_name,
-            'active': 'GFN-busCard-dropbox_000.yaml'
-        })
+        return jsonify(export_delta() if mode == 'delta' else run_full())
 
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)}), 500
@@ -226,19 +287,26 @@ def export_gfn():
 def load():
     mfn_path = os.path.join('app', 'Schema', 'MFN-busCard.yaml')
     gfn_path = os.path.join('app', 'Schema', 'GFN-busCard-dropbox.yaml')
+    batch_size = request.args.get('batch_size', type=int)
     mfn = load_mfn(mfn_path)
-    nodes = parse_gfn(gfn_path)
     # label = mfn.get('name', 'Business Card').replace(' ', '')
     label = mfn.get('label')
     if not label:
         raise ValueError(f"MFN missing required 'label' field: {mfn_path}")
-    mapped = [map_properties(mfn, n) for n in nodes]
+    # streamed — records are written in batches while the GFN is still being read
+    mapped = (map_properties(mfn, n) for n in iter_gfn(gfn_path))
 
     from app.models import neo4j
-    with neo4j.driver.session() as session:
+    with neo4j.get_session() as session:
         ensure_filenode_constraint(session)
         ensure_mfn_constraint(session)
         create_mfn_node(session, mfn)
-        create_nodes(session, label, mapped)
-
-    return f"Loaded {len(mapped)} FileNodes into Neo4j label:{label}:FileNode"
+        summary = bulk_import_nodes(session, label, mapped, batch_size=batch_size)
+        reset_filenode_epoch(session)   # incremental discovery snapshots start over
+        bootstrap_filenode_schema(session)
+
+    return jsonify({
+        'status':  'ok',
+        'label':   f"{label}:FileNode",
+        **summary,
+    })
@@ -24,6 +24,12 @@ def query_service(service_key):
     paths = [form_data['node_path']]
     filters = parse_user_search_input(form_data['property_filter'])
     
+    # paging: after=<FILE-NODE-id cursor>, limit=<page size> — as /buscard/query
+    limit = request.form.get('limit', type=int)
+    if form_data.get('limit') and limit is None:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
     print(f"[/r2hodo/query/{service_key}] {mfn_id}")
-    result = search_for_file_node(paths, filters, mfn_id)
+    result = search_for_file_node(paths, filters, mfn_id,
+                                  after=form_data.get('after') or None, limit=limit)
     return jsonify(result)
\ No newline at end of file
@@ -1,7 +1,7 @@
 import time
 import json
 from flask import Blueprint, request, Response, stream_with_context, jsonify
-from app.services.mfi_broker import pop_result, _result_queue
+from app.services.mfi_broker import pop_result, subscribe, unsubscribe, _result_queue
 
 sse_bp = Blueprint('sse', __name__, url_prefix='/sse')
 
@@ -13,29 +13,43 @@ def sse_watch():
 
     id_list = [m.strip() for m in mfi_ids.split(',') if m.strip()]
     timeout = 60  # seconds
-    poll_interval = 1.0
+    keepalive_interval = 15.0
 
     def generate():
         pending = set(id_list)
-        elapsed = 0
-        while pending and elapsed < timeout:
-            time.sleep(poll_interval)
-            elapsed += poll_interval
-            # DEBUG print(f"[sse] polling for {pending}, elapsed={elapsed}")
-            # DEBUG print(f"[sse] queue contents: {list(_result_queue.keys())}")
-            for mfi_id in list(pending):
-                result = pop_result(mfi_id)
-                # DEBUG print(f"[SSE] pop_result", mfi_id, result)
-                if result is not None:
-                    payload = json.dumps({'mfi_id': mfi_id, **result})
-                    yield f"data: {payload}\n\n"
-                    pending.discard(mfi_id)
+        ready = subscribe(pending)
+        deadline = time.monotonic() + timeout
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # block until the broker pushes one of ours — no per-second wake-ups
+                if not ready.wait(min(keepalive_interval, remaining)):
+                    yield ": keep-alive\n\n"
+                    continue
+                ready.clear()
+                # DEBUG print(f"[sse] woke for {pending}")
+                # DEBUG print(f"[sse] queue depth: {len(_result_queue)}")
+                for mfi_id in list(pending):
+                    result = pop_result(mfi_id)
+                    # DEBUG print(f"[SSE] pop_result", mfi_id, result)
+                    if result is not None:
+                        payload = json.dumps({'mfi_id': mfi_id, **result})
+                        yield f"data: {payload}\n\n"
+                        if result.get('status') == 'running':
+                            # progress from a long job (export) — keep watching
+                            deadline = time.monotonic() + timeout
+                        else:
+                            pending.discard(mfi_id)
             if not pending:
                 yield f"data: {json.dumps({'status': 'done'})}\n\n"
                 return
-        # timeout
-        for mfi_id in pending:
-            yield f"data: {json.dumps({'mfi_id': mfi_id, 'status': 'timeout'})}\n\n"
+            # timeout
+            for mfi_id in pending:
+                yield f"data: {json.dumps({'mfi_id': mfi_id, 'status': 'timeout'})}\n\n"
+        finally:
+            unsubscribe(id_list, ready)
 
     return Response(generate(), mimetype='text/event-stream',
                     headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""One-off repair of the :MasterFileNode label.
+
+Labels every FileNode without an outgoing COPY_OF / INSITU_COPY_OF and strips
+the label from nodes that have one. Safe to re-run.
+
+Usage: python -m app.scripts.backfill_master_labels
+Environment: NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD are supported.
+"""
+from app import create_app
+from app.models import neo4j
+from app.services.neo4j_service import backfill_master_labels
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        neo4j.init_app(app)
+        with neo4j.get_session() as session:
+            result = backfill_master_labels(session, full=True)
+    print(f"[backfill] MasterFileNode: {result['labelled']} labelled, "
+          f"{result['unlabelled']} unlabelled")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the MFI wire codecs on a discovery result payload.
+
+Builds a DiscoveryResultMFI with --files entries shaped like real scan output
+and times encode + decode for every available codec, plus the pure-Python
+YAML path that .mfi files used before the codec layer.
+
+Usage: python -m app.scripts.bench_mfi_codecs [--files 5000] [--repeat 5]
+"""
+import time
+from dataclasses import asdict
+
+import yaml
+
+from app.shared.mfi_shared import CODECS, DiscoveryResultMFI
+
+
+def _payload(files: int) -> dict:
+    entries = [{
+        'filepath':     f"C:/Users/termi/Documents/Cards/2024/batch_{i // 500:03d}/"
+                        f"2024_{i % 12 + 1:02d}{i % 28 + 1:02d}_busCard_Contact Name {i}.pdf",
+        'date':         f"2024_{i % 12 + 1:02d}{i % 28 + 1:02d}",
+        'mask_matched': 'busCard',
+        'descriptor':   f"Contact Name {i}",
+        'mtime':        f"2024_{i % 12 + 1:02d}{i % 28 + 1:02d}",
+        'change':       'added',
+    } for i in range(files)]
+    mfi = DiscoveryResultMFI(mfi_id='scan_directory_result_2024_0101_000000_000000',
+                             source_mfi_id='scan_directory_2024_0101_000000_000000',
+                             mfn_id='MFN-busCard', status='completed', files=entries)
+    return asdict(mfi)
+
+
+def _legacy():
+    """The pre-codec path: yaml.dump / yaml.safe_load (pure-Python loader)."""
+    encode = lambda data: yaml.dump(data, default_flow_style=False, allow_unicode=True).encode('utf-8')
+    decode = lambda raw: yaml.safe_load(raw)
+    return encode, decode
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000, help="file entries in the payload")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per codec, best is reported")
+    args = parser.parse_args(argv)
+
+    data = _payload(args.files)
+    codecs = {'yaml (legacy)': _legacy(), **CODECS}
+
+    print(f"[bench] discovery result, {args.files} files, best of {args.repeat}")
+    print(f"{'codec':<14} {'size':>10} {'encode ms':>10} {'decode ms':>10}")
+    for name, (encode, decode) in codecs.items():
+        raw = encode(data)
+        assert decode(raw) == data, f"{name} did not round-trip"
+        enc = _best(lambda: encode(data), args.repeat)
+        dec = _best(lambda: decode(raw), args.repeat)
+        print(f"{name:<14} {len(raw):>10,} {enc * 1000:>10.1f} {dec * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
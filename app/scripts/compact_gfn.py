@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Fold the baseline GFN snapshot and its delta exports into a new full snapshot.
+
+Reads the export manifest next to the MFN — no Neo4j connection needed.
+
+Usage: python -m app.scripts.compact_gfn [--mfn app/Schema/MFN-busCard.yaml] [--prune]
+"""
+from app.services.export_service import compact_gfn, EXPORT_MFN, EXPORT_PREFIX
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mfn", default=EXPORT_MFN)
+    parser.add_argument("--prefix", default=EXPORT_PREFIX)
+    parser.add_argument("--prune", action="store_true", help="delete folded delta files")
+    args = parser.parse_args(argv)
+
+    result = compact_gfn(args.mfn, args.prefix, prune=args.prune)
+    if not result.get('folded'):
+        print(f"[compact] nothing to fold — snapshot {result['snapshot']}")
+        return
+    print(f"[compact] folded {result['folded']} deltas → {result['versioned']} "
+          f"({result['records']} records), active {result['active']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,21 +4,25 @@ MCP Flask Bridge with Heavy Instrumentation
 import sys
 import os
 import json
+import anyio
 import requests
+from requests.adapters import HTTPAdapter
 import argparse
+import threading
 import traceback
 from datetime import datetime, timezone
 from pathlib import Path
 from mcp import Tool, stdio_server
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
 
 # Logging to file
 LOG_FILE = Path(__file__).parent.parent / "logs" / "mcp_bridge.log"
 LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+_log_lock = threading.Lock()  # tool calls log from worker threads
 
 def log(msg):
     try:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+        with _log_lock, open(LOG_FILE, 'a', encoding='utf-8') as f:
             f.write(f"[{datetime.now(timezone.utc).isoformat()}] {msg}\n")
             f.flush()
     except Exception as e:
@@ -27,7 +31,7 @@ def log(msg):
 def log_json(label, obj):
     """Log a JSON object with pretty formatting."""
     try:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+        with _log_lock, open(LOG_FILE, 'a', encoding='utf-8') as f:
             f.write(f"[{datetime.now(timezone.utc).isoformat()}] {label}\n")
             f.write(json.dumps(obj, indent=2) + "\n")
             f.flush()
@@ -49,15 +53,27 @@ FLASK_BASE = "http://localhost:5000"
 ALLOWED_BUSCARD_ACTIONS = {"discovery", "move", "archive", "insitu_copy", "copy_master_source", "copy_master_target"}
 ALLOWED_R2HODO_ACTIONS  = {"discovery"}
 
+# Concurrent tool calls in flight — also the keep-alive connection pool size
+FLASK_POOL_SIZE = int(os.environ.get("BRIDGE_POOL_SIZE", 16))
+
+def _make_http():
+    """One keep-alive session to Flask — no TCP handshake per tool call. Thread-safe for get/post."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FLASK_POOL_SIZE)
+    session.mount("http://", adapter)
+    return session
+
+HTTP = _make_http()
+
 def flask_get(path):
     try:
-        return requests.get(f"{FLASK_BASE}{path}", timeout=5).json()
+        return HTTP.get(f"{FLASK_BASE}{path}", timeout=5).json()
     except Exception as e:
         return {"error": str(e)}
 
 def flask_post(path, payload):
     try:
-        return requests.post(f"{FLASK_BASE}{path}", json=payload, timeout=10).json()
+        return HTTP.post(f"{FLASK_BASE}{path}", json=payload, timeout=10).json()
     except Exception as e:
         return {"error": str(e)}
 
@@ -86,7 +102,8 @@ STATIC_TOOL_ASSIGNMENTS = {
     'mfn_list': 'iris',
     'bots_register': 'iris',
     'buscard_dispatch': 'iris',
-    'r2hodo_dispatch': 'iris'
+    'r2hodo_dispatch': 'iris',
+    'bots_batch': 'all'
     # TODO: change iris to rex when migrating tools 
     # buscard_process: DEPRECATED - not assigned to anyone
     # r2hodo_process: DEPRECATED - not assigned to anyone
@@ -100,11 +117,20 @@ STATIC_TOOLS = [
     {"name": "buscard_dispatch", "description": "Dispatch buscard", "inputSchema": {"type": "object", "required": ["action", "mfn_id"], "properties": {"action": {"type": "string", "enum": ["discovery", "move", "archive", "insitu_copy", "copy_master_source", "copy_master_target"]}, "mfn_id": {"type": "string"}, "source": {"type": "string"}, "target": {"type": "string"}, "node_id": {"type": "string"}, "patterns": {"type": "array"}}}},
     {"name": "buscard_process", "description": "Process buscards", "inputSchema": {"type": "object", "required": ["action"], "properties": {"action": {"type": "string", "enum": ["discovery", "copy", "move"]}}}},
     {"name": "r2hodo_dispatch", "description": "Dispatch R2HOdo", "inputSchema": {"type": "object", "required": ["action", "mfn_id"], "properties": {"action": {"type": "string", "enum": ["discovery"]}, "mfn_id": {"type": "string"}, "source": {"type": "string"}, "patterns": {"type": "array"}}}},
-    {"name": "r2hodo_process", "description": "Process R2HOdo", "inputSchema": {"type": "object", "required": ["action"], "properties": {"action": {"type": "string", "enum": ["discovery"]}}}}
+    {"name": "r2hodo_process", "description": "Process R2HOdo", "inputSchema": {"type": "object", "required": ["action"], "properties": {"action": {"type": "string", "enum": ["discovery"]}}}},
+    {"name": "bots_batch", "description": "Run several of your bot tools in one call — results come back in the order given", "inputSchema": {"type": "object", "required": ["calls"], "properties": {"calls": {"type": "array", "items": {"type": "object", "required": ["tool"], "properties": {"tool": {"type": "string"}, "arguments": {"type": "object"}}}}}}}
 ]
 
 TOOLS = []  # List[Tool]
 BOT_TOOLS = []
+BOT_IDS = {}  # tool name -> bot-id (tool names flatten the dots, so this is not reversible)
+REGISTRY_VERSION = None  # registry version the bot tools were built from
+
+# Bot tool manifest cache — the filtered, parsed tool list per persona, keyed by
+# registry version ("<epoch>-<counter>", so a wiped graph never matches). Startup serves it without touching Flask; the refresh loop
+# replaces it when /bots/registry/version moves.
+MANIFEST_FILE = Path(__file__).parent.parent / "cache" / f"mcp_tools_{PERSONA}.json"
+TOOLS_REFRESH_INTERVAL = float(os.environ.get("BRIDGE_TOOLS_REFRESH", 30))  # seconds
 
 
 def tool_from_dict(defn):
@@ -115,103 +141,148 @@ def tool_from_dict(defn):
         inputSchema=defn.get("inputSchema", {"type": "object", "properties": {}}),
     )
 
-def load_bot_tools_from_registry():
-    """Query Neo4j for BotFunction nodes and dynamically generate MCP tools."""
-    log(f"Loading bot tools from Neo4j registry for persona: {PERSONA}")
-    
+def fetch_registry_version():
+    """Cheap version check — None when Flask is unreachable."""
+    return flask_get("/bots/registry/version").get("version")
+
+def fetch_registry(version=None):
+    """GET /bots/list; returns (version, bots), or None when `version` is still current (304)."""
+    headers = {"If-None-Match": f'"bots-{version}"'} if version is not None else {}
+    response = HTTP.get(f"{FLASK_BASE}/bots/list", headers=headers, timeout=10)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    data = response.json()
+    return data.get("version"), data.get("bots", [])
+
+def build_bot_tools(bots):
+    """Persona filter + params parsing → tool definitions (dicts, as cached on disk)."""
+    log(f"Found {len(bots)} total bots in registry")
+
+    # Filter bots by persona prefix + universal namespaces
+    persona_prefix = f"{PERSONA}."
+    extra_prefixes = PERSONA_EXTRA_PREFIXES.get(PERSONA, [])
+    persona_bots = [
+        b for b in bots
+        if b.get("bot-id", "").startswith(persona_prefix)
+        or any(b.get("bot-id", "").startswith(p) for p in extra_prefixes)
+    ]
+    log(f"Filtered to {len(persona_bots)} bots for {PERSONA}")
+
+    defs = []
+    for bot in persona_bots:
+        bot_id = bot.get("bot-id")
+
+        if bot.get("deprecated"):
+            log(f"  Skipping deprecated bot: {bot_id}")
+            continue
+        use_case = bot.get("use_case", "No description")
+        params_json = bot.get("params", "{}")
+
+        try:
+            params_schema = json.loads(params_json)
+        except json.JSONDecodeError as e:
+            log(f"  ✗ WARNING: Invalid JSON in params for {bot_id}: {e}")
+            continue
+
+        defs.append({"name": bot_id.replace(".", "_"), "description": use_case,
+                     "inputSchema": params_schema, "bot_id": bot_id})
+    return defs
+
+def load_manifest():
     try:
-        response = flask_get("/bots/list")
-        # log_json("Flask /bots/list response:", response)
-        
-        if "error" in response:
-            log(f"Failed to load bots from registry: {response['error']}")
-            log("Continuing with static tools only")
-            return []
-        
-        bots = response.get("bots", [])
-        log(f"Found {len(bots)} total bots in registry")
-        
-        # Filter bots by persona prefix + universal namespaces
-        persona_prefix = f"{PERSONA}."
-        extra_prefixes = PERSONA_EXTRA_PREFIXES.get(PERSONA, [])
-        persona_bots = [
-            b for b in bots
-            if b.get("bot-id", "").startswith(persona_prefix)
-            or any(b.get("bot-id", "").startswith(p) for p in extra_prefixes)
-        ]
-        log(f"Filtered to {len(persona_bots)} bots for {PERSONA}")
-        
-        dynamic_tools = []
-        for bot in persona_bots:
-            bot_id = bot.get("bot-id")
-
-            if bot.get("deprecated"):
-                log(f"  Skipping deprecated bot: {bot_id}")
-                continue
-            use_case = bot.get("use_case", "No description")
-            params_json = bot.get("params", "{}")
-            
-            log(f"Processing bot: {bot_id}")
-            log(f"  Raw params JSON: {params_json}")
+        manifest = json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+        return manifest["version"], manifest["tools"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
 
-            try:
-                params_schema = json.loads(params_json)
-                # log_json(f"  Parsed params schema for {bot_id}:", params_schema)
-                
-                tool_name = bot_id.replace(".", "_")
-                tool = Tool(
-                    name=tool_name,
-                    title=tool_name,
-                    description=use_case,
-                    inputSchema=params_schema,
-                )
-
-                # log_json(f"  Generated MCP tool for {bot_id}:", tool)
-
-                dynamic_tools.append(tool)
-                BOT_TOOLS.append(tool_name)
-                log(f"  ✓ Registered bot tool: {tool_name}")
-                
-            except json.JSONDecodeError as e:
-                log(f"  ✗ WARNING: Invalid JSON in params for {bot_id}: {e}")
-                continue
-        
-        return dynamic_tools
-        
-    except Exception as e:
-        log(f"ERROR loading bots from registry: {e}")
-        import traceback
-        log(traceback.format_exc())
-        return []
+def save_manifest(version, defs):
+    try:
+        MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = MANIFEST_FILE.with_suffix(f".{PID}.tmp")
+        tmp.write_text(json.dumps({"version": version, "tools": defs}), encoding="utf-8")
+        os.replace(tmp, MANIFEST_FILE)
+    except OSError as e:
+        log(f"Could not write tool manifest {MANIFEST_FILE}: {e}")
 
-def init_tools():
-    """Initialize TOOLS list with static tools + dynamic bot tools."""
-    global TOOLS
+def install_tools(version, defs):
+    """Swap in a new tool list — rebinds the globals, so readers never see a half-built list."""
+    global TOOLS, BOT_TOOLS, BOT_IDS, REGISTRY_VERSION
 
     # Filter static tools by persona assignment
     assigned_static_tools = [
-        t for t in STATIC_TOOLS 
-        if t['name'] in STATIC_TOOL_ASSIGNMENTS 
+        t for t in STATIC_TOOLS
+        if t['name'] in STATIC_TOOL_ASSIGNMENTS
         and (STATIC_TOOL_ASSIGNMENTS[t['name']] == 'all' or STATIC_TOOL_ASSIGNMENTS[t['name']] == PERSONA)
     ]
-    
-    TOOLS = [tool_from_dict(t) for t in assigned_static_tools]
-    log(f"Loaded {len(TOOLS)} assigned static tools for {PERSONA}")
+    bot_tools = [tool_from_dict(d) for d in defs]
 
-    dynamic_tool_objs = load_bot_tools_from_registry()
-    TOOLS.extend(dynamic_tool_objs)
+    BOT_IDS = {d["name"]: d["bot_id"] for d in defs}
+    BOT_TOOLS = list(BOT_IDS)
+    TOOLS = [tool_from_dict(t) for t in assigned_static_tools] + bot_tools
+    REGISTRY_VERSION = version
 
-    log(f"Total tools registered: {len(TOOLS)} ({len(assigned_static_tools)} static + {len(dynamic_tool_objs)} bots)")
+    log(f"Total tools registered: {len(TOOLS)} ({len(assigned_static_tools)} static + {len(bot_tools)} bots) "
+        f"| registry version {version}")
     log("=" * 80)
     log("FINAL TOOLS ARRAY:")
     for i, t in enumerate(TOOLS, 1):
         log(f"  {i}. {t.name}")
     log("=" * 80)
 
+def refresh_tools():
+    """Rebuild the bot tools if the registry moved. Returns True when the tool list changed."""
+    version = fetch_registry_version()
+    if version is None or version == REGISTRY_VERSION:
+        return False
+    log(f"Registry version {REGISTRY_VERSION} -> {version}, reloading bot tools")
+    fetched = fetch_registry(REGISTRY_VERSION)
+    if fetched is None:
+        return False
+    version, bots = fetched
+    defs = build_bot_tools(bots)
+    save_manifest(version, defs)
+    install_tools(version, defs)
+    return True
+
+def init_tools():
+    """
+    Initialize TOOLS — from the manifest cache when it matches the registry
+    version (or Flask is unreachable), else from the registry.
+    """
+    cached = load_manifest()
+    if cached is not None:
+        version, defs = cached
+        current = fetch_registry_version()
+        if current is None or current == version:
+            log(f"Loaded {len(defs)} bot tools from {MANIFEST_FILE} (registry version {version}"
+                f"{'' if current else ', unchecked — Flask unreachable'})")
+            install_tools(version, defs)
+            return
+        log(f"Cached tools are registry version {version}, registry is at {current}")
+
+    log(f"Loading bot tools from Neo4j registry for persona: {PERSONA}")
+    try:
+        version, bots = fetch_registry()
+        defs = build_bot_tools(bots)
+        save_manifest(version, defs)
+    except Exception as e:
+        log(f"ERROR loading bots from registry: {e}")
+        log(traceback.format_exc())
+        if cached is not None:
+            log("Continuing with the cached tool list")
+            version, defs = cached
+        else:
+            log("Continuing with static tools only")
+            version, defs = None, []
+    install_tools(version, defs)
+
 def execute_tool_by_name(name, args, caller="unknown"):
     log(f"[execute_tool_by_name] ENTER pid={PID} caller={caller} tool={name}")
 
-    if name in BOT_TOOLS:
+    # one read — install_tools may rebind BOT_IDS between two lookups
+    bot_id = BOT_IDS.get(name)
+    if bot_id is not None:
         # Map bot tool names to their hardcoded Flask routes (legacy Vera bots)
         bot_routes = {
             "vera_todos_get_pending": "/bots/vera/todos/pending",
@@ -229,7 +300,6 @@ def execute_tool_by_name(name, args, caller="unknown"):
             result = flask_post(route, args)
         else:
             # Use generic /bots/execute endpoint for new bots
-            bot_id = name.replace("_", ".")  # "iris_analytics_measure_tokens" -> "iris.analytics.measure.tokens"
             log(f"  Routing to /bots/execute with bot_id: {bot_id}")
             result = flask_post("/bots/execute", {
                 "bot_id": bot_id, 
@@ -246,6 +316,17 @@ def execute_tool_by_name(name, args, caller="unknown"):
         return flask_get("/mfn/list")
     elif name == "bots_register":
         return flask_post("/bots/register", args)
+    elif name == "bots_batch":
+        # One HTTP hop for many bot calls — Flask runs them on one session
+        calls = []
+        bot_ids = BOT_IDS
+        for call in args.get("calls", []):
+            tool = call.get("tool")
+            if tool not in bot_ids:
+                raise RuntimeError(f"Not a bot tool for {PERSONA}: {tool}")
+            calls.append({"bot_id": bot_ids[tool], "params": {**(call.get("arguments") or {}), "persona": PERSONA}})
+        log(f"  Routing {len(calls)} calls to /bots/execute_batch")
+        return flask_post("/bots/execute_batch", {"calls": calls})
     elif name == "buscard_dispatch":
         if args.get("action") not in ALLOWED_BUSCARD_ACTIONS:
             raise RuntimeError("Action not permitted")
@@ -274,25 +355,49 @@ async def run_mcp_server():
     log(f"run_mcp_server() starting | pid={PID} | ppid={PPID}")
 
     server = Server(name=f"mcp-{PERSONA}-bridge", version="1.0.0")
+    # The server handles each request in its own task; tool calls block on HTTP,
+    # so they run on worker threads — up to FLASK_POOL_SIZE at once.
+    tool_limiter = anyio.CapacityLimiter(FLASK_POOL_SIZE)
+    sessions = []  # the client session, captured on its first request — notifications need it
 
     @server.list_tools()
     async def list_tools():
+        if not sessions:
+            sessions.append(server.request_context.session)
         log(f"list_tools() returning {len(TOOLS)} tools")
         return TOOLS
 
     @server.call_tool()
     async def on_call_tool(tool_name, arguments):
         arguments = arguments or {}
-        result = execute_tool_by_name(tool_name, arguments, caller="async")
+        result = await anyio.to_thread.run_sync(
+            lambda: execute_tool_by_name(tool_name, arguments, caller="async"),
+            limiter=tool_limiter,
+        )
         # Wrap result in MCP content format
         return [{"type": "text", "text": json.dumps(result, indent=2)}]
 
+    async def refresh_loop():
+        while True:
+            try:
+                changed = await anyio.to_thread.run_sync(refresh_tools)
+                if changed and sessions:
+                    await sessions[0].send_tool_list_changed()
+            except Exception as e:
+                log(f"Tool refresh failed: {e}")
+            await anyio.sleep(TOOLS_REFRESH_INTERVAL)
+
     async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options(),
-        )
+        async with anyio.create_task_group() as tg:
+            if TOOLS_REFRESH_INTERVAL > 0:
+                tg.start_soon(refresh_loop)
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options(
+                    notification_options=NotificationOptions(tools_changed=True)),
+            )
+            tg.cancel_scope.cancel()
 
 # Dead code that is NOT called by Claude on startup. 
 def main():
@@ -343,7 +448,6 @@ def main():
 if __name__ == "__main__":
     try:
         init_tools()
-        import anyio
         anyio.run(run_mcp_server)
     except Exception as e:
         log(f"FATAL ERROR: {e}")
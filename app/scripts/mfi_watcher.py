@@ -7,13 +7,23 @@ writes results to completed/.
 Usage:
     python -m app.scripts.mfi_watcher           # process all pending, exit
     python -m app.scripts.mfi_watcher --watch   # loop continuously
+    python -m app.scripts.mfi_watcher --watch --workers 8 --limit scan_directory=1
+
+--workers runs instructions on a thread pool; --limit caps one action type
+(copies are I/O bound and run wide, scans walk whole trees and are capped).
+The claim (rename into processing/) is atomic, so several watcher processes
+can share one queue — whoever loses the rename skips the file.
 
 Zero container dependencies — stdlib, yaml, pathlib only.
 """
 
+import os
 import re
 import time
 import argparse
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
 from dotenv import load_dotenv
@@ -30,13 +40,21 @@ from app.shared.mfi_shared import (
     move_to_completed,
     mark_failed,
     read_pending,
+    pending_path,
+    completed_path,
+    processed_path,
+    peek_action,
     DiscoveryMFI,
     DiscoveryResultMFI,
     CopyMFI,
     CopyResultMFI,
     MoveMFI, 
     MoveResultMFI,
+    BatchMFI,
+    BatchResultMFI,
 )
+from app.shared.mfi_events import watch_directory
+from app.shared.mfi_scan import MaskScanner, ScanManifest, scan_directory, scan_scope
 
 
 def _make_result(cls, **kwargs):
@@ -114,6 +132,37 @@ def handle_copy(mfi: CopyMFI) -> CopyResultMFI:
 # Action handlers
 # ---------------------------------------------------------------------------
 
+_manifest = None
+_manifest_lock = threading.Lock()
+_pending_snapshots = {}     # discovery mfi_id → (scope, changed, removed), staged once the result is written
+
+def _scan_manifest():
+    """Process-wide ScanManifest, or None when the local store cannot be opened."""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            try:
+                _manifest = ScanManifest()
+            except Exception as e:
+                print(f"Discovery: scan manifest unavailable ({e}) — full scans only")
+                _manifest = False
+    return _manifest or None
+
+
+def _confirm_snapshots(manifest: ScanManifest):
+    """
+    Commit staged scan diffs whose result Flask has archived to processed/ —
+    it only archives after the graph work succeeded. A result still in
+    completed/ stays staged; one in neither folder is dropped.
+    """
+    for result_id in manifest.staged():
+        name = f"{result_id}.mfi"
+        if (processed_path() / name).exists():
+            manifest.commit(result_id)
+        elif not (completed_path() / name).exists() and not (processed_path() / name).exists():
+            manifest.discard(result_id)
+
+
 def handle_discovery(mfi: DiscoveryMFI) -> DiscoveryResultMFI:
     """
     Scan source directory for files matching any of the MFI patterns.
@@ -121,6 +170,9 @@ def handle_discovery(mfi: DiscoveryMFI) -> DiscoveryResultMFI:
     Patterns may be plain strings or dicts with pattern_type/pattern_value/confidence.
     Only filename_contains patterns are handled here — extension patterns are ignored
     (the watcher has no extension-only logic; confidence threshold handles them).
+    recursive/include/exclude on the MFI walk subfolders in parallel (see mfi_scan).
+    incremental (opt-in) reports only files added/modified since the last scan of
+    the same source + patterns + graph epoch, plus the paths that disappeared.
     """
     source = Path(mfi.source)
     # Normalise patterns — accept both plain strings and dicts
@@ -132,31 +184,53 @@ def handle_discovery(mfi: DiscoveryMFI) -> DiscoveryResultMFI:
         else:
             patterns.append(p)  # plain string, legacy format
 
-    if not source.exists():
-        raise FileNotFoundError(f"Source directory not found: {source}")
+    errors = []
+    found = scan_directory(source, MaskScanner(patterns),
+                           recursive = mfi.recursive,
+                           include   = mfi.include,
+                           exclude   = mfi.exclude,
+                           errors    = errors)
+    for path, message in errors:
+        print(f"Discovery: skipped {path} — {message}")
+
+    manifest = _scan_manifest()
+    removed  = []
+    if manifest is None:
+        changes = [(item, None) for item in found]
+    else:
+        _confirm_snapshots(manifest)
+        scope = scan_scope(source, patterns, mfi.recursive, mfi.include, mfi.exclude, mfi.epoch)
+        added, modified, removed = manifest.diff(scope, found, errors)
+        if mfi.incremental:
+            changes = [(item, 'added') for item in added] + [(item, 'modified') for item in modified]
+            changes.sort(key=lambda c: c[0][0])
+        else:
+            # full rescan — report everything, still rebaseline the snapshot
+            kind = {item[0]: 'added' for item in added}
+            kind.update((item[0], 'modified') for item in modified)
+            changes = [(item, kind.get(item[0], 'unchanged')) for item in found]
+        # staged once the result MFI is written, committed once Flask has processed it
+        _pending_snapshots[mfi.mfi_id] = (scope, added + modified, removed)
+        if not mfi.incremental:
+            removed = []   # removals are only reported by incremental scans
 
     matched_files = []
-
-    for filepath in source.iterdir():
-        if not filepath.is_file():
-            continue
-
-        filename = filepath.name
-        for mask in patterns:
-            if mask in filename:
-                entry = parse_filename(filename, mask)
-                entry['filepath'] = str(filepath)
-                entry['mtime'] = datetime.fromtimestamp(
-                    filepath.stat().st_mtime
-                ).strftime("%Y_%m%d")
-                matched_files.append(entry)
-                break  # first mask match wins
+    for (filepath, mask, stat), change in changes:
+        entry = parse_filename(os.path.basename(filepath), mask)
+        entry['filepath'] = filepath
+        entry['mtime'] = datetime.fromtimestamp(stat.st_mtime).strftime("%Y_%m%d")
+        if change:
+            entry['change'] = change
+        matched_files.append(entry)
+    print(f"Discovery: {len(found)} matched, {len(matched_files)} reported, {len(removed)} removed")
 
     return _make_result(DiscoveryResultMFI,
                         source_mfi_id = mfi.mfi_id,
                         mfn_id        = mfi.mfn_id,
                         status        = 'completed',
-                        files         = matched_files)
+                        files         = matched_files,
+                        removed       = removed,
+                        incremental   = manifest is not None and mfi.incremental)
 
 def handle_move(mfi: MoveMFI) -> MoveResultMFI:
     """
@@ -193,6 +267,46 @@ def handle_move(mfi: MoveMFI) -> MoveResultMFI:
         return MoveResultMFI(**base, status='failed', success=False, error=str(e))
 
 
+BATCH_ITEM_TYPES = {
+    'copy': (CopyMFI, handle_copy),
+    'move': (MoveMFI, handle_move),
+}
+
+def handle_batch(mfi: BatchMFI) -> BatchResultMFI:
+    """
+    Run every copy/move item of a BatchMFI in order — a later item may depend
+    on an earlier one (move A→B, then B→C). One result entry per item; a
+    failed item never stops the rest.
+    """
+    results = []
+    for item in mfi.items:
+        entry = {
+            'item_id': item.get('item_id', ''),
+            'action':  item.get('action', ''),
+            'node_id': item.get('node_id', ''),
+            'source':  item.get('source', ''),
+            'target':  item.get('target', ''),
+            'intent':  item.get('intent', ''),
+        }
+        kind = BATCH_ITEM_TYPES.get(entry['action'])
+        if not kind:
+            results.append({**entry, 'success': False, 'error': f"Unsupported batch action: {entry['action']}"})
+            continue
+        cls, handler = kind
+        sub = cls(**{k: v for k, v in item.items() if k in cls.__dataclass_fields__ and k != 'action'})
+        sub.mfi_id = mfi.mfi_id
+        outcome = handler(sub)
+        results.append({**entry, 'success': outcome.success, 'error': outcome.error})
+
+    failed = sum(1 for r in results if not r['success'])
+    # DEBUG print(f"Batch {mfi.mfi_id}: {len(results) - failed} ok, {failed} failed")
+    return _make_result(BatchResultMFI,
+                        source_mfi_id = mfi.mfi_id,
+                        mfn_id        = mfi.mfn_id,
+                        status        = 'completed' if not failed else 'failure(s)',
+                        results       = results)
+
+
 # ---------------------------------------------------------------------------
 # Dispatcher
 # ---------------------------------------------------------------------------
@@ -201,13 +315,23 @@ ACTION_HANDLERS = {
     'scan_directory': handle_discovery,
     'copy':           handle_copy,
     'move':           handle_move,
+    'batch':          handle_batch,
 }
 
 
-def process_mfi(filepath: Path):
-    """Claim, execute, and complete a single MFI file."""
+def process_mfi(filepath: Path) -> bool:
+    """
+    Claim, execute, and complete a single MFI file.
+    Returns False when another worker or watcher process claimed it first.
+    """
     # DEBUG print(f"Claiming: {filepath.name}")
-    processing_file = move_to_processing(filepath)
+    try:
+        processing_file = move_to_processing(filepath)
+    except FileNotFoundError:
+        # lost the rename race — exactly one claimant gets each file
+        # DEBUG print(f"Already claimed: {filepath.name}")
+        return False
+    mfi = None
 
     try:
         mfi = decode(str(processing_file))
@@ -218,6 +342,9 @@ def process_mfi(filepath: Path):
 
         result = handler(mfi)
         write_mfi(result, folder=processing_file.parent.parent / 'completed')
+        snapshot = _pending_snapshots.pop(mfi.mfi_id, None)
+        if snapshot:
+            _scan_manifest().stage(result.mfi_id, *snapshot)
 
         move_to_completed(processing_file)
         # if hasattr(result, 'files'):
@@ -226,36 +353,131 @@ def process_mfi(filepath: Path):
         #     print(f"Completed: {filepath.name} → {result.action} success={result.success}")
             
     except Exception as e:
+        if mfi is not None:
+            _pending_snapshots.pop(mfi.mfi_id, None)
         mark_failed(processing_file)
         print(f"Failed: {filepath.name} — {e}")
+    return True
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def run(watch: bool = False, interval: int = 10):
-    """Process pending MFI files. Optionally loop."""
-    print("MFI Watcher started.")
-    while True:
-        pending = read_pending()
-        if pending:
-            for filepath in pending:
-                process_mfi(filepath)
-        else:
-            if not watch:
-                print("No pending MFI files. Exiting.")
-                break
-            print(f"Nothing pending. Checking again in {interval}s...")
+# per-action caps under --workers; actions not listed share the whole pool
+ACTION_LIMITS = {
+    'scan_directory': 1,
+}
 
+
+class MFIPool:
+    """
+    Run MFIs on a thread pool with a concurrency cap per action type.
+    A file over its action's cap waits in a backlog and is picked up by the
+    next worker of the same action to finish — no polling, no idle threads.
+    """
+
+    def __init__(self, workers: int, limits: dict = None):
+        self.workers   = max(1, workers)
+        self.limits    = {**ACTION_LIMITS, **(limits or {})}
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='mfi')
+        self._lock     = threading.Lock()
+        self._queued   = set()                  # paths submitted, not yet finished
+        self._running  = defaultdict(int)       # action → workers busy
+        self._backlog  = defaultdict(deque)     # action → paths over the cap
+
+    def _limit(self, action: str) -> int:
+        return min(self.limits.get(action, self.workers), self.workers)
+
+    def submit(self, path: Path):
+        action = peek_action(path)
+        with self._lock:
+            if path in self._queued:
+                return
+            self._queued.add(path)
+            if self._running[action] >= self._limit(action):
+                self._backlog[action].append(path)
+                return
+            self._running[action] += 1
+        self._executor.submit(self._work, action, path)
+
+    def _work(self, action: str, path: Path):
+        while path is not None:
+            try:
+                process_mfi(path)
+            except Exception as e:
+                print(f"Failed: {path.name} — {e}")
+            with self._lock:
+                self._queued.discard(path)
+                backlog = self._backlog[action]
+                path = backlog.popleft() if backlog else None
+                if path is None:
+                    self._running[action] -= 1
+
+    def idle(self) -> bool:
+        with self._lock:
+            return not self._queued
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def run(watch: bool = False, interval: int = 2, workers: int = 1,
+        limits: dict = None, mode: str = 'auto'):
+    """
+    Process pending MFI files. Optionally keep watching pending/.
+    Watch mode blocks on folder events (inotify on Linux, ReadDirectoryChangesW
+    on Windows with mode='win32') or polls every `interval` seconds — the
+    'auto' choice on Windows.
+    """
+    print(f"MFI Watcher started ({workers} worker{'s' if workers != 1 else ''}).")
+    pool = MFIPool(workers, limits)
+    try:
         if not watch:
-            break
-        time.sleep(interval)
+            pending = read_pending()
+            if not pending:
+                print("No pending MFI files. Exiting.")
+            for filepath in pending:
+                pool.submit(filepath)
+            return
+
+        folder = pending_path()
+        folder.mkdir(parents=True, exist_ok=True)
+        watcher = watch_directory(folder, mode=mode, interval=interval)
+        print(f"Watching {folder} ({watcher.mode})")
+        try:
+            while True:
+                for filepath in watcher.wait():
+                    pool.submit(filepath)
+        finally:
+            watcher.close()
+    finally:
+        pool.shutdown()
+
+
+def _parse_limits(values: list) -> dict:
+    """['copy=8', 'scan_directory=1'] → {'copy': 8, 'scan_directory': 1}"""
+    limits = {}
+    for value in values or []:
+        action, _, count = value.partition('=')
+        if not action or not count.isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(f"--limit expects ACTION=N, got '{value}'")
+        limits[action] = int(count)
+    return limits
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='MFI Watcher — process pending MFI instructions')
-    parser.add_argument('--watch', action='store_true', help='Loop continuously, polling for new MFI files')
-    parser.add_argument('--interval', type=int, default=10, help='Poll interval in seconds (default: 10)')
+    parser.add_argument('--watch', action='store_true', help='Loop continuously, waiting for new MFI files')
+    parser.add_argument('--interval', type=int, default=2,
+                        help='Poll interval in seconds when folder events are unavailable (default: 2)')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('MFI_WORKERS', 1)),
+                        help='Instructions executed concurrently (default: 1, or MFI_WORKERS)')
+    parser.add_argument('--limit', action='append', metavar='ACTION=N',
+                        help='Cap concurrent instructions of one action, e.g. --limit copy=4 (repeatable)')
+    parser.add_argument('--mode', choices=('auto', 'win32', 'inotify', 'poll'), default='auto',
+                        help='pending/ change detection (default: auto — inotify on Linux, '
+                             'polling on Windows; win32 opts in to ReadDirectoryChangesW)')
     args = parser.parse_args()
-    run(watch=args.watch, interval=args.interval)
\ No newline at end of file
+    run(watch=args.watch, interval=args.interval, workers=args.workers,
+        limits=_parse_limits(args.limit), mode=args.mode)
@@ -25,12 +25,12 @@ TEST_FILES = [
 ]
 
 def clean_mfi_queues():
-    """Wipe all test MFI files from pending/processing/completed."""
+    """Wipe all test MFI files from pending/processing/completed/processed."""
     from dotenv import load_dotenv
     load_dotenv()
     
     mfi_root = Path(os.getenv('MFI_PATH', 'C:/Users/termi/MetaFileQueues'))
-    folders = ['pending', 'processing', 'completed']
+    folders = ['pending', 'processing', 'completed', 'processed']
     
     print("\nCleaning MFI queues...")
     for folder in folders:
@@ -45,6 +45,19 @@ def clean_mfi_queues():
             print(f"  Removed: {f}")
     print("MFI queues clean.")
 
+def clean_scan_manifest():
+    """Delete the incremental discovery snapshot — it describes the graph being reset."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # same default as app/shared/mfi_scan.py SCAN_DB
+    db = Path(os.getenv('MFI_SCAN_DB') or Path.home() / '.mfi_scan.db')
+    print("\nCleaning scan manifest...")
+    for f in (db, db.with_name(db.name + '-wal'), db.with_name(db.name + '-shm')):
+        if f.exists():
+            f.unlink()
+            print(f"  Removed: {f}")
+
 def create_empty_pdf(filepath: Path):
     """Create a minimal valid PDF file."""
     filepath.write_bytes(
@@ -57,6 +70,7 @@ def create_empty_pdf(filepath: Path):
 
 def reset():
     clean_mfi_queues()
+    clean_scan_manifest()
     print("Creating test directories...")
     for d in [TEST_DIR, ARCHIVE_DIR, BACKUP_DIR]:
         d.mkdir(parents=True, exist_ok=True)
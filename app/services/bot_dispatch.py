@@ -0,0 +1,228 @@
+"""
+bot_dispatch.py — in-process dispatch table for /bots/execute.
+
+bot-id → resolved callable. Built from every BotFunction node in one query;
+each callable is imported once and reused, so a bot call costs a dict lookup
+instead of a Neo4j round trip plus importlib.
+
+Staleness:
+- register_bots bumps (:BotRegistry).version and invalidates this process's
+  table directly.
+- Other processes compare the graph version at most every
+  VERSION_CHECK_INTERVAL seconds and rebuild when it moved.
+- A bot-id the table does not know falls back to a single-bot lookup, so a
+  bot registered a moment ago is callable before the next version check.
+
+Resolved callables are wrapped in bot_logger.timed, so every call through the
+table logs its duration and result size.
+
+execute_batch runs a list of bot calls for /bots/execute_batch — see there.
+Whether a bot only reads comes from its BotFunction node (read_only, set by
+register_bots from the bot file's READ_ONLY declaration), never from its name.
+"""
+
+import os
+import time
+import inspect
+import threading
+import importlib
+
+from app.bots.bot_logger import timed
+from app.services.neo4j_service import get_session, get_bot_functions, get_bot_registry_version
+
+VERSION_CHECK_INTERVAL = float(os.environ.get('BOT_TABLE_CHECK_INTERVAL', 5))  # seconds
+BATCH_MAX_CALLS        = 50
+
+
+class BotNotFound(LookupError):
+    """No BotFunction node for the bot-id."""
+
+
+class BotResolveError(Exception):
+    """The BotFunction exists but its module/function cannot be resolved."""
+
+
+class BotDispatchTable:
+    """Resolved bot callables keyed by bot-id, with hit/miss counters."""
+
+    def __init__(self, loader=get_bot_functions, versioner=get_bot_registry_version,
+                 check_interval: float = VERSION_CHECK_INTERVAL):
+        self._loader         = loader
+        self._versioner      = versioner
+        self._check_interval = check_interval
+        self._lock           = threading.Lock()
+        self._entries        = {}      # bot-id → (module, function, read_only)
+        self._callables      = {}      # bot-id → resolved function
+        self._version        = None    # graph version the table was built at
+        self._loaded         = False
+        self._last_check     = 0.0
+        self._stats = {'hits': 0, 'misses': 0, 'loads': 0,
+                       'invalidations': 0, 'version_checks': 0, 'not_found': 0}
+
+    # ── Build / invalidate ────────────────────────────────────────────────
+
+    def load(self) -> int:
+        """Rebuild from every BotFunction node. Returns the number of bots."""
+        version = self._versioner()
+        rows = self._loader()
+        entries = {row['bot_id']: (row['module'], row['function'], bool(row.get('read_only')))
+                   for row in rows}
+        callables = {}
+        for bot_id, (module, function, _) in entries.items():
+            try:
+                callables[bot_id] = self._import(bot_id, module, function)
+            except BotResolveError:
+                pass                    # reported when the bot is actually called
+        with self._lock:
+            self._entries    = entries
+            self._callables  = callables
+            self._version    = version
+            self._loaded     = True
+            self._last_check = time.monotonic()
+            self._stats['loads'] += 1
+        return len(entries)
+
+    def invalidate(self):
+        """Drop the table — the next call rebuilds it."""
+        with self._lock:
+            self._loaded = False
+            self._entries, self._callables = {}, {}
+            self._stats['invalidations'] += 1
+
+    def _stale(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if not self._loaded:
+                return True
+            if now - self._last_check < self._check_interval:
+                return False
+            self._last_check = now
+            self._stats['version_checks'] += 1
+            version = self._version
+        return self._versioner() != version
+
+    # ── Resolve ───────────────────────────────────────────────────────────
+
+    def resolve(self, bot_id: str):
+        """Callable for `bot_id`. Raises BotNotFound / BotResolveError."""
+        if self._stale():
+            self.load()
+        with self._lock:
+            func = self._callables.get(bot_id)
+            if func is not None:
+                self._stats['hits'] += 1
+                return func
+            self._stats['misses'] += 1
+            entry = self._entries.get(bot_id)
+
+        if entry is None:
+            rows = self._loader(bot_id)
+            if not rows:
+                with self._lock:
+                    self._stats['not_found'] += 1
+                raise BotNotFound(f"Bot not found: {bot_id}")
+            entry = (rows[0]['module'], rows[0]['function'], bool(rows[0].get('read_only')))
+
+        func = self._import(bot_id, entry[0], entry[1])
+        with self._lock:
+            self._entries[bot_id]   = entry
+            self._callables[bot_id] = func
+        return func
+
+    def is_read_only(self, bot_id: str) -> bool:
+        """True only for bots registered read_only — unknown bots count as writes."""
+        with self._lock:
+            entry = self._entries.get(bot_id)
+        return bool(entry and entry[2])
+
+    @staticmethod
+    def _import(bot_id: str, module_path: str, function_name: str):
+        if not module_path or not function_name:
+            raise BotResolveError(f"Bot {bot_id} missing module or function metadata")
+        try:
+            module = importlib.import_module(module_path)
+        except ImportError as e:
+            raise BotResolveError(f"Failed to import {module_path}: {str(e)}") from e
+        try:
+            func = getattr(module, function_name)
+        except AttributeError as e:
+            raise BotResolveError(f"Function {function_name} not found in {module_path}: {str(e)}") from e
+        return timed(bot_id)(func)  # duration_ms / result_size per call, logged off-thread
+
+    # ── Metrics ───────────────────────────────────────────────────────────
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(size=len(self._entries), resolved=len(self._callables),
+                         version=self._version, loaded=self._loaded)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
+
+
+bot_table = BotDispatchTable()
+
+
+# ── Batch execution ───────────────────────────────────────────────────────────
+
+def _accepts_session(func) -> bool:
+    try:
+        return 'session' in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _call(bot_id: str, func, params: dict, session, read_only: bool = False) -> dict:
+    """
+    One bot call → {bot_id, ok, result} or {bot_id, ok: False, error, status}.
+    A read_only bot gets a read transaction on `session` in place of the session.
+    """
+    params = dict(params or {})
+    params.pop('persona', None)  # Strip bridge-injected metadata — bot functions don't accept this
+    params.pop('session', None)  # sessions are ours to hand out, never the caller's
+    try:
+        if session is None or not _accepts_session(func):
+            result = func(**params)
+        elif read_only:
+            result = session.execute_read(lambda tx: func(**params, session=tx))
+        else:
+            result = func(**params, session=session)
+        return {'bot_id': bot_id, 'ok': True, 'result': result}
+    except TypeError as e:
+        return {'bot_id': bot_id, 'ok': False, 'status': 400,
+                'error': f"Invalid parameters for {bot_id}: {str(e)}"}
+    except Exception as e:
+        return {'bot_id': bot_id, 'ok': False, 'status': 500,
+                'error': f"Execution failed for {bot_id}: {str(e)}"}
+
+
+def execute_batch(calls: list, table: 'BotDispatchTable' = None) -> list[dict]:
+    """
+    Run [{bot_id, params}, ...] and return one outcome per call, in order.
+
+    Calls are resolved up front, then run one at a time on a single shared
+    session, in request order — a call sees every write listed before it.
+    Bots registered read_only run in a managed read transaction
+    (execute_read) on that session; every other bot gets the session itself.
+    """
+    table = table or bot_table
+    outcomes = [None] * len(calls)
+    resolved = []                                   # (index, bot_id, func, params)
+    for index, call in enumerate(calls):
+        bot_id = call.get('bot_id') if isinstance(call, dict) else None
+        if not bot_id:
+            outcomes[index] = {'bot_id': bot_id, 'ok': False, 'status': 400, 'error': 'bot_id required'}
+            continue
+        try:
+            resolved.append((index, bot_id, table.resolve(bot_id), call.get('params') or {}))
+        except BotNotFound as e:
+            outcomes[index] = {'bot_id': bot_id, 'ok': False, 'status': 404, 'error': str(e)}
+        except BotResolveError as e:
+            outcomes[index] = {'bot_id': bot_id, 'ok': False, 'status': 500, 'error': str(e)}
+
+    with get_session() as session:
+        for index, bot_id, func, params in resolved:
+            outcomes[index] = _call(bot_id, func, params, session, table.is_read_only(bot_id))
+
+    return outcomes
@@ -0,0 +1,269 @@
+"""
+export_service — GFN export from the graph to app/Schema.
+
+Rows stream from the Cypher cursor through iter_serialize_gfn into a temp file
+in the export folder, so memory stays flat as the graph grows. The finished
+file is renamed to the next versioned name, then linked (or copied) over the
+_000 active name — readers never see a half-written GFN.
+
+Incremental exports:
+    full     GFN-busCard-dropbox_NNN.yaml        every master; new baseline
+    delta    GFN-busCard-dropbox_delta_NNN.yaml  masters stamped (updated_at)
+                                                 since the last export, plus
+                                                 `deleted: true` tombstones
+    compact  folds the baseline + deltas into a new full snapshot
+
+The manifest sidecar (GFN-busCard-dropbox.manifest.json) holds the baseline
+name, the deltas since, and the high-water mark: the graph timestamp taken
+when the last export started. A delta reads from DELTA_OVERLAP_MS before the
+mark — a write stamped before the mark but committed after the previous export
+read it is still picked up; the fold keeps the latest copy of a re-exported
+record. Deltas are export-only — /load expects a full snapshot.
+
+Background exports report progress through the result queue: the SSE
+/sse/watch stream relays {'status': 'running', 'records': n} until the final
+'completed' / 'failed' result lands.
+"""
+import os
+import re
+import json
+import shutil
+import tempfile
+import threading
+from itertools import chain
+from datetime import datetime
+from pathlib import Path
+
+from app.services.neo4j_service import iter_export_nodes, iter_deleted_file_node_ids, graph_timestamp
+from app.services.schema_service import load_mfn, iter_serialize_gfn, iter_gfn_blocks, parse_gfn_record
+from app.services.mfi_broker import push_result
+
+EXPORT_MFN      = os.path.join('app', 'Schema', 'MFN-busCard.yaml')
+EXPORT_PREFIX   = 'GFN-busCard-dropbox'
+PROGRESS_EVERY  = 500   # records between progress pushes
+DELTA_OVERLAP_MS = 60_000  # re-read window behind the high-water mark — longer than any write transaction
+
+# version choice, rename, publish and manifest update — concurrent exports never share a name
+_publish_lock = threading.Lock()
+
+
+# ── Files ──────────────────────────────────────────────────────────────────────
+
+def _next_versioned(export_dir: Path, prefix: str) -> Path:
+    pattern = re.compile(re.escape(prefix) + r'_(\d{3,})\.yaml$')
+    versions = [int(m.group(1)) for p in export_dir.glob(f"{prefix}_*.yaml")
+                if (m := pattern.match(p.name))]
+    return export_dir / f"{prefix}_{max(versions, default=0) + 1:03d}.yaml"
+
+
+def _claim_versioned(export_dir: Path, prefix: str, tmp_path: Path) -> Path:
+    """
+    Move tmp_path to the next free versioned name. The name is created with
+    O_EXCL first, so another process exporting to the same folder cannot
+    take it either. Caller holds _publish_lock.
+    """
+    while True:
+        versioned = _next_versioned(export_dir, prefix)
+        try:
+            os.close(os.open(versioned, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue   # taken since the listing — the next listing sees it
+        os.replace(tmp_path, versioned)
+        return versioned
+
+
+def _publish_active(versioned: Path, active: Path):
+    """Point the active name at the versioned file — hardlink, copy if links fail."""
+    staging = active.with_name(active.name + '.tmp')
+    staging.unlink(missing_ok=True)
+    try:
+        os.link(versioned, staging)
+    except OSError:
+        shutil.copyfile(versioned, staging)
+    os.replace(staging, active)
+
+
+def _write_chunks(export_dir: Path, prefix: str, chunks) -> Path:
+    """Write text chunks to a temp file in export_dir. Returns its path, fsynced."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{prefix}_", suffix='.tmp', dir=export_dir)
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+            fh.flush()
+            os.fsync(fh.fileno())
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+def _manifest_path(export_dir: Path, prefix: str) -> Path:
+    return export_dir / f"{prefix}.manifest.json"
+
+
+def load_manifest(export_dir: Path, prefix: str = EXPORT_PREFIX) -> dict | None:
+    path = _manifest_path(export_dir, prefix)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _save_manifest(export_dir: Path, prefix: str, manifest: dict):
+    path = _manifest_path(export_dir, prefix)
+    staging = path.with_name(path.name + '.tmp')
+    staging.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    os.replace(staging, path)
+
+
+def _counted(rows, counter: dict, key: str, progress=None):
+    for row in rows:
+        counter[key] += 1
+        if progress and counter[key] % PROGRESS_EVERY == 0:
+            progress(counter[key])
+        yield row
+
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+
+def export_gfn(mfn_path: str = EXPORT_MFN, prefix: str = EXPORT_PREFIX, progress=None) -> dict:
+    """
+    Stream every master FileNode to a new versioned GFN and make it the active one.
+    The snapshot becomes the delta baseline.
+    progress: optional callback(records_written) every PROGRESS_EVERY records.
+    """
+    export_dir = Path(os.path.dirname(mfn_path))
+    mfn = load_mfn(mfn_path)
+    counts = {'records': 0}
+    high_water = graph_timestamp()   # taken first — later writes land in the next delta
+
+    rows = _counted(iter_export_nodes(), counts, 'records', progress)
+    tmp_path = _write_chunks(export_dir, prefix, iter_serialize_gfn(rows, mfn))
+
+    active = export_dir / f"{prefix}_000.yaml"
+    with _publish_lock:
+        versioned = _claim_versioned(export_dir, prefix, tmp_path)
+        _publish_active(versioned, active)
+        _save_manifest(export_dir, prefix, {
+            'snapshot': versioned.name, 'high_water': high_water, 'deltas': []})
+    return {
+        'status':    'ok',
+        'mode':      'full',
+        'records':   counts['records'],
+        'versioned': versioned.name,
+        'active':    active.name,
+    }
+
+
+def export_delta(mfn_path: str = EXPORT_MFN, prefix: str = EXPORT_PREFIX, progress=None) -> dict:
+    """
+    Write only the masters changed since the manifest's high-water mark, plus
+    tombstones for removed ids. Falls back to a full export without a baseline.
+    """
+    export_dir = Path(os.path.dirname(mfn_path))
+    manifest = load_manifest(export_dir, prefix)
+    if manifest is None:
+        return export_gfn(mfn_path, prefix, progress)
+
+    mfn = load_mfn(mfn_path)
+    since = manifest['high_water'] - DELTA_OVERLAP_MS
+    high_water = graph_timestamp()
+    counts = {'records': 0, 'deleted': 0}
+
+    # tombstones first — an id deleted and re-created since is kept by the fold
+    tombstones = ({'node': {'FILE-NODE-id': node_id, 'deleted': True}}
+                  for node_id in iter_deleted_file_node_ids(since))
+    rows = chain(_counted(tombstones, counts, 'deleted'),
+                 _counted(iter_export_nodes(since=since), counts, 'records', progress))
+    tmp_path = _write_chunks(export_dir, prefix, iter_serialize_gfn(rows, mfn))
+
+    delta = None
+    with _publish_lock:
+        # re-read — another export may have saved the manifest while this one streamed
+        manifest = load_manifest(export_dir, prefix) or manifest
+        if counts['records'] or counts['deleted']:
+            delta = _claim_versioned(export_dir, f"{prefix}_delta", tmp_path)
+            manifest['deltas'].append({'file': delta.name, 'high_water': high_water, **counts})
+        else:
+            tmp_path.unlink()
+        manifest['high_water'] = max(manifest['high_water'], high_water)
+        _save_manifest(export_dir, prefix, manifest)
+    return {
+        'status':   'ok',
+        'mode':     'delta',
+        **counts,
+        'delta':    delta.name if delta else None,
+        'baseline': manifest['snapshot'],
+    }
+
+
+def compact_gfn(mfn_path: str = EXPORT_MFN, prefix: str = EXPORT_PREFIX, prune: bool = False) -> dict:
+    """
+    Fold the baseline snapshot and its deltas into a new full snapshot — no
+    graph access. Records are spliced as raw text, so unchanged records keep
+    their exact bytes. prune=True deletes the folded delta files.
+    """
+    export_dir = Path(os.path.dirname(mfn_path))
+    manifest = load_manifest(export_dir, prefix)
+    if manifest is None:
+        raise FileNotFoundError(f"No export manifest in {export_dir} — run a full export first")
+    if not manifest['deltas']:
+        return {'status': 'ok', 'folded': 0, 'snapshot': manifest['snapshot']}
+
+    records = {}   # FILE-NODE-id → raw lines
+    for node_id, lines in iter_gfn_blocks(export_dir / manifest['snapshot']):
+        records[node_id] = lines
+    for delta in manifest['deltas']:
+        for node_id, lines in iter_gfn_blocks(export_dir / delta['file']):
+            node = parse_gfn_record(node_id, lines)
+            if node.get('deleted') is True:
+                records.pop(node_id, None)
+                continue
+            records[node_id] = lines
+            # a master that became a copy is now exported inside this record
+            for entry in node.get('_related', []):
+                records.pop(entry['node'].get('FILE-NODE-id'), None)
+
+    chunks = ((("\n" if i else "") + "".join(records[node_id]).rstrip("\n") + "\n")
+              for i, node_id in enumerate(sorted(records)))
+    tmp_path = _write_chunks(export_dir, prefix, chunks)
+    active = export_dir / f"{prefix}_000.yaml"
+    with _publish_lock:
+        versioned = _claim_versioned(export_dir, prefix, tmp_path)
+        _publish_active(versioned, active)
+
+        # deltas written while this fold ran stay on top of the new snapshot
+        folded = [d['file'] for d in manifest['deltas']]
+        current = load_manifest(export_dir, prefix) or manifest
+        _save_manifest(export_dir, prefix, {
+            'snapshot': versioned.name, 'high_water': current['high_water'],
+            'deltas': [d for d in current['deltas'] if d['file'] not in folded]})
+    if prune:
+        for name in folded:
+            (export_dir / name).unlink(missing_ok=True)
+    return {
+        'status':    'ok',
+        'folded':    len(folded),
+        'records':   len(records),
+        'versioned': versioned.name,
+        'active':    active.name,
+    }
+
+
+def start_export(mfn_path: str = EXPORT_MFN, prefix: str = EXPORT_PREFIX, mode: str = 'full') -> str:
+    """Run an export on a background thread. Returns the id to watch on /sse/watch."""
+    export = export_delta if mode == 'delta' else export_gfn
+    export_id = f"export-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+
+    def run():
+        try:
+            summary = export(mfn_path, prefix, progress=lambda n: push_result(
+                export_id, {'status': 'running', 'records': n}))
+            push_result(export_id, {**summary, 'status': 'completed'})
+        except Exception as e:
+            print(f"[export] ERROR: {e}")
+            push_result(export_id, {'status': 'failed', 'error': str(e)})
+
+    threading.Thread(target=run, daemon=True, name=export_id).start()
+    return export_id
@@ -6,7 +6,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import Callable, Optional, Tuple
 from app.scripts.mfn_search_dir import MetaFileNodeSchema
-from app.services.schema_service import load_mfn, parse_gfn, map_properties, get_src_folders
+from app.services.schema_service import load_mfn, iter_gfn, map_properties, tap_src_folders
 from app.shared.mfi_shared import DiscoveryMFI, write_mfi
 
 def _extract_date_from_string(s: str) -> Optional[Tuple[datetime, int, int]]:
@@ -59,11 +59,16 @@ def _is_unique_file_node_id(session, proposed_id: str) -> bool:
     )
     return result.single() is None
 
-def suggest_secondary_id(base_id: str, checker: Callable[[str], bool], max_attempts: int = 100) -> str:
+def suggest_secondary_id(base_id: str, checker: Optional[Callable[[str], bool]] = None,
+        max_attempts: int = 100,
+        allocator=None) -> str:
     """
     Generate a unique secondary node id from a base id.
     Format: base_id_second_01, _02, etc.
+    With an allocator (FileNodeIdAllocator) the id is reserved from its index — no probing.
     """
+    if allocator is not None:
+        return allocator.reserve_secondary(base_id, max_attempts)
     for i in range(1, max_attempts + 1):
         candidate = f"{base_id}_second_{i:02d}"
         if checker(candidate):
@@ -72,9 +77,10 @@ def suggest_secondary_id(base_id: str, checker: Callable[[str], bool], max_attem
 
 
 def suggest_file_node_id(filepath: str,
-        verify_node_uniqueness: Callable[[str], bool],
+        verify_node_uniqueness: Optional[Callable[[str], bool]] = None,
         max_attempts: int = 100,
-        raise_on_missing: bool = True) -> Optional[str]:
+        raise_on_missing: bool = True,
+        allocator=None) -> Optional[str]:
     """
     Propose a FILE-NODE id for `filepath` and ensure uniqueness.
 
@@ -86,11 +92,14 @@ def suggest_file_node_id(filepath: str,
     - Include a sanitized short form of the name (filename without date/suffix) if present.
     - Call `verify_node_uniqueness(proposed_id)`; if it's not unique, append an increment
       (`_1`, `_2`, ...) until unique or `max_attempts` is reached.
+    - With an `allocator` the next free suffix is reserved from its in-process index
+      instead — one graph query per base id, not one per attempt.
 
     Args:
         filepath: path to the file to generate an id for.
         verify_node_uniqueness: callable that returns True when the proposed id is unique/available.
         max_attempts: maximum numeric suffix attempts to find a unique id.
+        allocator: optional FileNodeIdAllocator, used in place of verify_node_uniqueness.
 
     Returns:
         A unique id string.
@@ -154,6 +163,9 @@ def suggest_file_node_id(filepath: str,
     parts.append(date_part)
     proposed = '_'.join(parts)
 
+    if allocator is not None:
+        return allocator.reserve(proposed, max_attempts)
+
     # Ensure uniqueness by asking the provided verifier
     if verify_node_uniqueness(proposed):
         return proposed
@@ -167,9 +179,10 @@ def suggest_file_node_id(filepath: str,
     raise RuntimeError(f"Could not find unique id for '{filepath}' after {max_attempts} attempts")
 
 def suggest_file_node_id_from_result(filepath: str,
-        verify_node_uniqueness: Callable[[str], bool],
+        verify_node_uniqueness: Optional[Callable[[str], bool]],
         mtime: str,
-        max_attempts: int = 100) -> str:
+        max_attempts: int = 100,
+        allocator=None) -> str:
     """
     Propose a FILE-NODE id from a result MFI file entry.
     No filesystem access — uses mtime supplied by the Windows watcher.
@@ -179,6 +192,7 @@ def suggest_file_node_id_from_result(filepath: str,
         verify_node_uniqueness: returns True when proposed id is available
         mtime: date string from watcher e.g. '2026_0227'
         max_attempts: maximum attempts to find unique id
+        allocator: optional FileNodeIdAllocator, used in place of verify_node_uniqueness
     """
     from pathlib import PureWindowsPath
     stem = PureWindowsPath(filepath).stem
@@ -207,6 +221,9 @@ def suggest_file_node_id_from_result(filepath: str,
     parts.append(date_part)
     proposed = '_'.join(parts)
 
+    if allocator is not None:
+        return allocator.reserve(proposed, max_attempts)
+
     if verify_node_uniqueness(proposed):
         return proposed
 
@@ -354,17 +371,15 @@ def load_seed_folders(mfn_path):
         raise FileNotFoundError(f"No GFN YAML found in {mfn_dir}")
     gfn_path = gfn_path[0]
     mfn    = load_mfn(mfn_path)
-    nodes  = parse_gfn(gfn_path)
     # label  = mfn.get('name', 'Business Card').replace(' ', '') # fallback removed
     label = mfn.get('label')
     if not label:
         raise ValueError(f"MFN missing required 'label' field: {mfn_path}")
-    mapped = [map_properties(mfn, n) for n in nodes]
-    # DEBUG print(f"[debug] nodes: {len(nodes)}, mapped: {len(mapped)}")
-    # if mapped:
-    #     print(f"[debug] first mapped: {mapped[0]}")
+    # Streamed: GFN records are parsed, mapped and imported batch by batch.
+    # Source folders are collected on the way through.
+    folders = []
+    mapped = tap_src_folders((map_properties(mfn, n) for n in iter_gfn(gfn_path)), folders)
     load_gfn_nodes(mfn, label, mapped)
-    folders = get_src_folders(mapped)
     return folders, mfn
 
 
@@ -373,11 +388,11 @@ def dispatch_discovery(folder: str, mfn: dict) -> str:
     Write a DiscoveryMFI to pending/ and create a Dispatch node.
     Returns mfi_id for SSE tracking.
     """
-    from app.services.neo4j_service import create_dispatch_node
+    from app.services.neo4j_service import create_dispatch_node, get_filenode_epoch
     mfn_id   = mfn.get('MFN-id', '')
     patterns = [p['pattern_value'] for p in json.loads(mfn.get('patterns', '[]'))
             if p.get('pattern_type') == 'filename_contains']
-    mfi = DiscoveryMFI(mfn_id=mfn_id, source=folder, patterns=patterns)
+    mfi = DiscoveryMFI(mfn_id=mfn_id, source=folder, patterns=patterns, epoch=get_filenode_epoch())
     write_mfi(mfi)
     create_dispatch_node(mfi.mfi_id, mfi.action, mfn_id, folder)  # ⚠️ confirm signature
     return mfi.mfi_id
@@ -0,0 +1,139 @@
+"""
+id_allocator.py — in-process FILE-NODE-id reservation index.
+
+suggest_file_node_id and suggest_secondary_id used to probe Neo4j once per
+candidate (base, base_1, base_2, ...). The allocator loads the ids that start
+with a base id once, keeps their numeric suffixes as a sorted list, and finds
+the next free suffix by binary search. Handed-out ids are reserved in the
+index under a lock, so concurrent batches never receive the same id.
+
+No Neo4j here — the loader is injected:
+    loader(prefix) -> iterable of existing FILE-NODE-ids starting with prefix
+
+Anything that writes ids without going through the allocator (GFN import,
+discovery, deletes, renames) must call invalidate(). Handed-out ids survive
+invalidate() for `ttl` seconds — an id issued to a batch that has not written
+it yet is not in the graph, so a reload alone would hand it out again.
+"""
+
+import re
+import time
+import bisect
+import threading
+from typing import Callable, Iterable
+
+CACHE_TTL = 300  # seconds — reload a base from the graph after this long
+
+
+def _first_free(taken: list[int], start: int) -> int:
+    """Smallest int >= start missing from sorted, unique `taken`. O(log n)."""
+    lo = bisect.bisect_left(taken, start)
+    # taken[lo:] is dense from `start` up to the first gap: taken[i] == start + (i - lo)
+    a, b = lo, len(taken)
+    while a < b:
+        mid = (a + b) // 2
+        if taken[mid] == start + (mid - lo):
+            a = mid + 1
+        else:
+            b = mid
+    return start + (a - lo)
+
+
+class FileNodeIdAllocator:
+    """Reserve unique FILE-NODE-ids against a per-base sorted suffix index."""
+
+    # key → (separator, first suffix, format)
+    #   plain:     base, base_1, base_2, ...       (0 is the bare base id)
+    #   secondary: base_second_01, _02, ...
+    _PLAIN     = ('_', 0, lambda base, i: base if i == 0 else f"{base}_{i}")
+    _SECONDARY = ('_second_', 1, lambda base, i: f"{base}_second_{i:02d}")
+
+    def __init__(self, loader: Callable[[str], Iterable[str]], ttl: float = CACHE_TTL):
+        self._loader = loader
+        self._ttl    = ttl
+        self._taken  = {}   # (base, sep) → sorted list[int]
+        self._loaded = {}   # (base, sep) → monotonic load time
+        self._issued = {}   # id → monotonic issue time — guards overlap between bases and reloads
+        self._lock   = threading.Lock()
+
+    def reserve(self, base_id: str, max_attempts: int = 100) -> str:
+        """base_id if free, else base_id_N with the smallest free N."""
+        node_id = self._reserve(base_id, self._PLAIN, max_attempts)
+        if node_id is None:
+            raise RuntimeError(f"Could not find unique id for '{base_id}' after {max_attempts} attempts")
+        return node_id
+
+    def reserve_secondary(self, base_id: str, max_attempts: int = 100) -> str:
+        """base_id_second_NN with the smallest free NN."""
+        node_id = self._reserve(base_id, self._SECONDARY, max_attempts)
+        if node_id is None:
+            raise ValueError(f"Could not generate unique secondary id from {base_id} after {max_attempts} attempts")
+        return node_id
+
+    def claim(self, node_id: str) -> bool:
+        """Reserve exactly `node_id`. False if it is already taken."""
+        sep, _, _ = self._PLAIN
+        with self._lock:
+            taken = self._index(node_id, sep)
+            if (taken and taken[0] == 0) or self._is_issued(node_id):
+                return False
+            bisect.insort(taken, 0)
+            self._issued[node_id] = time.monotonic()
+            return True
+
+    def invalidate(self):
+        """
+        Drop every cached base — the next request reloads from the graph.
+        Issued ids are kept until their TTL runs out; they may not be written yet.
+        """
+        with self._lock:
+            self._taken.clear()
+            self._loaded.clear()
+            cutoff = time.monotonic() - self._ttl
+            self._issued = {i: t for i, t in self._issued.items() if t > cutoff}
+
+    def _is_issued(self, node_id: str) -> bool:
+        """Handed out within the TTL. Caller holds the lock."""
+        issued = self._issued.get(node_id)
+        if issued is None:
+            return False
+        if time.monotonic() - issued > self._ttl:
+            del self._issued[node_id]   # written by now — the graph index has it
+            return False
+        return True
+
+    def _reserve(self, base_id: str, scheme, max_attempts: int) -> str | None:
+        sep, start, fmt = scheme
+        with self._lock:
+            taken = self._index(base_id, sep)
+            while True:
+                suffix = _first_free(taken, start)
+                if suffix > max_attempts:
+                    return None
+                bisect.insort(taken, suffix)
+                node_id = fmt(base_id, suffix)
+                if not self._is_issued(node_id):
+                    self._issued[node_id] = time.monotonic()
+                    return node_id
+
+    def _index(self, base_id: str, sep: str) -> list[int]:
+        """Sorted suffix list for (base, sep), loading it once per TTL. Caller holds the lock."""
+        key = (base_id, sep)
+        loaded = self._loaded.get(key)
+        if loaded is None or time.monotonic() - loaded > self._ttl:
+            self._taken[key] = self._load(base_id, sep)
+            self._loaded[key] = time.monotonic()
+        return self._taken[key]
+
+    def _load(self, base_id: str, sep: str) -> list[int]:
+        pattern = re.compile(re.escape(base_id + sep) + r'(\d+)$')
+        suffixes = set()
+        for node_id in self._loader(base_id):
+            if node_id == base_id:
+                if sep == self._PLAIN[0]:
+                    suffixes.add(0)
+                continue
+            m = pattern.match(node_id)
+            if m:
+                suffixes.add(int(m.group(1)))
+        return sorted(suffixes)
@@ -2,110 +2,235 @@
 mfi_broker — Flask-side background thread.
 Watches completed/ for result MFIs, routes to the correct processor,
 records processed mfi_ids in the result queue for SSE consumers.
-Dead letters pruned daily.
+Dead letters expire after RESULT_TTL; the queue is bounded.
 """
+import os
 import time
 import threading
+from collections import OrderedDict
 
 # ── Result queue ───────────────────────────────────────────────────────────────
 # One writer (mfi_broker), many readers (SSE streams)
-# Key: mfi_id, Value: { result: dict, created: float }
-_result_queue = {}
-_queue_lock   = threading.Lock()
+# Bounded: RESULT_MAX_ENTRIES total, oldest evicted first; entries older than
+# RESULT_TTL expire. Sharded by mfi_id so push_result only contends with
+# readers of the same shard.
+RESULT_MAX_ENTRIES = 10_000
+RESULT_TTL         = 86400  # entries older than 24 hours are stale
+RESULT_SHARDS      = 16
+
+
+class _Shard:
+    __slots__ = ('lock', 'entries', 'subscribers')
+
+    def __init__(self):
+        self.lock        = threading.Lock()
+        # Key: mfi_id, Value: { result: dict, created: float } — oldest first
+        self.entries     = OrderedDict()
+        # Key: mfi_id, Value: set of Events to wake when that result lands
+        self.subscribers = {}
+
+
+class ResultStore:
+    """
+    Bounded, time-ordered result store for SSE consumers.
+
+    Each shard keeps entries in insertion order, which is also `created` order,
+    so expiry pops from the old end and stops at the first live entry —
+    O(expired), not O(n). Over capacity, the oldest entries are evicted.
+    """
+
+    def __init__(self, max_entries: int = RESULT_MAX_ENTRIES, ttl: float = RESULT_TTL,
+                 shards: int = RESULT_SHARDS):
+        self.ttl        = ttl
+        self._per_shard = max(1, max_entries // shards)
+        self._shards    = [_Shard() for _ in range(shards)]
+        self.evicted    = 0
+        self.expired    = 0
+
+    def _shard(self, mfi_id: str) -> _Shard:
+        return self._shards[hash(mfi_id) % len(self._shards)]
+
+    def push(self, mfi_id: str, result: dict):
+        shard = self._shard(mfi_id)
+        now = time.time()
+        with shard.lock:
+            shard.entries.pop(mfi_id, None)          # re-push moves to the new end
+            shard.entries[mfi_id] = {'result': result, 'created': now}
+            self._expire(shard, now)
+            while len(shard.entries) > self._per_shard:
+                shard.entries.popitem(last=False)
+                self.evicted += 1
+            for event in shard.subscribers.get(mfi_id, ()):
+                event.set()
+
+    def pop(self, mfi_id: str) -> dict | None:
+        shard = self._shard(mfi_id)
+        with shard.lock:
+            entry = shard.entries.pop(mfi_id, None)
+            return entry['result'] if entry else None
+
+    def peek(self, mfi_id: str) -> bool:
+        shard = self._shard(mfi_id)
+        with shard.lock:
+            return mfi_id in shard.entries
+
+    def subscribe(self, mfi_ids) -> threading.Event:
+        event = threading.Event()
+        for mfi_id in mfi_ids:
+            shard = self._shard(mfi_id)
+            with shard.lock:
+                shard.subscribers.setdefault(mfi_id, set()).add(event)
+                if mfi_id in shard.entries:
+                    event.set()
+        return event
+
+    def unsubscribe(self, mfi_ids, event: threading.Event):
+        for mfi_id in mfi_ids:
+            shard = self._shard(mfi_id)
+            with shard.lock:
+                waiting = shard.subscribers.get(mfi_id)
+                if waiting is None:
+                    continue
+                waiting.discard(event)
+                if not waiting:
+                    del shard.subscribers[mfi_id]
+
+    def expire(self) -> int:
+        """Drop stale entries from every shard. Returns how many were dropped."""
+        now = time.time()
+        dropped = 0
+        for shard in self._shards:
+            with shard.lock:
+                dropped += self._expire(shard, now)
+        return dropped
+
+    def _expire(self, shard: _Shard, now: float) -> int:
+        # caller holds shard.lock
+        dropped = 0
+        while shard.entries:
+            mfi_id, entry = next(iter(shard.entries.items()))
+            if now - entry['created'] <= self.ttl:
+                break
+            del shard.entries[mfi_id]
+            dropped += 1
+        self.expired += dropped
+        return dropped
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+_result_queue = ResultStore()
 
 def push_result(mfi_id: str, result: dict):
-    with _queue_lock:
-        _result_queue[mfi_id] = {'result': result, 'created': time.time()}
-        # DEBUG print(f"[mfi_broker] push_result: {mfi_id} — queue id: {id(_result_queue)} depth: {len(_result_queue)}")
+    _result_queue.push(mfi_id, result)
+    # DEBUG print(f"[mfi_broker] push_result: {mfi_id} — depth: {len(_result_queue)}")
 
 def pop_result(mfi_id: str) -> dict | None:
     """Return and remove result if present, None if not yet ready."""
-    with _queue_lock:
-        entry = _result_queue.pop(mfi_id, None)
-        # DEBUG print(f"[mfi_broker] pop_result: {entry} — queue id: {id(_result_queue)} depth: {len(_result_queue)}")
-        return entry['result'] if entry else None
+    return _result_queue.pop(mfi_id)
 
 def peek_result(mfi_id: str) -> bool:
     """Check if a result is ready without consuming it."""
-    with _queue_lock:
-        return mfi_id in _result_queue
+    return _result_queue.peek(mfi_id)
+
+def subscribe(mfi_ids) -> threading.Event:
+    """
+    Register interest in results for mfi_ids.
+    The returned Event is set whenever one of them is pushed — already set if
+    a result is waiting. Clear it before popping, then wait again.
+    """
+    return _result_queue.subscribe(mfi_ids)
+
+def unsubscribe(mfi_ids, event: threading.Event):
+    _result_queue.unsubscribe(mfi_ids, event)
 
 
 # ── Prune ──────────────────────────────────────────────────────────────────────
-PRUNE_INTERVAL = 86400  # run prune once per day
-PRUNE_MAX_AGE  = 86400  # entries older than 24 hours are stale
-_last_prune    = time.time()
+# Cheap enough to run on every broker wake-up — only expired entries are touched.
 
 def _prune_queue():
-    global _last_prune
-    now = time.time()
-    if now - _last_prune < PRUNE_INTERVAL:
-        return
-    with _queue_lock:
-        stale = [k for k, v in _result_queue.items()
-                 if now - v['created'] > PRUNE_MAX_AGE]
-        for k in stale:
-            _result_queue.pop(k)
-        if stale:
-            print(f"[mfi_broker] pruned {len(stale)} stale queue entries")
-    _last_prune = now
+    expired = _result_queue.expire()
+    if expired:
+        print(f"[mfi_broker] pruned {expired} stale queue entries")
 
 
 # ── Broker loop ────────────────────────────────────────────────────────────────
-POLL_INTERVAL = 2  # seconds
+# The watcher lists completed/ every POLL_INTERVAL by default. completed/ is the
+# docker-compose bind mount from the Windows host: inotify_init succeeds there
+# but Windows-side writes raise no events, so 'auto' would pick inotify and only
+# see results on the 60 s rescan. Set MFI_BROKER_MODE=inotify (or auto) only
+# where completed/ is a native Linux folder. Files are routed by filename
+# prefix only — nothing is decoded until the matching processor runs.
+BROKER_MODE   = os.getenv('MFI_BROKER_MODE', 'poll')   # poll | inotify | auto
+POLL_INTERVAL = 2   # seconds — polling watcher only
+WAKE_INTERVAL = 60  # seconds — upper bound on an idle wait, keeps pruning alive
+
+# filename action prefix → per-file processor in neo4j_service
+RESULT_PROCESSORS = {
+    'scan_directory_result': 'process_discovery_result',
+    'copy_result':           'process_copy_result',
+    'move_result':           'process_move_result',
+    'batch_result':          'process_batch_result',
+}
+
+def _dispatch(paths: list) -> None:
+    """
+    Hand each result file to its per-file processor. Other actions are left alone.
+    Routed by filename (classify) and claimed first, so a file a /process
+    sweep is already handling — or one already archived — is skipped unopened.
+    """
+    from app.shared.mfi_shared import classify, claims
+    from app.services import neo4j_service
+
+    for action, group in classify(paths).items():
+        processor = RESULT_PROCESSORS.get(action)
+        if not processor:
+            continue
+        process = getattr(neo4j_service, processor)
+        for path in group:
+            if not claims.claim(path):
+                # DEBUG print(f"[mfi_broker] skipped {path.name} — claimed or already processed")
+                continue
+            try:
+                if path.exists():
+                    result = process(path)
+                    # DEBUG print(f"[mfi_broker] {path.name}: {result}")
+            except Exception as e:
+                print(f"[mfi_broker] ERROR: {path.name} — {e}")
+            finally:
+                claims.release(path)
+
 
 def _mfi_broker_loop():
-    from app.shared.mfi_shared import (
-        decode, completed_path,
-        DiscoveryResultMFI, CopyResultMFI, MoveResultMFI
-    )
-    from app.services.neo4j_service import (
-        process_discovery_results,
-        process_copy_results,
-        process_move_results
-    )
-
-    print("[mfi_broker] started")
+    from app.shared.mfi_shared import completed_path
+    from app.shared.mfi_events import watch_directory
 
-    while True:
+    watcher = None
+    while watcher is None:
         try:
             completed = completed_path()
-            if completed.exists():
-                mfi_files = list(completed.glob('*.mfi'))
-                processable = [f for f in mfi_files if isinstance(decode(str(f)), 
-                    (DiscoveryResultMFI, CopyResultMFI, MoveResultMFI))]
-                # if processable:
-                #     print(f"[mfi_broker] {len(processable)} of {len(mfi_files)} result MFI(s) to process")
-                if mfi_files:
-                    # Peek at types to decide which processors to run
-                    types = []
-                    for f in mfi_files:
-                        try:
-                            types.append(type(decode(str(f))))
-                        except Exception:
-                            pass
-
-                    if DiscoveryResultMFI in types:
-                        result = process_discovery_results()
-                        # DEBUG print(f"[mfi_broker] discovery: {result}")
-
-                    if CopyResultMFI in types:
-                        result = process_copy_results()
-                        # DEBUG print(f"[mfi_broker] copy: {result}")
-
-                    if MoveResultMFI in types:
-                        result = process_move_results()
-                        # DEBUG print(f"[mfi_broker] move: {result}")
+            completed.mkdir(parents=True, exist_ok=True)
+            watcher = watch_directory(completed, mode=BROKER_MODE, interval=POLL_INTERVAL)
+        except Exception as e:
+            print(f"[mfi_broker] ERROR: {e}")
+            time.sleep(POLL_INTERVAL)
+
+    print(f"[mfi_broker] started ({watcher.mode})")
 
+    while True:
+        try:
+            paths = watcher.wait(timeout=WAKE_INTERVAL)
+            if paths:
+                _dispatch(paths)
             _prune_queue()
 
         except Exception as e:
             print(f"[mfi_broker] ERROR: {e}")
-
-        time.sleep(POLL_INTERVAL)
+            time.sleep(POLL_INTERVAL)
 
 
 def start_mfi_broker():
     thread = threading.Thread(target=_mfi_broker_loop, daemon=True, name='mfi_broker')
     thread.start()
-    print("[mfi_broker] thread launched")
\ No newline at end of file
+    print("[mfi_broker] thread launched")
@@ -1,11 +1,16 @@
 # Services required to work with Graph database Neo4j.
 from app.models import neo4j
+from flask import has_app_context
 from pathlib import Path
+import os
+import re
 import json
+import time
 from datetime import datetime
 from app.scripts.mfn_search_dir import BusinessCardEvaluator
 from app.services.schema_service import load_mfn, parse_gfn, map_properties
 from app.services.mfi_broker import push_result
+from app.services.id_allocator import FileNodeIdAllocator
 from app.services.filesystem_service import (
     mfn_to_schema, 
     build_node_fields, 
@@ -17,8 +22,13 @@ from app.services.filesystem_service import (
 
 from app.shared.mfi_shared import (
     decode,
+    classify,
+    claims,
+    list_mfi,
     completed_path,
+    move_to_processed,
     CopyResultMFI,
+    MoveResultMFI,
 )
 
 def ensure_filenode_constraint(session):
@@ -35,6 +45,261 @@ def ensure_filenode_constraint(session):
         print(f"Warning: Could not create FileNode constraint: {e}")
         return False
 
+# ── Search indexes ─────────────────────────────────────────────────────────────
+# toLower(f.filepath) STARTS WITH ... and toLower(f.x) CONTAINS ... cannot use
+# an index. filepath_lc holds the lowercased path (kept current on every
+# filepath write) behind a range index, and each MFN label gets a fulltext
+# index over its core + optional properties.
+
+FILEPATH_LC_INDEX = 'filenode_filepath_lc'
+FULLTEXT_ANALYZER = 'standard-no-stop-words'
+
+_ensured        = set()   # bootstrap steps known complete — run here or marked in the graph
+_fulltext_fields = {}      # index name → indexed property list (ONLINE only)
+
+def fulltext_index_name(label: str) -> str:
+    return f"filenode_fulltext_{re.sub(r'[^0-9A-Za-z_]', '_', label)}"
+
+def _mfn_search_fields(mfn: dict) -> list:
+    fields = []
+    for group in ('core_properties', 'optional_properties'):
+        props = mfn.get(group) or {}
+        if isinstance(props, str):
+            props = json.loads(props)
+        fields.extend(k for k in props if k not in fields)
+    return fields
+
+def ensure_filenode_search_indexes(session, mfn: dict = None):
+    """
+    Create the filepath_lc range index and backfill filepath_lc on older nodes.
+    With an MFN, also (re)create the fulltext index for its label. Idempotent.
+    Bootstrap only (load, startup) — schema statements and the backfill must
+    not run inside a search request.
+    """
+    try:
+        if not _is_ready(session, FILEPATH_LC_INDEX):
+            session.run(
+                f"CREATE INDEX {FILEPATH_LC_INDEX} IF NOT EXISTS "
+                "FOR (f:FileNode) ON (f.filepath_lc)"
+            ).consume()
+            session.run("""
+                MATCH (f:FileNode)
+                WHERE f.filepath IS NOT NULL AND f.filepath_lc IS NULL
+                CALL { WITH f SET f.filepath_lc = toLower(f.filepath) } IN TRANSACTIONS OF 10000 ROWS
+            """).consume()
+            _mark_ready(session, FILEPATH_LC_INDEX)
+    except Exception as e:
+        print(f"Warning: Could not create filepath_lc index: {e}")
+        return False
+
+    if not mfn or not mfn.get('label'):
+        return True
+    fields = _mfn_search_fields(mfn)
+    if not fields:
+        return True
+    name = fulltext_index_name(mfn['label'])
+    try:
+        existing = session.run(
+            "SHOW FULLTEXT INDEXES YIELD name, properties WHERE name = $name RETURN properties",
+            name=name
+        ).single()
+        if existing and sorted(existing['properties']) != sorted(fields):
+            session.run(f"DROP INDEX {name}").consume()   # MFN fields changed
+            existing = None
+        if not existing:
+            on_each = ", ".join(f"n.`{f}`" for f in fields)
+            session.run(
+                f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS "
+                f"FOR (n:`{mfn['label']}`) ON EACH [{on_each}] "
+                f"OPTIONS {{indexConfig: {{`fulltext.analyzer`: '{FULLTEXT_ANALYZER}'}}}}"
+            ).consume()
+        _fulltext_fields.pop(name, None)
+        _ensured.add(name)
+        return True
+    except Exception as e:
+        print(f"Warning: Could not create fulltext index {name}: {e}")
+        return False
+
+def _online_fulltext_fields(session, name: str) -> list | None:
+    """Indexed properties of fulltext index `name`, or None until it is ONLINE."""
+    if name not in _fulltext_fields:
+        record = session.run(
+            "SHOW FULLTEXT INDEXES YIELD name, state, properties "
+            "WHERE name = $name AND state = 'ONLINE' RETURN properties",
+            name=name
+        ).single()
+        if not record:
+            return None   # not cached — checked again on the next search
+        _fulltext_fields[name] = list(record['properties'])
+    return _fulltext_fields[name]
+
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/ ])')
+
+def fulltext_query(properties: dict, indexed: list) -> str | None:
+    """
+    Lucene query that over-approximates `toLower(f.key) CONTAINS toLower(value)`
+    for every indexed key — each word of the value as a *infix* wildcard term.
+    None when no filter can be served from the index.
+    """
+    clauses = []
+    for key, value in properties.items():
+        if key not in indexed:
+            continue
+        words = re.findall(r'\w+', str(value).lower())
+        # the standard analyzer splits ideographs per character — leave those to the scan
+        if not words or not all(w.isascii() for w in words):
+            continue
+        field = _LUCENE_SPECIAL.sub(r'\\\1', key)
+        clauses.extend(f"{field}:*{w}*" for w in words)
+    return " AND ".join(clauses) or None
+
+
+# ── Master label ───────────────────────────────────────────────────────────────
+# A FileNode with no outgoing COPY_OF / INSITU_COPY_OF is a master. Masters
+# carry the :MasterFileNode label so search and export can seek the label
+# instead of checking both relationships on every row. Every writer that adds
+# or removes a copy relationship keeps the label current; the backfill covers
+# nodes written before the label existed.
+
+MASTER_LABEL = 'MasterFileNode'
+COPY_RELS    = 'COPY_OF|INSITU_COPY_OF'
+
+def _label_if_master(var: str) -> str:
+    """Cypher: label `var` a master unless it has an outgoing copy relationship."""
+    return (f"FOREACH (m IN [m IN [{var}] WHERE NOT EXISTS {{ (m)-[:{COPY_RELS}]->() }}] | "
+            f"SET m:{MASTER_LABEL})")
+
+def backfill_master_labels(session, full: bool = False) -> dict:
+    """
+    Label unlabelled masters. full=True also strips the label from copies —
+    the one-off repair (app/scripts/backfill_master_labels.py).
+    """
+    labelled = session.run(f"""
+        MATCH (f:FileNode)
+        WHERE NOT f:{MASTER_LABEL} AND NOT EXISTS {{ (f)-[:{COPY_RELS}]->() }}
+        CALL {{ WITH f SET f:{MASTER_LABEL} }} IN TRANSACTIONS OF 10000 ROWS
+        RETURN count(f) AS n
+    """).single()['n']
+    unlabelled = 0
+    if full:
+        unlabelled = session.run(f"""
+            MATCH (f:{MASTER_LABEL})
+            WHERE EXISTS {{ (f)-[:{COPY_RELS}]->() }}
+            CALL {{ WITH f REMOVE f:{MASTER_LABEL} }} IN TRANSACTIONS OF 10000 ROWS
+            RETURN count(f) AS n
+        """).single()['n']
+    _mark_ready(session, MASTER_LABEL)
+    return {'labelled': labelled, 'unlabelled': unlabelled}
+
+# ── Change tracking ────────────────────────────────────────────────────────────
+# Writers stamp updated_at = timestamp() (graph clock, epoch ms) so delta exports
+# can pick up only what changed since the last export. Removed ids — deletes and
+# renames — leave a :DeletedFileNode tombstone with deleted_at.
+
+TOMBSTONE_LABEL = 'DeletedFileNode'
+
+# a copy is exported inside its master's record — a changed copy re-exports the master
+_TOUCH_MASTERS_OF_N = f"""
+    WITH n
+    OPTIONAL MATCH (n)-[:{COPY_RELS}]->(master:FileNode)
+    SET master.updated_at = timestamp()
+"""
+
+def _tombstone(var: str) -> str:
+    return (f"MERGE (t:{TOMBSTONE_LABEL} {{`FILE-NODE-id`: {var}}}) "
+            f"SET t.deleted_at = timestamp()")
+
+def ensure_filenode_export_indexes(session) -> bool:
+    """Range indexes behind delta export: FileNode.updated_at and tombstone ids."""
+    try:
+        session.run("CREATE INDEX filenode_updated_at IF NOT EXISTS "
+                    "FOR (f:FileNode) ON (f.updated_at)").consume()
+        session.run(f"CREATE INDEX deleted_filenode_id IF NOT EXISTS "
+                    f"FOR (t:{TOMBSTONE_LABEL}) ON (t.`FILE-NODE-id`)").consume()
+        session.run(f"CREATE INDEX deleted_filenode_at IF NOT EXISTS "
+                    f"FOR (t:{TOMBSTONE_LABEL}) ON (t.deleted_at)").consume()
+        return True
+    except Exception as e:
+        print(f"Warning: Could not create export indexes: {e}")
+        return False
+
+def graph_timestamp() -> int:
+    """The graph's clock (epoch ms) — the same clock writers stamp with."""
+    with neo4j.get_session() as session:
+        return session.run("RETURN timestamp() AS ts").single()['ts']
+
+# ── Schema bootstrap ───────────────────────────────────────────────────────────
+# Index creation and full-graph backfills run at bootstrap only: startup
+# (run.py), /buscard/load and app/scripts/backfill_master_labels.py. Each step
+# leaves a (:SchemaState {name}) marker when it completes; search and export
+# read the marker and fall back to scans / anti-joins until it exists.
+
+SCHEMA_STATE = 'SchemaState'
+EXPORT_INDEXES = 'filenode_updated_at'
+
+def _mark_ready(session, name: str):
+    session.run(f"MERGE (s:{SCHEMA_STATE} {{name: $name}}) SET s.ready_at = datetime()",
+                name=name).consume()
+    _ensured.add(name)
+
+def _is_ready(session, name: str) -> bool:
+    """True once the bootstrap step `name` has completed. A yes is cached per process."""
+    if name not in _ensured:
+        try:
+            if session.run(f"MATCH (s:{SCHEMA_STATE} {{name: $name}}) RETURN 1 LIMIT 1",
+                           name=name).single():
+                _ensured.add(name)
+        except Exception as e:
+            print(f"Warning: Could not read {SCHEMA_STATE} {name}: {e}")
+    return name in _ensured
+
+def bootstrap_filenode_schema(session) -> dict:
+    """
+    Indexes and backfills behind search and export, for every MFN in the graph.
+    Steps already marked ready are skipped. Never call this per request.
+    """
+    mfns = [dict(r['m']) for r in session.run("MATCH (m:MetaFileNode) RETURN m")]
+    ready = {FILEPATH_LC_INDEX: ensure_filenode_search_indexes(session)}
+    for mfn in mfns:
+        if mfn.get('label'):
+            ready[fulltext_index_name(mfn['label'])] = ensure_filenode_search_indexes(session, mfn)
+    if not _is_ready(session, MASTER_LABEL):
+        try:
+            backfill_master_labels(session)
+        except Exception as e:
+            print(f"Warning: Could not backfill {MASTER_LABEL}: {e}")
+    ready[MASTER_LABEL] = _is_ready(session, MASTER_LABEL)
+    if not _is_ready(session, EXPORT_INDEXES) and ensure_filenode_export_indexes(session):
+        _mark_ready(session, EXPORT_INDEXES)
+    ready[EXPORT_INDEXES] = _is_ready(session, EXPORT_INDEXES)
+    return ready
+
+# ── FileNode load epoch ────────────────────────────────────────────────────────
+# Incremental discovery diffs against a scan snapshot kept on the watcher host.
+# A GFN reload or a graph wipe makes that snapshot wrong — unchanged files would
+# never be recreated. The epoch is part of the snapshot scope (DiscoveryMFI.epoch),
+# so a new epoch starts from an empty snapshot and reports every file.
+
+FILENODE_EPOCH = 'filenode_epoch'
+
+def get_filenode_epoch() -> str:
+    """Current epoch — a wiped graph gets a fresh one on first read."""
+    with neo4j.get_session() as session:
+        return session.run(f"""
+            MERGE (s:{SCHEMA_STATE} {{name: $name}})
+            ON CREATE SET s.epoch = randomUUID()
+            RETURN s.epoch AS epoch
+        """, name=FILENODE_EPOCH).single()['epoch']
+
+def reset_filenode_epoch(session) -> str:
+    """Start a new epoch — call after (re)loading FileNodes from a GFN."""
+    return session.run(f"""
+        MERGE (s:{SCHEMA_STATE} {{name: $name}})
+        SET s.epoch = randomUUID()
+        RETURN s.epoch AS epoch
+    """, name=FILENODE_EPOCH).single()['epoch']
+
+
 # This is the controlled exception to the sessions-in-service rule.
 # Bot layer calls get_session() to obtain a session context manager.
 # Session lifecycle (open/close) remains in neo4j_service — bots just request one.
@@ -59,6 +324,45 @@ def get_session():
     return neo4j.get_session()
 
 
+# ── Bot registry ──────────────────────────────────────────────────────────
+# (:BotRegistry {name: 'bots'}).version is bumped by every register_bots run,
+# so processes holding a bot dispatch table can tell their copy is stale.
+# The counter restarts at 1 when the graph is wiped, so readers get it paired
+# with a random epoch set when the registry node is created: "<epoch>-<version>".
+
+BOT_REGISTRY = 'bots'
+
+def get_bot_functions(bot_id: str = None) -> list[dict]:
+    """module/function/read_only for every BotFunction, or for one bot-id."""
+    with neo4j.get_session() as session:
+        result = session.run("""
+            MATCH (b:BotFunction)
+            WHERE $bot_id IS NULL OR b.`bot-id` = $bot_id
+            RETURN b.`bot-id` AS bot_id, b.module AS module, b.function AS function,
+                   coalesce(b.read_only, false) AS read_only
+        """, bot_id=bot_id)
+        return [record.data() for record in result]
+
+def get_bot_registry_version() -> str:
+    with neo4j.get_session() as session:
+        record = session.run("""
+            OPTIONAL MATCH (r:BotRegistry {name: $name})
+            RETURN coalesce(r.epoch, '') + '-' + toString(coalesce(r.version, 0)) AS version
+        """, name=BOT_REGISTRY).single()
+        return record['version']
+
+def bump_bot_registry_version(session) -> str:
+    """Call after any BotFunction write — register_bots, create_bot."""
+    record = session.run("""
+        MERGE (r:BotRegistry {name: $name})
+        SET r.epoch   = coalesce(r.epoch, randomUUID()),
+            r.version = coalesce(r.version, 0) + 1,
+            r.updated = datetime()
+        RETURN r.epoch + '-' + toString(r.version) AS version
+    """, name=BOT_REGISTRY).single()
+    return record['version']
+
+
 def ensure_mfn_constraint(session):
     """Ensure the MFN-id uniqueness constraint exists on MetaFileNode label"""
     try:
@@ -134,54 +438,124 @@ def create_mfn_node(session, mfn):
 
 # Given a node label like BusinessCard and a list of nodes to create from a Grouped-File-Node yaml source file
 # generate the Cypher and execute to load into the Neo4j database
-def create_nodes(session, label, nodes):
-    """Create or update nodes with given label"""
-    for n in nodes:
-        nid = n.get("FILE-NODE-id")
-        props = n.copy()
-        props.pop("FILE-NODE-id", None)
-        # convert any empty strings to None to avoid clutter
-        for k, v in list(props.items()):
-            if isinstance(v, str) and v.strip() == "":
-                props[k] = None
-        session.write_transaction(lambda tx, file_node_id=nid, props=props: tx.run(
-            f"MERGE (b:{label}:FileNode {{`FILE-NODE-id`:$file_node_id}}) SET b += $props", 
-            file_node_id=file_node_id, props=props
-        ))
+def create_nodes(session, label, nodes, batch_size: int = None):
+    """Create or update nodes with given label — chunked UNWIND, one transaction per batch"""
+    timings = []
+    for batch in _chunked((_node_row(n) for n in nodes), batch_size or IMPORT_BATCH_SIZE):
+        _merge_node_batch(session, label, batch, timings)
+    return timings
 
 
 def create_node( session, label, node):
     create_nodes( session, label, [node])
 
-def create_nodes_with_relationships(session, label: str, nodes: list):
-    for n in nodes:
-        related = n.pop('_related', [])
-        # DEBUG print(f"[import] {n.get('FILE-NODE-id')} — related: {len(related)}")        
-        # create master node
-        create_nodes(session, label, [n])
-        
-        # create stubs and wire relationships
-        for entry in related:
-            rel_type = entry['relationship']
-            stub = entry['node'].copy()
-            
-            # create stub node
-            create_nodes(session, label, [stub])
-            
-            # wire relationship
-            stub_id = stub.get('FILE-NODE-id')
-            master_id = n.get('FILE-NODE-id')
-            
-            session.write_transaction(lambda tx, sid=stub_id, mid=master_id, rt=rel_type: tx.run(
-                f"""
-                MATCH (stub:FileNode {{`FILE-NODE-id`: $stub_id}})
-                MATCH (master:FileNode {{`FILE-NODE-id`: $master_id}})
-                MERGE (stub)-[:{rt}]->(master)
-                """,
-                stub_id=sid,
-                master_id=mid
-            ))
-    
+def create_nodes_with_relationships(session, label: str, nodes, batch_size: int = None) -> dict:
+    """Bulk import masters + related stubs. See bulk_import_nodes."""
+    return bulk_import_nodes(session, label, nodes, batch_size=batch_size)
+
+
+# ── Bulk import ────────────────────────────────────────────────────────────────
+# GFN loads used to cost one transaction per node, stub and relationship.
+# Rows are grouped by label (masters, stubs) and by relationship type, then
+# sent as chunked UNWIND statements — one write transaction per batch.
+# `nodes` may be any iterable; rows are flushed as each batch fills.
+
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 500))
+
+def _chunked(rows, size: int):
+    """Yield lists of up to `size` items from any iterable."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _node_row(node: dict) -> dict:
+    """Split a mapped node into an UNWIND row: {id, props}. Empty strings become None."""
+    props = node.copy()
+    props.pop('_related', None)
+    nid = props.pop('FILE-NODE-id', None)
+    for k, v in list(props.items()):
+        if isinstance(v, str) and v.strip() == "":
+            props[k] = None
+    return {'id': nid, 'props': props}
+
+def _timed_write(session, timings: list, kind: str, label: str, cypher: str, rows: list):
+    start = time.perf_counter()
+    session.execute_write(lambda tx: tx.run(cypher, rows=rows).consume())
+    timings.append({
+        'kind':    kind,
+        'label':   label,
+        'rows':    len(rows),
+        'seconds': round(time.perf_counter() - start, 4),
+    })
+
+def _merge_node_batch(session, label: str, rows: list, timings: list, kind: str = 'nodes'):
+    _timed_write(session, timings, kind, label, f"""
+        UNWIND $rows AS row
+        MERGE (b:FileNode {{`FILE-NODE-id`: row.id}})
+        SET b:{label}, b += row.props
+        SET b.filepath_lc = toLower(b.filepath), b.updated_at = timestamp()
+        WITH b WHERE NOT EXISTS {{ (b)-[:{COPY_RELS}]->() }}
+        SET b:{MASTER_LABEL}
+    """, rows)
+
+def _merge_relationship_batch(session, rel_type: str, rows: list, timings: list):
+    # a stub gains a copy relationship — it is no longer a master
+    demote = f"REMOVE stub:{MASTER_LABEL}" if rel_type in COPY_RELS.split('|') else ""
+    _timed_write(session, timings, 'relationships', rel_type, f"""
+        UNWIND $rows AS row
+        MATCH (stub:FileNode {{`FILE-NODE-id`: row.stub_id}})
+        MATCH (master:FileNode {{`FILE-NODE-id`: row.master_id}})
+        MERGE (stub)-[:{rel_type}]->(master)
+        SET master.updated_at = timestamp()
+        {demote}
+    """, rows)
+
+def bulk_import_nodes(session, label: str, nodes, batch_size: int = None) -> dict:
+    """
+    Import mapped GFN nodes (with optional `_related` stubs) in chunked UNWIND batches.
+    Masters are written before their stubs, stubs before relationships, per batch.
+    Returns counts plus per-batch timings: [{kind, label, rows, seconds}, ...]
+    """
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    summary = {'nodes': 0, 'stubs': 0, 'relationships': 0, 'batches': []}
+    timings = summary['batches']
+    start = time.perf_counter()
+
+    for batch in _chunked(nodes, batch_size):
+        masters, stubs, rels = [], [], {}
+        for n in batch:
+            row = _node_row(n)
+            masters.append(row)
+            for entry in n.get('_related') or []:
+                stub = _node_row(entry['node'])
+                stubs.append(stub)
+                rels.setdefault(entry['relationship'], []).append(
+                    {'stub_id': stub['id'], 'master_id': row['id']}
+                )
+
+        _merge_node_batch(session, label, masters, timings)
+        for chunk in _chunked(stubs, batch_size):
+            _merge_node_batch(session, label, chunk, timings, kind='stubs')
+        for rel_type, rel_rows in rels.items():
+            for chunk in _chunked(rel_rows, batch_size):
+                _merge_relationship_batch(session, rel_type, chunk, timings)
+
+        summary['nodes'] += len(masters)
+        summary['stubs'] += len(stubs)
+        summary['relationships'] += sum(len(r) for r in rels.values())
+
+    file_node_ids.invalidate()
+    summary['seconds'] = round(time.perf_counter() - start, 4)
+    print(f"[import] {label}: {summary['nodes']} nodes, {summary['stubs']} stubs, "
+          f"{summary['relationships']} relationships in {len(timings)} batches "
+          f"({summary['seconds']}s)")
+    return summary
+
 def verify_FNid_exists(self, node_id):
     """Verify FILE-NODE-id exists in database"""
 def verify_FNid_exists(node_id):
@@ -226,37 +600,118 @@ def get_mfn_patterns(mfn_id: str) -> list:
         return [p['pattern_value'] for p in mfn.get('patterns', [])
                 if p.get('pattern_type') == 'filename_contains']
 
-def search_for_file_node(search_paths=None, properties=None, mfn_id='BusinessCard_20260121'):  # TODO: remove default
+# ── FileNode search ───────────────────────────────────────────────────────────
+# Keyset pagination on FILE-NODE-id: pass the previous page's next_cursor as
+# `after`. The uniqueness constraint's range index serves both the ORDER BY
+# and the `>` seek, so every page costs the same no matter how deep it is.
+SEARCH_PAGE_MAX = 1000
+
+def _table_fields(mfn_node) -> list:
+    """FileNode properties behind the MFN's table_columns — the list view projection."""
+    columns = mfn_node.get('table_columns') or ['node', 'filepath']
+    if isinstance(columns, str):
+        columns = json.loads(columns)
+    aliases = {'node': 'FILE-NODE-id'}   # table column keys → FileNode property
+    fields = ['FILE-NODE-id', 'filepath']
+    for column in columns:
+        field = aliases.get(column, column)
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+def _prepare_search(session, search_paths, properties, mfn_id, after, limit, columns):
+    """Resolve MFN defaults and build the query. Returns (header, mfn item, query, params)."""
+    if mfn_id is None:
+        raise ValueError("mfn_id is required")
+    if limit is not None:
+        limit = max(1, min(int(limit), SEARCH_PAGE_MAX))
+    mfn_result = session.run(
+        "MATCH (m:MetaFileNode {`MFN-id`: $mfn_id}) RETURN m",
+        mfn_id=mfn_id
+    ).single()
+    mfn = {'meta_file_node': dict(mfn_result['m'])} if mfn_result else {}
+
+    if search_paths is None:
+        search_paths = [mfn_result['m'].get('path', '')] if mfn_result else []
+    if properties is None:
+        properties = {}
+    return_fields = _table_fields(mfn['meta_file_node']) if columns and mfn else None
+
+    # indexes come from bootstrap_filenode_schema; until they exist the scan path runs
+    label = mfn['meta_file_node'].get('label') if mfn else None
+    ft_name = fulltext_index_name(label) if label else None
+    fulltext = None
+    if ft_name and properties:
+        indexed = _online_fulltext_fields(session, ft_name)
+        lucene = fulltext_query(properties, indexed) if indexed else None
+        fulltext = (ft_name, lucene) if lucene else None
+
+    # one extra row tells us whether another page exists
+    query, params = build_filenode_search_query(
+        search_paths, properties, return_fields=return_fields,
+        after=after, limit=limit + 1 if limit else None,
+        fulltext=fulltext, indexed_paths=_is_ready(session, FILEPATH_LC_INDEX),
+        master_label=_is_ready(session, MASTER_LABEL))
+    debug_query = query
+    for key, value in params.items():
+        debug_query = debug_query.replace(f'${key}', f"'{value}'")
+    return {'debug_query': debug_query}, mfn, query, params, limit
+
+def _iter_search(tx, search_paths, properties, mfn_id, after, limit, columns):
+    """Search items from `tx` — a session or a transaction. See iter_file_node_search."""
+    header, mfn, query, params, limit = _prepare_search(
+        tx, search_paths, properties, mfn_id, after, limit, columns)
+    yield header
+    if mfn:
+        yield mfn
+    count, last_id, more = 0, None, False
+    for record in tx.run(query, parameters=params):
+        if limit and count == limit:
+            more = True
+            break
+        item = record.data()
+        last_id = item['fnode'].get('FILE-NODE-id')
+        count += 1
+        yield item
+    if limit:
+        yield {'next_cursor': last_id if more else None, 'count': count}
+
+def iter_file_node_search(search_paths=None, properties=None, mfn_id='BusinessCard_20260121',
+                          after=None, limit=None, columns=False):
+    """
+    Stream search results: the debug_query header, the MFN item, then one
+    {'fnode': ...} per record as the driver fetches them. Paged searches end
+    with {'next_cursor': id | None, 'count': n}.
+    Inside a request this streams on the request session — a managed
+    transaction would have to buffer every record before the first is sent.
+    """
+    if has_app_context():
+        yield from _iter_search(neo4j.request_session(), search_paths, properties, mfn_id,
+                                after, limit, columns)
+        return
+    with neo4j.get_session() as session:
+        yield from _iter_search(session, search_paths, properties, mfn_id, after, limit, columns)
+
+def search_for_file_node(search_paths=None, properties=None, mfn_id='BusinessCard_20260121',  # TODO: remove default
+                         after=None, limit=None, columns=False):
     """Retrieve all paths and filenodes matching search criteria.
     
     Args:
         search_paths: list of path patterns to search, or None for defaults
         properties: dict of {property_key: search_value} filters
+        after: FILE-NODE-id cursor — return records after it
+        limit: page size; the header item then carries next_cursor
+        columns: project each fnode to the MFN's table_columns
     
     Returns:
         List of matching nodes with their properties
     """
-    if mfn_id is None:
-        raise ValueError("mfn_id is required")
-    with neo4j.get_session() as session:
-        mfn_result = session.run(
-            "MATCH (m:MetaFileNode {`MFN-id`: $mfn_id}) RETURN m",
-            mfn_id=mfn_id
-        ).single()
-        mfn = {'meta_file_node': dict(mfn_result['m'])} if mfn_result else {}
-
-        if search_paths is None:
-            search_paths = [mfn_result['m'].get('path', '')] if mfn_result else []
-
-        if properties is None:
-            properties = {}
-        query, params = build_filenode_search_query(search_paths, properties)
-        debug_query = query
-        for key, value in params.items():
-            debug_query = debug_query.replace(f'${key}', f"'{value}'")
-        result = session.run(query, parameters=params)
-        records = [record.data() for record in result]
-    return [{'debug_query': debug_query}] + ([mfn] if mfn else []) + records
+    # managed read transaction on the request session — retried on transient errors
+    items = neo4j.execute_read(lambda tx: list(_iter_search(
+        tx, search_paths, properties, mfn_id, after, limit, columns)))
+    if limit:
+        items[0].update(items.pop())   # page trailer folds into the debug_query header
+    return items
 
 def scan_directory_to_nodes(scan_path: str, mfn_id: str, min_confidence: float = 0.5) -> dict:
     with neo4j.get_session() as session:
@@ -273,8 +728,7 @@ def scan_directory_to_nodes(scan_path: str, mfn_id: str, min_confidence: float =
 
         for metadata in matches:
             try:
-                checker = lambda pid: not verify_FNid_exists(pid)[0]
-                node_id = suggest_file_node_id(metadata.filepath, checker)
+                node_id = suggest_file_node_id(metadata.filepath, allocator=file_node_ids)
 
                 exists, _ = verify_FNid_exists(node_id)
                 if exists:
@@ -330,7 +784,8 @@ def get_mfn(mfn_id: str, session) -> dict | None:
     return props
 
 
-def build_filenode_search_query(search_paths, properties, return_fields=None):
+def build_filenode_search_query(search_paths, properties, return_fields=None, after=None, limit=None,
+                                fulltext=None, indexed_paths=False, master_label=True):
     """Build Cypher query dynamically based on filters
     
         Example query:
@@ -338,23 +793,44 @@ def build_filenode_search_query(search_paths, properties, return_fields=None):
         WHERE f.filepath STARTS WITH 'C:\\Users\\termi\\Dropbox\\'
           AND toLower(f.company) CONTAINS toLower('toyota')
         RETURN f.filepath, f.`FILE-NODE-id`, f.company, f
+
+        Results are ordered by FILE-NODE-id. `after` seeks past a cursor id,
+        `limit` caps the page, `return_fields` projects fnode to those keys.
+        fulltext=(index name, lucene query) seeds candidates from the fulltext
+        index; the CONTAINS filters still run on them. indexed_paths matches
+        paths on filepath_lc (range index) instead of toLower(filepath).
+        master_label seeks :MasterFileNode; False falls back to excluding
+        copies with relationship anti-joins (labels not backfilled yet).
     """
     
     # Base MATCH
-    query_parts = ["MATCH (fnode:FileNode)"]
+    params = {}
+    node_label = MASTER_LABEL if master_label else "FileNode"
+    if fulltext:
+        query_parts = ["CALL db.index.fulltext.queryNodes($ft_index, $ft_query) YIELD node AS fnode"]
+        params['ft_index'], params['ft_query'] = fulltext
+    else:
+        query_parts = [f"MATCH (fnode:{node_label})"]
     
     # WHERE clauses
-    where_clauses = [
+    where_clauses = [] if master_label else [
         "NOT (fnode)-[:INSITU_COPY_OF]->()",
         "NOT (fnode)-[:COPY_OF]->()"
     ]
-    params = {}
+    if fulltext:
+        where_clauses.insert(0, f"fnode:{node_label}")
+
+    # Keyset cursor
+    if after is not None:
+        where_clauses.append("fnode.`FILE-NODE-id` > $after")
+        params['after'] = after
     
     # Add path filters
     if search_paths:
         # For multiple paths, use OR
+        path_field = "fnode.filepath_lc" if indexed_paths else "toLower(fnode.filepath)"
         path_conditions = " OR ".join([
-            f"toLower(fnode.filepath) STARTS WITH toLower($path{i})" 
+            f"{path_field} STARTS WITH toLower($path{i})" 
             for i in range(len(search_paths))
         ])
         where_clauses.append(f"({path_conditions})")
@@ -371,13 +847,18 @@ def build_filenode_search_query(search_paths, properties, return_fields=None):
     if where_clauses:
         query_parts.append("WHERE " + " AND ".join(where_clauses))
     
-    # RETURN clause
-    # if return_fields is None:
-    #     return_fields = ['filepath', 'FILE-NODE-id', 'company']
-    
-    # return_items = [f"fnode.`{field}`" for field in return_fields] + ['fnode']
-    # query_parts.append("RETURN " + ", ".join(return_items))
-    query_parts.append("RETURN fnode")
+    # Order and cut the page before projecting
+    query_parts.append("WITH fnode ORDER BY fnode.`FILE-NODE-id`")
+    if limit:
+        query_parts[-1] += " LIMIT $limit"
+        params['limit'] = int(limit)
+
+    # RETURN clause — map projection keeps the `fnode` key the UI reads
+    if return_fields:
+        projection = ", ".join(f".`{field}`" for field in return_fields)
+        query_parts.append(f"RETURN fnode {{{projection}}} AS fnode")
+    else:
+        query_parts.append("RETURN fnode")
     
     query = "\n".join(query_parts)
     return query, params
@@ -389,26 +870,46 @@ def delete_file_nodes(node_ids):
     if not node_ids:
         return {'status': 'error', 'message': 'No node IDs provided'}
     
-    query = """
+    # copies of a deleted master lose their copy relationship — re-check them;
+    # masters of a deleted copy change their export record — stamp them
+    query = f"""
         MATCH (n:FileNode)
         WHERE n.`FILE-NODE-id` IN $node_ids
-        WITH collect(n) as nodes, count(n) as deleted
+        OPTIONAL MATCH (copy:FileNode)-[:{COPY_RELS}]->(n)
+        OPTIONAL MATCH (n)-[:{COPY_RELS}]->(master:FileNode)
+        WITH collect(DISTINCT n) as nodes, collect(DISTINCT copy) as copies,
+             collect(DISTINCT master) as masters
+        WITH nodes, size(nodes) as deleted,
+             [c IN copies WHERE NOT c IN nodes] as copies,
+             [m IN masters WHERE NOT m IN nodes] as masters
+        FOREACH (n in nodes | {_tombstone('n.`FILE-NODE-id`')})
         FOREACH (n in nodes | DETACH DELETE n)
+        WITH deleted, copies, masters
+        FOREACH (c IN [c IN copies WHERE NOT EXISTS {{ (c)-[:{COPY_RELS}]->() }}] |
+            SET c:{MASTER_LABEL})
+        FOREACH (x IN copies + masters | SET x.updated_at = timestamp())
         RETURN deleted
     """
     with neo4j.get_session() as session:
         result = session.run(query, parameters={'node_ids': node_ids})
         record = result.single()
         deleted_count = record['deleted'] if record else 0
+    file_node_ids.invalidate()
     
     return {'status': 'ok', 'deleted': deleted_count}
 
 def update_file_node(node_id, fields):
-    query = """
+    if 'FILE-NODE-id' in fields:
+        file_node_ids.invalidate()
+    renamed = fields.get('FILE-NODE-id') not in (None, node_id)
+    query = f"""
         MATCH (n:FileNode)
         WHERE n.`FILE-NODE-id` = $node_id
         SET n += $fields
-        RETURN n
+        SET n.filepath_lc = toLower(n.filepath), n.updated_at = timestamp()
+        {_tombstone('$node_id') if renamed else ''}
+        {_TOUCH_MASTERS_OF_N}
+        RETURN DISTINCT n
     """
     with neo4j.get_session() as session:
         result = session.run(query, parameters={'node_id': node_id, 'fields': fields})
@@ -495,417 +996,681 @@ def make_checker(session):
         return result.single() is None
     return checker
 
-def process_discovery_results() -> dict:
-    """
-    Read completed/ folder, process scan_directory_result MFI files.
-    For each matched file: create FileNode, link to Dispatch via CREATED.
-    Create OSResult node, link to Dispatch via RESULTED_IN.
-    """
-    from app.shared.mfi_shared import (
-        decode, completed_path, DiscoveryResultMFI
-    )
-
-    completed = completed_path()
-    # DEBUG print(f"Looking in: {completed}")
-    if not completed.exists():
+def _load_file_node_ids(prefix: str) -> list[str]:
+    """Every FILE-NODE-id starting with prefix — one range-index seek on the constraint."""
+    with neo4j.get_session() as session:
+        result = session.run("""
+            MATCH (n:FileNode)
+            WHERE n.`FILE-NODE-id` STARTS WITH $prefix
+            RETURN n.`FILE-NODE-id` AS id
+        """, prefix=prefix)
+        return [record['id'] for record in result]
+
+# Shared reservation index — replaces per-candidate make_checker probes.
+# Writers that create, rename or delete ids outside the allocator call
+# file_node_ids.invalidate().
+file_node_ids = FileNodeIdAllocator(_load_file_node_ids)
+
+# ── Result processors ─────────────────────────────────────────────────────────
+# One entry point per result MFI (process_*_result) used by the broker, plus a
+# sweep over completed/ per action (process_*_results) for /buscard/process.
+# Consumed files are archived to processed/ so nothing is ever rescanned.
+
+def _completed_files(action: str) -> list[Path]:
+    """Result files in completed/ for one action — routed by filename, not decoded."""
+    return classify(list_mfi(completed_path())).get(action, [])
+
+def _sweep(action: str, process_one, summary: dict) -> dict:
+    """Run a per-file processor over every completed/ file of one action."""
+    if not completed_path().exists():
         return {'status': 'ok', 'processed': 0, 'message': 'completed/ empty'}
 
-    mfi_files = list(completed.glob('*.mfi'))
-    # DEBUG print(f"Files found: {mfi_files}")
+    mfi_files = _completed_files(action)
     if not mfi_files:
         return {'status': 'ok', 'processed': 0, 'message': 'nothing to process'}
 
-    summary = {'processed': 0, 'nodes_created': 0, 'errors': []}
-
     with neo4j.get_session() as session:
-        checker = make_checker(session)
         for mfi_path in mfi_files:
+            if not claims.claim(mfi_path):
+                continue                # the broker has it, or it was archived already
             try:
-                dispatch_summary = {'nodes_created': 0,'collisions': [],'errors': [],'insitu': []}
-                mfi = decode(str(mfi_path))
-                # DEBUG print(f"Decoded: {type(mfi).__name__} - {mfi.action}")
-                # DEBUG print(f"isinstance check: {isinstance(mfi, DiscoveryResultMFI)}")
-
-                if not isinstance(mfi, DiscoveryResultMFI):
-                    continue                    # not ours — leave it
-
-                label_result = session.run("""
-                    MATCH (mfn:MetaFileNode {`MFN-id`: $mfn_id})
-                    RETURN mfn.label AS label
-                """, mfn_id=mfi.mfn_id).single()
-                node_label = label_result['label'] if label_result else 'FileNode'
-                print(f"[process_discovery_results]", label_result)
-                # ── Process each matched file ─────────────────────────────────
-                for file_entry in mfi.files:
-                    try:
-                        node_id = derive_file_node_id(file_entry['filepath'], file_entry.get('mtime', ''))
-                        # DEBUG print(f"[discovery] filepath: {file_entry['filepath']}")
-                        # DEBUG print(f"[discovery] generated node_id: {node_id}")
-
-                        already_exists = not checker(node_id)
-                        # DEBUG print(f"[discovery] exists={already_exists}")
-
-                        fields = {
-                            'filepath':        file_entry['filepath'],
-                            'reviewed':        False,
-                            'review_priority': 5,
-                            'pattern_matched': file_entry.get('mask_matched', ''),
-                            'descriptor':      file_entry.get('descriptor', ''),
-                            'date':            file_entry.get('date') or file_entry.get('mtime', ''),
-                        }
-
-                        # DEBUG print(f"[discovery] fields: {fields}")
-                        # DEBUG print(f"[discovery] source_mfi_id: {mfi.source_mfi_id}")
-
-                        result = session.run("""
-                            MATCH (n:FileNode {filepath: $filepath})-[:INSITU_COPY_OF]->()
-                            RETURN n
-                        """, filepath=file_entry['filepath'])
-
-                        if result.single():
-                            # DEBUG print(f"[discovery] INSITU — skipping: {node_id}")
-                            dispatch_summary.setdefault('insitu', []).append(node_id)
-                            continue
-
-                        session.run(f"""
-                            MATCH (d:Dispatch {{`mfi-id`: $source_mfi_id}})
-                            MERGE (n:FileNode {{`FILE-NODE-id`: $node_id}})
-                            ON CREATE SET n += $fields, n:`{node_label}`
-                            CREATE (d)-[:CREATED]->(n)
-                            RETURN n
-                        """,
-                            source_mfi_id = mfi.source_mfi_id,
-                            node_id       = node_id,
-                            fields        = fields
-                        )
-
-                        if already_exists:
-                            dispatch_summary.setdefault('collisions', []).append(node_id)
-                            # DEBUG print(f"[discovery] COLLISION: {node_id}")
-                        else:
-                            dispatch_summary['nodes_created'] += 1
-                            # DEBUG print(f"[discovery] CREATED: {node_id}")
-
-                    except Exception as e:
-                        print(f"[discovery] ERROR: {file_entry.get('filepath')} — {e}")
-                        dispatch_summary['errors'].append({
-                            'filepath': file_entry.get('filepath', 'unknown'),
-                            'error':    str(e)
-                        })
-
-                # ── OSResult — after all file work, before unlink ─────────────
-                status = 'failure(s)' if dispatch_summary.get('errors') else 'completed'
-                session.run("""
-                    MATCH (d:Dispatch {`mfi-id`: $source_mfi_id})
-                    WHERE NOT (d)-[:RESULTED_IN]->()
-                    CREATE (r:OSResult {
-                        mfi_id:          $mfi_id,
-                        status:          $status,
-                        file_count:      $file_count,
-                        nodes_created:   $nodes_created,
-                        collisions:      $collisions,
-                        collision_count: $collision_count,
-                        errors:          $errors,
-                        error_count:     $error_count,
-                        created:         $created
-                    })
-                    CREATE (d)-[:RESULTED_IN]->(r)
-                    SET d.status = $status
-                    RETURN r
-                """,
-                    source_mfi_id   = mfi.source_mfi_id,
-                    mfi_id          = mfi.mfi_id,
-                    file_count      = len(mfi.files),
-                    nodes_created   = dispatch_summary.get('nodes_created', 0),
-                    collisions      = dispatch_summary.get('collisions', []),
-                    collision_count = len(dispatch_summary.get('collisions', [])),
-                    errors          = [e['error'] for e in dispatch_summary.get('errors', [])],
-                    error_count     = len(dispatch_summary.get('errors', [])),
-                    status          = status,
-                    created         = datetime.now().isoformat()
-                )
-                push_result(mfi.source_mfi_id, {
-                    'status':        status,
-                    'nodes_created': dispatch_summary.get('nodes_created', 0),
-                    'collisions':    len(dispatch_summary.get('collisions', [])),
-                    'errors':        len(dispatch_summary.get('errors', []))
-                })
-
-                mfi_path.unlink()               # after graph work — no ghost state
+                result = process_one(mfi_path, session=session)
                 summary['processed'] += 1
-
+                if 'nodes_created' in summary:
+                    summary['nodes_created'] += result.get('nodes_created', 0)
+                if result.get('error'):
+                    summary['errors'].append({'mfi': mfi_path.name, 'error': result['error']})
             except Exception as e:
-                summary['errors'].append({
-                    'file': mfi_path.name,
-                    'error': str(e)
-                })
+                print(f"[{action}] ERROR: {mfi_path.name} — {e}")
+                summary['errors'].append({'file': mfi_path.name, 'error': str(e)})
+            finally:
+                claims.release(mfi_path)
 
     summary['status'] = 'ok'
     return summary
 
+def process_discovery_results() -> dict:
+    """
+    Process every scan_directory_result MFI in completed/.
+    See process_discovery_result for the per-file work.
+    """
+    return _sweep('scan_directory_result', process_discovery_result,
+                  {'processed': 0, 'nodes_created': 0, 'errors': []})
+
+def process_discovery_result(mfi_path: Path, session=None) -> dict:
+    """
+    Process one scan_directory_result MFI.
+    For each matched file: create FileNode, link to Dispatch via CREATED.
+    Files the scan reports removed are flagged with missing_since; a later scan
+    that finds the path again clears it.
+    Create OSResult node, link to Dispatch via RESULTED_IN.
+    Archives the MFI to processed/ after the graph work.
+    """
+    from app.shared.mfi_shared import DiscoveryResultMFI
+
+    if session is None:
+        with neo4j.get_session() as session:
+            return process_discovery_result(mfi_path, session=session)
+
+    dispatch_summary = {'nodes_created': 0,'collisions': [],'errors': [],'insitu': []}
+    mfi = decode(str(mfi_path))
+    # DEBUG print(f"Decoded: {type(mfi).__name__} - {mfi.action}")
+
+    if not isinstance(mfi, DiscoveryResultMFI):
+        raise ValueError(f"Not a discovery result: {mfi_path.name}")
+
+    # ── Derive ids — pure, no graph ───────────────────────────────────────
+    entries = []
+    for file_entry in mfi.files:
+        try:
+            node_id = derive_file_node_id(file_entry['filepath'], file_entry.get('mtime', ''))
+            entries.append((file_entry, node_id))
+        except Exception as e:
+            print(f"[discovery] ERROR: {file_entry.get('filepath')} — {e}")
+            dispatch_summary['errors'].append({
+                'filepath': file_entry.get('filepath', 'unknown'),
+                'error':    str(e)
+            })
+
+    # ── Prefetch — MFN label, existing ids, insitu stubs in one query ─────
+    prefetch = session.run("""
+        OPTIONAL MATCH (mfn:MetaFileNode {`MFN-id`: $mfn_id})
+        CALL {
+            MATCH (n:FileNode) WHERE n.`FILE-NODE-id` IN $node_ids
+            RETURN collect(n.`FILE-NODE-id`) AS existing_ids
+        }
+        CALL {
+            MATCH (n:FileNode)-[:INSITU_COPY_OF]->() WHERE n.filepath IN $filepaths
+            RETURN collect(DISTINCT n.filepath) AS insitu_paths
+        }
+        RETURN mfn.label AS label, existing_ids, insitu_paths
+    """,
+        mfn_id    = mfi.mfn_id,
+        node_ids  = [node_id for _, node_id in entries],
+        filepaths = [file_entry['filepath'] for file_entry, _ in entries],
+    ).single()
+    node_label = prefetch['label'] or 'FileNode'
+    existing   = set(prefetch['existing_ids'])
+    insitu     = set(prefetch['insitu_paths'])
+    print(f"[process_discovery_results] label: {node_label}, files: {len(entries)}")
+
+    # ── Resolve in memory ─────────────────────────────────────────────────
+    rows = []                           # (row, is_new)
+    for file_entry, node_id in entries:
+        if file_entry['filepath'] in insitu:
+            # DEBUG print(f"[discovery] INSITU — skipping: {node_id}")
+            dispatch_summary['insitu'].append(node_id)
+            continue
+
+        is_new = node_id not in existing
+        existing.add(node_id)           # a repeat later in this file is a collision
+        rows.append(({
+            'node_id': node_id,
+            'fields': {
+                'filepath':        file_entry['filepath'],
+                'reviewed':        False,
+                'review_priority': 5,
+                'pattern_matched': file_entry.get('mask_matched', ''),
+                'descriptor':      file_entry.get('descriptor', ''),
+                'date':            file_entry.get('date') or file_entry.get('mtime', ''),
+            },
+        }, is_new))
+
+    # ── Create + wire to Dispatch — one UNWIND per batch ──────────────────
+    for batch in _chunked(rows, IMPORT_BATCH_SIZE):
+        try:
+            session.run(f"""
+                MATCH (d:Dispatch {{`mfi-id`: $source_mfi_id}})
+                UNWIND $rows AS row
+                MERGE (n:FileNode {{`FILE-NODE-id`: row.node_id}})
+                ON CREATE SET n += row.fields, n:`{node_label}`, n:{MASTER_LABEL},
+                              n.filepath_lc = toLower(row.fields.filepath),
+                              n.updated_at = timestamp()
+                ON MATCH SET  n.updated_at = CASE WHEN n.missing_since IS NULL
+                                                  THEN n.updated_at ELSE timestamp() END,
+                              n.missing_since = null
+                CREATE (d)-[:CREATED]->(n)
+            """,
+                source_mfi_id = mfi.source_mfi_id,
+                rows          = [row for row, _ in batch],
+            ).consume()
+        except Exception as e:
+            print(f"[discovery] ERROR: batch of {len(batch)} — {e}")
+            dispatch_summary['errors'].extend(
+                {'filepath': row['fields']['filepath'], 'error': str(e)} for row, _ in batch
+            )
+            continue
+
+        for row, is_new in batch:
+            if is_new:
+                dispatch_summary['nodes_created'] += 1
+                # DEBUG print(f"[discovery] CREATED: {row['node_id']}")
+            else:
+                dispatch_summary['collisions'].append(row['node_id'])
+                # DEBUG print(f"[discovery] COLLISION: {row['node_id']}")
+
+    if rows:
+        file_node_ids.invalidate()
+
+    # ── Removed since the last scan — flag, never delete ──────────────────
+    dispatch_summary['missing'] = 0
+    for batch in _chunked(mfi.removed, IMPORT_BATCH_SIZE):
+        try:
+            dispatch_summary['missing'] += session.run(f"""
+                UNWIND $paths AS path
+                MATCH (n:FileNode)
+                WHERE n.filepath_lc = toLower(path) AND n.filepath = path
+                  AND n.missing_since IS NULL
+                SET n.missing_since = $now, n.updated_at = timestamp()
+                {_TOUCH_MASTERS_OF_N}
+                RETURN count(DISTINCT n) AS flagged
+            """, paths=batch, now=datetime.now().isoformat()).single()['flagged']
+        except Exception as e:
+            print(f"[discovery] ERROR: flagging {len(batch)} removed — {e}")
+            dispatch_summary['errors'].extend({'filepath': path, 'error': str(e)} for path in batch)
+
+    # ── OSResult — after all file work, before archive ────────────────────
+    status = 'failure(s)' if dispatch_summary.get('errors') else 'completed'
+    session.run("""
+        MATCH (d:Dispatch {`mfi-id`: $source_mfi_id})
+        WHERE NOT (d)-[:RESULTED_IN]->()
+        CREATE (r:OSResult {
+            mfi_id:          $mfi_id,
+            status:          $status,
+            file_count:      $file_count,
+            nodes_created:   $nodes_created,
+            collisions:      $collisions,
+            collision_count: $collision_count,
+            errors:          $errors,
+            error_count:     $error_count,
+            removed_count:   $removed_count,
+            missing_flagged: $missing_flagged,
+            incremental:     $incremental,
+            created:         $created
+        })
+        CREATE (d)-[:RESULTED_IN]->(r)
+        SET d.status = $status
+        RETURN r
+    """,
+        source_mfi_id   = mfi.source_mfi_id,
+        mfi_id          = mfi.mfi_id,
+        file_count      = len(mfi.files),
+        nodes_created   = dispatch_summary.get('nodes_created', 0),
+        collisions      = dispatch_summary.get('collisions', []),
+        collision_count = len(dispatch_summary.get('collisions', [])),
+        errors          = [e['error'] for e in dispatch_summary.get('errors', [])],
+        error_count     = len(dispatch_summary.get('errors', [])),
+        removed_count   = len(mfi.removed),
+        missing_flagged = dispatch_summary['missing'],
+        incremental     = mfi.incremental,
+        status          = status,
+        created         = datetime.now().isoformat()
+    )
+    push_result(mfi.source_mfi_id, {
+        'status':        status,
+        'nodes_created': dispatch_summary.get('nodes_created', 0),
+        'collisions':    len(dispatch_summary.get('collisions', [])),
+        'missing':       dispatch_summary['missing'],
+        'errors':        len(dispatch_summary.get('errors', []))
+    })
+
+    move_to_processed(mfi_path)         # after graph work — no ghost state
+    return {'status': status, 'nodes_created': dispatch_summary['nodes_created'],
+            'missing': dispatch_summary['missing']}
+
 def process_copy_results() -> dict:
     """
-    Read completed/ folder, process copy_result MFI files.
+    Process every copy_result MFI in completed/.
+    See process_copy_result for the per-file work.
+    """
+    return _sweep('copy_result', process_copy_result, {'processed': 0, 'errors': []})
+
+def process_copy_result(mfi_path: Path, session=None) -> dict:
+    """
+    Process one copy_result MFI. Archives it to processed/ before the graph work.
     Branches on intent:
         insitu_copy   — update original filepath, create stub node, INSITU_COPY_OF
         master_source — source is master, create secondary at target, COPY_OF
         master_target — target is master, update master filepath, create secondary at source, COPY_OF
     """
-    completed = completed_path()
-    if not completed.exists():
-        return {'status': 'ok', 'processed': 0, 'message': 'completed/ empty'}
-
-    mfi_files = list(completed.glob('*.mfi'))
-    if not mfi_files:
-        return {'status': 'ok', 'processed': 0, 'message': 'nothing to process'}
+    if session is None:
+        with neo4j.get_session() as session:
+            return process_copy_result(mfi_path, session=session)
+
+    mfi = decode(str(mfi_path))
+    if not isinstance(mfi, CopyResultMFI):
+        raise ValueError(f"Not a copy result: {mfi_path.name}")
+    move_to_processed(mfi_path)
+    if not mfi.success:
+        err = mfi.error
+        # DEBUG print(f"[copy] OS failed: {err}")
+        write_os_result(session, mfi, status='failed', errors=[err])
+        push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': err})
+        return {'status': 'failed', 'error': err}
+
+    outcome = _apply_copy_result(session, mfi)
+    if outcome.get('unknown_intent'):
+        # no Dispatch to link — no OSResult
+        return {'status': 'failed', 'error': outcome['error']}
+    if outcome['status'] == 'failed':
+        write_os_result(session, mfi, status='failed', errors=[outcome['error']])
+        push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': outcome['error']})
+        return {'status': 'failed', 'error': outcome['error']}
+
+    created_node_id = outcome['created_node_id']
+    write_os_result(session, mfi, status='completed', errors=[],
+                    created_node_id=created_node_id)
+    push_result(mfi.source_mfi_id, {
+        'status': 'completed', 
+        'intent': mfi.intent, 
+        'node_id': mfi.node_id, 
+        'created_node_id': created_node_id
+    })
+    return {'status': 'completed', 'created_node_id': created_node_id}
+
+def _apply_copy_result(tx, mfi, secondary_id: str = None) -> dict:
+    """
+    Graph work for one successful copy. `tx` is a session or a transaction —
+    anything with .run() — so batches can apply many results in one transaction.
+    secondary_id: id reserved up front for master_source/master_target — required
+    inside a retried transaction, so a retry reuses the id instead of reserving another.
+    Returns {'status': 'completed', 'created_node_id'} or {'status': 'failed', 'error'}.
+    """
+    matched = tx.run("""
+        MATCH (n:FileNode {`FILE-NODE-id`: $node_id})
+        RETURN count(n) AS matched
+    """, node_id=mfi.node_id).single()['matched']
+
+    if matched == 0:
+        # DEBUG print(f"[copy] Node not found in graph: {mfi.node_id}")
+        return {'status': 'failed', 'error': f"Node not found in graph: {mfi.node_id}"}
+
+    if mfi.intent == 'insitu_copy':
+        created_node_id = mfi.node_id + '_insitu'
+
+        tx.run(f"""
+            MATCH (original:FileNode {{`FILE-NODE-id`: $node_id}})
+            SET original.filepath = $target,
+                original.filepath_lc = toLower($target),
+                original.updated_at = timestamp()
+            {_label_if_master('original')}
+            MERGE (stub:FileNode {{`FILE-NODE-id`: $stub_id}})
+            ON CREATE SET stub.filepath = $source,
+                          stub.filepath_lc = toLower($source),
+                          stub.updated_at = timestamp(),
+                          stub.reviewed = true,
+                          stub.review_priority = 0
+            MERGE (stub)-[:INSITU_COPY_OF]->(original)
+            REMOVE stub:{MASTER_LABEL}
+            WITH stub
+            MATCH (d:Dispatch {{`mfi-id`: $source_mfi_id}})
+            CREATE (d)-[:CREATED]->(stub)
+        """,
+            node_id       = mfi.node_id,
+            stub_id       = created_node_id,
+            source        = mfi.source,
+            target        = mfi.target,
+            source_mfi_id = mfi.source_mfi_id,
+        )
+        print(f"[copy] insitu_copy: {mfi.node_id} → stub: {created_node_id}")
+
+    elif mfi.intent == 'master_source':
+        created_node_id = secondary_id or suggest_secondary_id(mfi.node_id, allocator=file_node_ids)
+
+        tx.run(f"""
+            MATCH (master:FileNode {{`FILE-NODE-id`: $node_id}})
+            SET master.updated_at = timestamp()
+            {_label_if_master('master')}
+            MERGE (secondary:FileNode {{`FILE-NODE-id`: $secondary_id}})
+            ON CREATE SET secondary.filepath = $target,
+                          secondary.filepath_lc = toLower($target),
+                          secondary.updated_at = timestamp(),
+                          secondary.reviewed = true,
+                          secondary.review_priority = 0
+            MERGE (secondary)-[:COPY_OF]->(master)
+            REMOVE secondary:{MASTER_LABEL}
+            WITH secondary
+            MATCH (d:Dispatch {{`mfi-id`: $source_mfi_id}})
+            CREATE (d)-[:CREATED]->(secondary)
+        """,
+            node_id       = mfi.node_id,
+            secondary_id  = created_node_id,
+            target        = mfi.target,
+            source_mfi_id = mfi.source_mfi_id,
+        )
+        print(f"[copy] master_source: {mfi.node_id} → secondary: {created_node_id}")
+
+    elif mfi.intent == 'master_target':
+        created_node_id = secondary_id or suggest_secondary_id(mfi.node_id, allocator=file_node_ids)
+
+        tx.run(f"""
+            MATCH (master:FileNode {{`FILE-NODE-id`: $node_id}})
+            SET master.filepath = $target,
+                master.filepath_lc = toLower($target),
+                master.updated_at = timestamp()
+            {_label_if_master('master')}
+            MERGE (secondary:FileNode {{`FILE-NODE-id`: $secondary_id}})
+            ON CREATE SET secondary.filepath = $source,
+                          secondary.filepath_lc = toLower($source),
+                          secondary.updated_at = timestamp(),
+                          secondary.reviewed = true,
+                          secondary.review_priority = 0
+            MERGE (secondary)-[:COPY_OF]->(master)
+            REMOVE secondary:{MASTER_LABEL}
+            WITH secondary
+            MATCH (d:Dispatch {{`mfi-id`: $source_mfi_id}})
+            CREATE (d)-[:CREATED]->(secondary)
+        """,
+            node_id       = mfi.node_id,
+            secondary_id  = created_node_id,
+            source        = mfi.source,
+            target        = mfi.target,
+            source_mfi_id = mfi.source_mfi_id,
+        )
+        print(f"[copy] master_target: {mfi.node_id} → secondary: {created_node_id}")
 
-    summary = {'processed': 0, 'errors': []}
+    else:
+        print(f"[copy] Unknown intent: {mfi.intent} — skipping")
+        return {'status': 'failed', 'error': f"Unknown intent: {mfi.intent}", 'unknown_intent': True}
 
-    with neo4j.get_session() as session:
-        checker = make_checker(session)
-        for mfi_path in mfi_files:
-            try:
-                mfi = decode(str(mfi_path))
-                if not isinstance(mfi, CopyResultMFI):
-                    continue
-                mfi_path.unlink()
-                if not mfi.success:
-                    err = mfi.error
-                    # DEBUG print(f"[copy] OS failed: {err}")
-                    write_os_result(session, mfi, status='failed', errors=[err])
-                    push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': err})
-                    summary['errors'].append({'mfi': mfi_path.name, 'error': err})
-                    summary['processed'] += 1
-                    continue
-
-                matched = session.run("""
-                    MATCH (n:FileNode {`FILE-NODE-id`: $node_id})
-                    RETURN count(n) AS matched
-                """, node_id=mfi.node_id).single()['matched']
-
-                if matched == 0:
-                    err = f"Node not found in graph: {mfi.node_id}"
-                    # DEBUG print(f"[copy] {err}")
-                    write_os_result(session, mfi, status='failed', errors=[err])
-                    push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': err})
-                    summary['errors'].append({'mfi': mfi_path.name, 'error': err})
-                    summary['processed'] += 1
-                    continue
-
-                if mfi.intent == 'insitu_copy':
-                    created_node_id = mfi.node_id + '_insitu'
-
-                    session.run("""
-                        MATCH (original:FileNode {`FILE-NODE-id`: $node_id})
-                        SET original.filepath = $target
-                        MERGE (stub:FileNode {`FILE-NODE-id`: $stub_id})
-                        ON CREATE SET stub.filepath = $source,
-                                      stub.reviewed = true,
-                                      stub.review_priority = 0
-                        MERGE (stub)-[:INSITU_COPY_OF]->(original)
-                        WITH stub
-                        MATCH (d:Dispatch {`mfi-id`: $source_mfi_id})
-                        CREATE (d)-[:CREATED]->(stub)
-                    """,
-                        node_id       = mfi.node_id,
-                        stub_id       = created_node_id,
-                        source        = mfi.source,
-                        target        = mfi.target,
-                        source_mfi_id = mfi.source_mfi_id,
-                    )
-                    print(f"[copy] insitu_copy: {mfi.node_id} → stub: {created_node_id}")
-
-                elif mfi.intent == 'master_source':
-                    created_node_id = suggest_secondary_id(mfi.node_id, checker)
-
-                    session.run("""
-                        MATCH (master:FileNode {`FILE-NODE-id`: $node_id})
-                        MERGE (secondary:FileNode {`FILE-NODE-id`: $secondary_id})
-                        ON CREATE SET secondary.filepath = $target,
-                                      secondary.reviewed = true,
-                                      secondary.review_priority = 0
-                        MERGE (secondary)-[:COPY_OF]->(master)
-                        WITH secondary
-                        MATCH (d:Dispatch {`mfi-id`: $source_mfi_id})
-                        CREATE (d)-[:CREATED]->(secondary)
-                    """,
-                        node_id       = mfi.node_id,
-                        secondary_id  = created_node_id,
-                        target        = mfi.target,
-                        source_mfi_id = mfi.source_mfi_id,
-                    )
-                    print(f"[copy] master_source: {mfi.node_id} → secondary: {created_node_id}")
-
-                elif mfi.intent == 'master_target':
-                    created_node_id = suggest_secondary_id(mfi.node_id, checker)
-
-                    session.run("""
-                        MATCH (master:FileNode {`FILE-NODE-id`: $node_id})
-                        SET master.filepath = $target
-                        MERGE (secondary:FileNode {`FILE-NODE-id`: $secondary_id})
-                        ON CREATE SET secondary.filepath = $source,
-                                      secondary.reviewed = true,
-                                      secondary.review_priority = 0
-                        MERGE (secondary)-[:COPY_OF]->(master)
-                        WITH secondary
-                        MATCH (d:Dispatch {`mfi-id`: $source_mfi_id})
-                        CREATE (d)-[:CREATED]->(secondary)
-                    """,
-                        node_id       = mfi.node_id,
-                        secondary_id  = created_node_id,
-                        source        = mfi.source,
-                        target        = mfi.target,
-                        source_mfi_id = mfi.source_mfi_id,
-                    )
-                    print(f"[copy] master_target: {mfi.node_id} → secondary: {created_node_id}")
-
-                else:
-                    print(f"[copy] Unknown intent: {mfi.intent} — skipping")
-                    summary['errors'].append({'mfi': mfi_path.name, 'error': f"Unknown intent: {mfi.intent}"})
-                    summary['processed'] += 1
-                    continue                    # no Dispatch to link — no OSResult
-
-                write_os_result(session, mfi, status='completed', errors=[],
-                                created_node_id=created_node_id)
-                push_result(mfi.source_mfi_id, {
-                    'status': 'completed', 
-                    'intent': mfi.intent, 
-                    'node_id': mfi.node_id, 
-                    'created_node_id': created_node_id
-                })
-                summary['processed'] += 1
-                
-            except Exception as e:
-                print(f"[copy] ERROR: {mfi_path.name} — {e}")
-                summary['errors'].append({'file': mfi_path.name, 'error': str(e)})
-
-    summary['status'] = 'ok'
-    return summary
+    return {'status': 'completed', 'created_node_id': created_node_id}
 
 def process_move_results() -> dict:
     """
-    Read completed/ folder, process move_result MFI files.
+    Process every move_result MFI in completed/.
+    See process_move_result for the per-file work.
+    """
+    return _sweep('move_result', process_move_result, {'processed': 0, 'errors': []})
+
+def process_move_result(mfi_path: Path, session=None) -> dict:
+    """
+    Process one move_result MFI. Archives it to processed/ before the graph work.
     Branches on intent:
         move    — update filepath on existing node
+        rename  — update filepath + FILE-NODE-id derived from the new name
         archive — update filepath + set archived flag
     """
-    from app.shared.mfi_shared import (
-        decode, completed_path, MoveResultMFI
-    )
+    from app.shared.mfi_shared import MoveResultMFI
 
-    completed = completed_path()
-    if not completed.exists():
-        return {'status': 'ok', 'processed': 0, 'message': 'completed/ empty'}
-
-    mfi_files = list(completed.glob('*.mfi'))
-    if not mfi_files:
-        return {'status': 'ok', 'processed': 0, 'message': 'nothing to process'}
+    if session is None:
+        with neo4j.get_session() as session:
+            return process_move_result(mfi_path, session=session)
+
+    mfi = decode(str(mfi_path))
+    if not isinstance(mfi, MoveResultMFI):
+        raise ValueError(f"Not a move result: {mfi_path.name}")
+    move_to_processed(mfi_path)
+    # DEBUG print(f"[move] archived: {mfi_path.name}")
+    if not mfi.success:
+        err = mfi.error
+        # DEBUG print(f"[move] Skipping failed move: {mfi.error}")
+        push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': err})
+        return {'status': 'failed', 'error': err}
+    outcome = _apply_move_result(session, mfi)
+    if outcome.get('unknown_intent'):
+        # no Dispatch to link — no OSResult
+        return {'status': 'failed', 'error': outcome['error']}
+    if outcome['status'] == 'failed':
+        write_os_result(session, mfi, status='failed', errors=[outcome['error']])
+        push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': outcome['error']})
+        return {'status': 'failed', 'error': outcome['error']}
+
+    # DEBUG print(f"[move] {mfi.intent}: {mfi.node_id} → {mfi.target}")
+    write_os_result(session, mfi, status='completed', errors=[])
+    push_result(mfi.source_mfi_id, {'status': 'completed', 'intent': mfi.intent, 'node_id': mfi.node_id})
+    return {'status': 'completed'}
+
+def _rename_node_id(target: str) -> str:
+    """FILE-NODE-id for a renamed file — the id derived from its new path, incremented on collision."""
+    new_node_id = derive_file_node_id(target, '')
+    if not file_node_ids.claim(new_node_id):
+        # collision — increment
+        new_node_id = suggest_secondary_id(new_node_id, allocator=file_node_ids)
+    return new_node_id
+
+def _apply_move_result(tx, mfi, new_node_id: str = None) -> dict:
+    """
+    Graph work for one successful move. `tx` is a session or a transaction.
+    new_node_id: id reserved up front for a rename — see _apply_copy_result.
+    Returns {'status': 'completed'} or {'status': 'failed', 'error'}.
+    """
+    if mfi.intent == 'move':
+        result = tx.run("""
+            MATCH (n:FileNode {`FILE-NODE-id`: $node_id})
+            SET n.filepath = $target,
+                n.filepath_lc = toLower($target),
+                n.updated_at = timestamp()
+        """ + _TOUCH_MASTERS_OF_N + """
+            RETURN count(DISTINCT n) AS matched
+        """, node_id=mfi.node_id, target=mfi.target)
+
+    elif mfi.intent == 'rename':
+        new_node_id = new_node_id or _rename_node_id(mfi.target)
+
+        result = tx.run(f"""
+            MATCH (n:FileNode {{`FILE-NODE-id`: $node_id}})
+            SET n.filepath = $target,
+                n.filepath_lc = toLower($target),
+                n.`FILE-NODE-id` = $new_node_id,
+                n.updated_at = timestamp()
+            {_tombstone('$node_id')}
+            {_TOUCH_MASTERS_OF_N}
+            RETURN count(DISTINCT n) AS matched
+        """, node_id=mfi.node_id, target=mfi.target, new_node_id=new_node_id)                
+    elif mfi.intent == 'archive':
+        result = tx.run("""
+            MATCH (n:FileNode {`FILE-NODE-id`: $node_id})
+            SET n.filepath = $target,
+                n.filepath_lc = toLower($target),
+                n.archived  = true,
+                n.updated_at = timestamp()
+        """ + _TOUCH_MASTERS_OF_N + """
+            RETURN count(DISTINCT n) AS matched
+        """, node_id=mfi.node_id, target=mfi.target)
+    else:
+        print(f"[move] Unknown intent: {mfi.intent} — skipping")
+        return {'status': 'failed', 'error': f"Unknown intent: {mfi.intent}", 'unknown_intent': True}
+
+    matched = result.single()['matched']
+    if matched == 0:
+        # DEBUG print(f"[move] Node not found in graph: {mfi.node_id}")
+        return {'status': 'failed', 'error': f"Node not found in graph: {mfi.node_id}"}
+    return {'status': 'completed'}
+
+def process_batch_results() -> dict:
+    """
+    Process every batch_result MFI in completed/.
+    See process_batch_result for the per-file work.
+    """
+    return _sweep('batch_result', process_batch_result, {'processed': 0, 'errors': []})
+
+# batch item action → (result dataclass, graph work)
+BATCH_APPLY = {
+    'copy': (CopyResultMFI, _apply_copy_result),
+    'move': (MoveResultMFI, _apply_move_result),
+}
+
+def _reserve_batch_ids(result, apply) -> dict:
+    """Ids an item will create, reserved outside the transaction (execute_write retries the work)."""
+    if not result.success:
+        return {}
+    if apply is _apply_copy_result and result.intent in ('master_source', 'master_target'):
+        return {'secondary_id': suggest_secondary_id(result.node_id, allocator=file_node_ids)}
+    if apply is _apply_move_result and result.intent == 'rename':
+        return {'new_node_id': _rename_node_id(result.target)}
+    return {}
+
+def _apply_batch_item(tx, result, apply, ids: dict) -> dict:
+    if not result.success:
+        return {'status': 'failed', 'error': result.error}
+    if apply is None:
+        return {'status': 'failed', 'error': f"Unsupported batch action for {result.node_id}"}
+    return apply(tx, result, **ids)
+
+def process_batch_result(mfi_path: Path, session=None) -> dict:
+    """
+    Process one batch_result MFI — every item's graph work in one write
+    transaction, then one OSResult and one SSE push for the whole batch.
+    Items the OS failed are recorded, never applied. If the transaction
+    itself fails, items are applied one transaction each so a single bad
+    item cannot hold back the rest. New ids are reserved once, before the
+    transaction, so driver retries and the fallback reuse them.
+    Archives to processed/ after the graph work.
+    """
+    from app.shared.mfi_shared import BatchResultMFI
 
-    summary = {'processed': 0, 'errors': []}
+    if session is None:
+        with neo4j.get_session() as session:
+            return process_batch_result(mfi_path, session=session)
+
+    mfi = decode(str(mfi_path))
+    if not isinstance(mfi, BatchResultMFI):
+        raise ValueError(f"Not a batch result: {mfi_path.name}")
+
+    items = []
+    for entry in mfi.results:
+        cls, apply = BATCH_APPLY.get(entry.get('action'), (CopyResultMFI, None))
+        result = cls(source_mfi_id = mfi.source_mfi_id,
+                     mfn_id        = mfi.mfn_id,
+                     node_id       = entry.get('node_id', ''),
+                     source        = entry.get('source', ''),
+                     target        = entry.get('target', ''),
+                     intent        = entry.get('intent', ''),
+                     success       = bool(entry.get('success')),
+                     error         = entry.get('error', ''))
+        items.append((entry, result, apply, _reserve_batch_ids(result, apply)))
 
-    with neo4j.get_session() as session:
-        for mfi_path in mfi_files:
+    try:
+        outcomes = session.execute_write(
+            lambda tx: [_apply_batch_item(tx, result, apply, ids) for _, result, apply, ids in items])
+    except Exception as e:
+        print(f"[batch] {mfi_path.name}: transaction failed ({e}) — applying items one by one")
+        outcomes = []
+        for _, result, apply, ids in items:
             try:
-                mfi = decode(str(mfi_path))
-                if not isinstance(mfi, MoveResultMFI):
-                    continue
-                mfi_path.unlink() 
-                # DEBUG print(f"[move] unlinked: {mfi_path.name}")
-                if not mfi.success:
-                    err = mfi.error
-                    # DEBUG print(f"[move] Skipping failed move: {mfi.error}")
-                    summary['errors'].append({'mfi': mfi_path.name, 'error': err})
-                    push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': err})
-                    summary['processed'] += 1
-                    continue
-                if mfi.intent == 'move':
-                    result = session.run("""
-                        MATCH (n:FileNode {`FILE-NODE-id`: $node_id})
-                        SET n.filepath = $target
-                        RETURN count(n) AS matched
-                    """, node_id=mfi.node_id, target=mfi.target)
-
-                elif mfi.intent == 'rename':
-                    from app.services.neo4j_service import derive_file_node_id
-                    checker = make_checker(session)
-                    
-                    new_node_id = derive_file_node_id(mfi.target, '')
-                    
-                    if not checker(new_node_id):
-                        # collision — increment
-                        new_node_id = suggest_secondary_id(new_node_id, checker)
-                    
-                    result = session.run("""
-                        MATCH (n:FileNode {`FILE-NODE-id`: $node_id})
-                        SET n.filepath = $target,
-                            n.`FILE-NODE-id` = $new_node_id
-                        RETURN count(n) AS matched
-                    """, node_id=mfi.node_id, target=mfi.target, new_node_id=new_node_id)                
-                elif mfi.intent == 'archive':
-                    result = session.run("""
-                        MATCH (n:FileNode {`FILE-NODE-id`: $node_id})
-                        SET n.filepath = $target,
-                            n.archived  = true
-                        RETURN count(n) AS matched
-                    """, node_id=mfi.node_id, target=mfi.target)
-                else:
-                    print(f"[move] Unknown intent: {mfi.intent} — skipping")
-                    summary['errors'].append({'mfi': mfi_path.name, 'error': f"Unknown intent: {mfi.intent}"})
-                    summary['processed'] += 1
-                    continue                    # no Dispatch to link — no OSResult
-
-                matched = result.single()['matched']
-                if matched == 0:
-                    err = f"Node not found in graph: {mfi.node_id}"
-                    # DEBUG print(f"[move] {err}")
-                    write_os_result(session, mfi, status='failed', errors=[err])
-                    push_result(mfi.source_mfi_id, {'status': 'failed', 'intent': mfi.intent, 'error': err})
-                    
-                    summary['errors'].append({'mfi': mfi_path.name, 'error': err})
-                    summary['processed'] += 1
-                    continue
-
-                # DEBUG print(f"[move] {mfi.intent}: {mfi.node_id} → {mfi.target}")
-                write_os_result(session, mfi, status='completed', errors=[])
-                push_result(mfi.source_mfi_id, {'status': 'completed', 'intent': mfi.intent, 'node_id': mfi.node_id})
-                summary['processed'] += 1
+                outcomes.append(session.execute_write(
+                    lambda tx: _apply_batch_item(tx, result, apply, ids)))
+            except Exception as item_error:
+                outcomes.append({'status': 'failed', 'error': str(item_error)})
+
+    summary = []
+    for (entry, result, _, _), outcome in zip(items, outcomes):
+        row = {'item_id': entry.get('item_id', ''), 'node_id': result.node_id,
+               'intent': result.intent, 'status': outcome['status']}
+        if outcome.get('error'):
+            row['error'] = outcome['error']
+        if outcome.get('created_node_id'):
+            row['created_node_id'] = outcome['created_node_id']
+        summary.append(row)
+    errors = [f"{row['item_id'] or row['node_id']}: {row['error']}" for row in summary if 'error' in row]
+    status = 'failure(s)' if errors else 'completed'
 
-            except Exception as e:
-                print(f"[move] ERROR: {mfi_path.name} — {e}")
-                # TODO: push_result here so error is flagged in SSE channel.
-                summary['errors'].append({'file': mfi_path.name, 'error': str(e)})
-                
-    summary['status'] = 'ok'
-    return summary
+    session.run("""
+        MATCH (d:Dispatch {`mfi-id`: $source_mfi_id})
+        WHERE NOT (d)-[:RESULTED_IN]->()
+        CREATE (r:OSResult {
+            mfi_id:           $mfi_id,
+            status:           $status,
+            item_count:       $item_count,
+            failed_count:     $failed_count,
+            created_node_ids: $created_node_ids,
+            errors:           $errors,
+            error_count:      $error_count,
+            created:          $created
+        })
+        CREATE (d)-[:RESULTED_IN]->(r)
+        SET d.status = $status
+    """,
+        source_mfi_id    = mfi.source_mfi_id,
+        mfi_id           = mfi.mfi_id,
+        status           = status,
+        item_count       = len(summary),
+        failed_count     = len(errors),
+        created_node_ids = [row['created_node_id'] for row in summary if 'created_node_id' in row],
+        errors           = errors,
+        error_count      = len(errors),
+        created          = datetime.now().isoformat()
+    ).consume()
+    push_result(mfi.source_mfi_id, {'status': status, 'items': summary, 'errors': len(errors)})
 
-def load_gfn_nodes(mfn: dict, label: str, mapped: list[dict]):
+    move_to_processed(mfi_path)         # after graph work — no ghost state
+    return {'status': status, 'items': len(summary), 'failed': len(errors)}
+
+def load_gfn_nodes(mfn: dict, label: str, mapped, batch_size: int = None) -> dict:
     with neo4j.get_session() as session:
         ensure_filenode_constraint(session)
         ensure_mfn_constraint(session)
         create_mfn_node(session, mfn)
-        create_nodes_with_relationships(session, label, mapped)
+        summary = bulk_import_nodes(session, label, mapped, batch_size=batch_size)
+        reset_filenode_epoch(session)
+        return summary
        
 def get_export_nodes() -> list:
+    return list(iter_export_nodes())
+
+# bookkeeping properties — rebuilt by the importer or by discovery, never exported
+DERIVED_PROPERTIES = ('filepath_lc', 'updated_at', 'missing_since')
+
+def iter_export_nodes(since: int = None):
+    """
+    Stream export rows — {node, related} per master, in FILE-NODE-id order —
+    straight off the Cypher cursor. The session stays open until exhausted.
+    since: only masters stamped at or after this graph timestamp (delta export).
+    """
     with neo4j.get_session() as session:
-        result = session.run("""
+        master = (f"n:{MASTER_LABEL}" if _is_ready(session, MASTER_LABEL) else
+                  f"NOT EXISTS {{ (n)-[:{COPY_RELS}]->() }}")
+        where = [master] if since is None else ["n.updated_at >= $since", master]
+        result = session.run(f"""
             MATCH (n:FileNode)
-            WHERE NOT (n)-[:INSITU_COPY_OF]->()
-              AND NOT (n)-[:COPY_OF]->()
+            WHERE {' AND '.join(where)}
             OPTIONAL MATCH (stub)-[r:INSITU_COPY_OF|COPY_OF]->(n)
             RETURN n, 
                    collect(
                      CASE WHEN stub IS NOT NULL 
-                     THEN {rel: type(r), stub: properties(stub), stub_id: stub.`FILE-NODE-id`} 
+                     THEN {{rel: type(r), stub: properties(stub), stub_id: stub.`FILE-NODE-id`}} 
                      ELSE NULL END
                    ) as related
             ORDER BY n.`FILE-NODE-id`
-        """)
-        rows = []
+        """, since=since)
         for record in result:
             node = dict(record['n'])
+            for prop in DERIVED_PROPERTIES:
+                node.pop(prop, None)
             related = [r for r in record['related'] if r is not None]
-            rows.append({'node': node, 'related': related})
-    return rows
+            yield {'node': node, 'related': related}
+
+def iter_deleted_file_node_ids(since: int):
+    """FILE-NODE-ids removed (deleted or renamed away) at or after graph timestamp `since`."""
+    with neo4j.get_session() as session:
+        result = session.run(f"""
+            MATCH (t:{TOMBSTONE_LABEL})
+            WHERE t.deleted_at >= $since
+            RETURN t.`FILE-NODE-id` AS id
+            ORDER BY id
+        """, since=since)
+        for record in result:
+            yield record['id']
 
 def get_all_mfns():
     with neo4j.get_session() as session:
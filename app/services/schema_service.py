@@ -14,6 +14,9 @@ OPTIONAL_FIELDS = [
 ]
 REVIEW_FIELDS = ['reviewed', 'review_priority', 'pattern_matched']
 
+# libyaml loader when available — same safe semantics, much faster per block
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 def load_mfn(mfn_path):
     with open(mfn_path, "r", encoding="utf-8") as fh:
         node = yaml.safe_load(fh)
@@ -23,59 +26,86 @@ def load_mfn(mfn_path):
         return node
 
 def parse_gfn(gfn_path):
-    text = open(gfn_path, "r", encoding="utf-8").read()
-    # Split into blocks by FILE-NODE: marker (keep entries after the marker)
-    parts = re.split(r'(?m)^FILE-NODE:\s*', text)
-    nodes = []
-    for part in parts[1:]:
-        # first line is the id/key, remainder are properties
-        m = re.match(r"([^\n]+)\r?\n(.*)$", part, re.S)
-        if not m:
-            continue
-        node_id = m.group(1).strip()
-        body = m.group(2)
-        # build a YAML-like block with an explicit id field
-        yaml_block = f"FILE-NODE-id: \"{node_id}\"\n" + body
-        try:
-            data = yaml.safe_load(yaml_block)
-            # DEBUG print(f"[parse_gfn] {data.get('FILE-NODE-id')} — keys: {list(data.keys())}")
-            if not isinstance(data, dict):
-                data = {"FILE-NODE-id": node_id}
-        except Exception:
-            # fallback to simple line-by-line parse
+    """Materialized GFN parse — list of every FILE-NODE record. See iter_gfn."""
+    return list(iter_gfn(gfn_path))
+
+def iter_gfn(gfn_path):
+    """
+    Stream a GFN file, yielding one node dict per FILE-NODE: record.
+    The file is scanned line by line — a record is parsed and yielded as soon
+    as the next FILE-NODE: header (or EOF) closes it, so memory stays flat and
+    the importer can write batches while the rest of the file is still unread.
+    Related stubs are included under '_related', same as parse_gfn.
+    """
+    for node_id, lines in iter_gfn_blocks(gfn_path):
+        yield parse_gfn_record(node_id, lines)
+
+def iter_gfn_blocks(gfn_path):
+    """
+    Stream a GFN file as raw records: (node_id, lines) per FILE-NODE:, where
+    lines are the header plus body exactly as written. Text before the first
+    header is skipped.
+    """
+    with open(gfn_path, "r", encoding="utf-8") as fh:
+        node_id, lines = None, []
+        for line in fh:
+            if line.startswith('FILE-NODE:'):
+                if node_id is not None:
+                    yield node_id, lines
+                node_id, lines = line[len('FILE-NODE:'):].strip(), [line]
+            elif node_id is not None:
+                lines.append(line)
+        if node_id is not None:
+            yield node_id, lines
+
+def parse_gfn_record(node_id: str, lines: list) -> dict:
+    """Parse one raw record from iter_gfn_blocks into a node dict."""
+    return _parse_gfn_block(node_id, lines[1:])
+
+def _parse_gfn_block(node_id: str, lines: list) -> dict:
+    """Parse one FILE-NODE record body (lines after the header) into a node dict."""
+    body = "".join(lines)
+    # build a YAML-like block with an explicit id field
+    yaml_block = f"FILE-NODE-id: \"{node_id}\"\n" + body
+    try:
+        data = yaml.load(yaml_block, Loader=_YamlLoader)
+        # DEBUG print(f"[parse_gfn] {data.get('FILE-NODE-id')} — keys: {list(data.keys())}")
+        if not isinstance(data, dict):
             data = {"FILE-NODE-id": node_id}
-            for line in body.splitlines():
-                if ":" not in line:
-                    continue
-                k, v = line.split(":", 1)
-                k = k.strip()
-                v = v.strip()
-                if v.startswith('"') and v.endswith('"'):
-                    v = v[1:-1]
-                if v.startswith("'") and v.endswith("'"):
-                    v = v[1:-1]
-                # handle empty lists '[]' and simple lists
-                if v.startswith("[") and v.endswith("]"):
-                    # remove brackets and split by comma
-                    items = [it.strip().strip('"').strip("'") for it in v[1:-1].split(",") if it.strip()]
-                    data[k] = items
-                else:
-                    data[k] = v
-        related = data.pop('related', None)
-        if related and isinstance(related, list):
-            data['_related'] = []
-            for entry in related:
-                if not isinstance(entry, dict):
-                    continue
-                rel_type = entry.get('relationship')
-                stub = entry.get('node')
-                if rel_type and isinstance(stub, dict):
-                    data['_related'].append({
-                        'relationship': rel_type,
-                        'node': stub
-                    })
-        nodes.append(data)
-    return nodes
+    except Exception:
+        # fallback to simple line-by-line parse
+        data = {"FILE-NODE-id": node_id}
+        for line in body.splitlines():
+            if ":" not in line:
+                continue
+            k, v = line.split(":", 1)
+            k = k.strip()
+            v = v.strip()
+            if v.startswith('"') and v.endswith('"'):
+                v = v[1:-1]
+            if v.startswith("'") and v.endswith("'"):
+                v = v[1:-1]
+            # handle empty lists '[]' and simple lists
+            if v.startswith("[") and v.endswith("]"):
+                # remove brackets and split by comma
+                items = [it.strip().strip('"').strip("'") for it in v[1:-1].split(",") if it.strip()]
+                data[k] = items
+            else:
+                data[k] = v
+    related = data.pop('related', None)
+    if related and isinstance(related, list):
+        data['_related'] = []
+        for entry in related:
+            if not isinstance(entry, dict):
+                continue
+            rel_type = entry.get('relationship')
+            stub = entry.get('node')
+            if rel_type and isinstance(stub, dict):
+                data['_related'].append({
+                    'relationship': rel_type,
+                    'node': stub
+                })
+    return data
 
 def get_src_folders(mapped: list[dict]) -> list[str]:
     """
@@ -94,62 +124,89 @@ def get_src_folders(mapped: list[dict]) -> list[str]:
                 folders.append(folder)
     return folders
 
+def tap_src_folders(nodes, folders: list):
+    """
+    Pass mapped nodes through unchanged, collecting unique parent folders into
+    `folders` as they stream by. Streaming counterpart of get_src_folders.
+    """
+    from pathlib import PureWindowsPath
+    seen = set(folders)
+    for node in nodes:
+        fp = node.get('filepath', '')
+        if fp:
+            folder = str(PureWindowsPath(fp).parent)
+            if folder not in seen:
+                seen.add(folder)
+                folders.append(folder)
+        yield node
+
 def serialize_gfn(rows: list, mfn: dict) -> str:
     """
     Serialize export rows to GFN YAML string.
     Field order: system → core → optional → review → related stubs.
     Nulls and empty lists skipped.
     """
-    lines = []
-    field_order = SYSTEM_FIELDS + CORE_FIELDS + OPTIONAL_FIELDS + REVIEW_FIELDS
+    return "".join(iter_serialize_gfn(rows, mfn))
+
 
+def iter_serialize_gfn(rows, mfn: dict):
+    """
+    Streaming serialize_gfn — yields one text chunk per record, so an export
+    can go from the Cypher cursor to disk without holding the whole file.
+    Concatenated chunks equal serialize_gfn(rows, mfn).
+    """
+    field_order = SYSTEM_FIELDS + CORE_FIELDS + OPTIONAL_FIELDS + REVIEW_FIELDS
+    known = set(field_order)
+    separator = ""
     for row in rows:
-        node = row['node']
-        related = row.get('related', [])
-
-        node_id = node.get('FILE-NODE-id', '')
-        lines.append(f"FILE-NODE: {node_id}")
-
-        # write fields in order, skip nulls and empty lists
-        for field in field_order:
-            if field == 'FILE-NODE-id':
-                continue  # already written as FILE-NODE header
-            val = node.get(field)
-            if val is None or val == '' or val == []:
-                continue
-            lines.append(_format_field(field, val))
+        yield separator + "\n".join(_gfn_record_lines(row, field_order, known)) + "\n"
+        separator = "\n"  # blank line between records
 
-        # write any remaining fields not in ordered list
-        known = set(field_order)
-        for k, v in node.items():
-            if k in known or k == 'FILE-NODE-id':
-                continue
-            if v is None or v == '' or v == []:
-                continue
-            lines.append(_format_field(k, v))
-
-        # write related stubs
-        if related:
-            lines.append("related:")
-            for entry in related:
-                rel_type = entry['rel']
-                stub = entry['stub']
-                stub_id = entry['stub_id']
-                lines.append(f"  - relationship: {rel_type}")
-                lines.append(f"    node:")
-                lines.append(f"      FILE-NODE-id: {stub_id}")
-                for sf in ['filepath', 'reviewed', 'review_priority']:
-                    sv = stub.get(sf)
-                    if sv is None:
-                        continue
-                    lines.append(f"      {sf}: {_scalar(sv)}")
-                # relationship field on stub for import fidelity
-                rel_field = 'insitu_copy_of' if rel_type == 'INSITU_COPY_OF' else 'copy_of'
-                lines.append(f"      {rel_field}: {node_id}")
-
-        lines.append("")  # blank line between records
-
-    return "\n".join(lines)
+
+def _gfn_record_lines(row: dict, field_order: list, known: set) -> list:
+    lines = []
+    node = row['node']
+    related = row.get('related', [])
+
+    node_id = node.get('FILE-NODE-id', '')
+    lines.append(f"FILE-NODE: {node_id}")
+
+    # write fields in order, skip nulls and empty lists
+    for field in field_order:
+        if field == 'FILE-NODE-id':
+            continue  # already written as FILE-NODE header
+        val = node.get(field)
+        if val is None or val == '' or val == []:
+            continue
+        lines.append(_format_field(field, val))
+
+    # write any remaining fields not in ordered list
+    for k, v in node.items():
+        if k in known or k == 'FILE-NODE-id':
+            continue
+        if v is None or v == '' or v == []:
+            continue
+        lines.append(_format_field(k, v))
+
+    # write related stubs
+    if related:
+        lines.append("related:")
+        for entry in related:
+            rel_type = entry['rel']
+            stub = entry['stub']
+            stub_id = entry['stub_id']
+            lines.append(f"  - relationship: {rel_type}")
+            lines.append(f"    node:")
+            lines.append(f"      FILE-NODE-id: {stub_id}")
+            for sf in ['filepath', 'reviewed', 'review_priority']:
+                sv = stub.get(sf)
+                if sv is None:
+                    continue
+                lines.append(f"      {sf}: {_scalar(sv)}")
+            # relationship field on stub for import fidelity
+            rel_field = 'insitu_copy_of' if rel_type == 'INSITU_COPY_OF' else 'copy_of'
+            lines.append(f"      {rel_field}: {node_id}")
+    return lines
 
 
 def _format_field(key: str, val) -> str:
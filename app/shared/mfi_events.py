@@ -0,0 +1,319 @@
+"""
+mfi_events.py — change notification for MFI queue folders.
+
+Shared by the Flask broker (completed/) and the Windows watcher (pending/).
+Zero framework dependencies — stdlib only.
+
+Three watchers with the same interface:
+    InotifyWatcher  — Linux inotify via ctypes. Wakes on IN_MOVED_TO
+                      (.mft -> .mfi rename) and IN_CLOSE_WRITE.
+    Win32Watcher    — Windows ReadDirectoryChangesW via ctypes (overlapped,
+                      so wait() can time out). Wakes on renames into the
+                      folder (.mft -> .mfi); files created in place are left
+                      to the rescan, since Windows has no close-write event.
+                      Opt-in (mode='win32') until it has been run on Windows;
+                      'auto' polls there.
+    PollingWatcher  — fallback for bind mounts that do not forward events
+                      (e.g. the Windows folder mounted into docker). Lists
+                      the folder every interval.
+
+    watcher = watch_directory(completed_path())
+    while True:
+        for path in watcher.wait():
+            ...
+
+wait() returns the .mfi paths that appeared since the last call. The first
+call returns the existing backlog. Every `rescan_interval` seconds a full
+listing is returned instead, so missed events and files left behind by a
+failed run are picked up again at a slow cadence.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+
+MFI_SUFFIX      = '.mfi'
+RESCAN_INTERVAL = 60    # seconds between full listings
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_Q_OVERFLOW  = 0x00004000
+_EVENT         = struct.Struct('iIII')   # wd, mask, cookie, len
+
+# ReadDirectoryChangesW constants
+FILE_LIST_DIRECTORY          = 0x0001
+FILE_SHARE_ALL               = 0x0001 | 0x0002 | 0x0004   # read | write | delete
+OPEN_EXISTING                = 3
+FILE_FLAG_BACKUP_SEMANTICS   = 0x02000000                 # required to open a directory
+FILE_FLAG_OVERLAPPED         = 0x40000000
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x00000001
+FILE_ACTION_RENAMED_NEW_NAME = 5
+WAIT_OBJECT_0                = 0x00000000
+WAIT_TIMEOUT                 = 0x00000102
+ERROR_NOTIFY_ENUM_DIR        = 1022                       # buffer overflowed — re-list
+_NOTIFY = struct.Struct('<III')   # NextEntryOffset, Action, FileNameLength
+
+
+class _OVERLAPPED(ctypes.Structure):
+    _fields_ = [('Internal',     ctypes.c_void_p),
+                ('InternalHigh', ctypes.c_void_p),
+                ('Offset',       ctypes.c_uint32),
+                ('OffsetHigh',   ctypes.c_uint32),
+                ('hEvent',       ctypes.c_void_p)]
+
+
+def _listing(folder: Path, suffix: str) -> list[Path]:
+    try:
+        with os.scandir(folder) as it:
+            return sorted(Path(e.path) for e in it if e.name.endswith(suffix))
+    except FileNotFoundError:
+        return []
+
+
+class PollingWatcher:
+    """List the folder every `interval` seconds, report names not seen before."""
+    mode = 'poll'
+
+    def __init__(self, folder: Path, suffix: str = MFI_SUFFIX, interval: float = 2.0,
+                 rescan_interval: float = RESCAN_INTERVAL):
+        self.folder          = Path(folder)
+        self.suffix          = suffix
+        self.interval        = interval
+        self.rescan_interval = rescan_interval
+        self._seen           = set()
+        self._last_rescan    = 0.0
+
+    def wait(self, timeout: float = None) -> list[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = _listing(self.folder, self.suffix)
+            now = time.monotonic()
+            if now - self._last_rescan >= self.rescan_interval:
+                self._last_rescan = now
+                self._seen = set(current)
+                if current:
+                    return current
+            else:
+                new = [p for p in current if p not in self._seen]
+                # forget names that disappeared so a reused name is reported again
+                self._seen = set(current)
+                if new:
+                    return new
+            if deadline is not None and now >= deadline:
+                return []
+            pause = self.interval if deadline is None else min(self.interval, deadline - now)
+            time.sleep(max(pause, 0))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Block on inotify events for the folder. Linux only."""
+    mode = 'inotify'
+
+    def __init__(self, folder: Path, suffix: str = MFI_SUFFIX,
+                 rescan_interval: float = RESCAN_INTERVAL):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify is Linux only")
+        self.folder          = Path(folder)
+        self.suffix          = suffix
+        self.rescan_interval = rescan_interval
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(self.folder),
+                                    IN_MOVED_TO | IN_CLOSE_WRITE)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, f"inotify_add_watch failed: {self.folder}")
+        # watch is armed before the first listing — nothing falls in between
+        self._last_rescan = 0.0
+
+    def wait(self, timeout: float = None) -> list[Path]:
+        now = time.monotonic()
+        if now - self._last_rescan >= self.rescan_interval:
+            self._last_rescan = now
+            self._drain()                   # listing supersedes queued events
+            current = _listing(self.folder, self.suffix)
+            if current:
+                return current
+
+        remaining = self.rescan_interval - (now - self._last_rescan)
+        limit = remaining if timeout is None else min(timeout, remaining)
+        ready, _, _ = select.select([self._fd], [], [], max(limit, 0))
+        if not ready:
+            return []
+
+        names, overflow = self._drain()
+        if overflow:
+            self._last_rescan = time.monotonic()
+            return _listing(self.folder, self.suffix)
+        paths = sorted({self.folder / n for n in names if n.endswith(self.suffix)})
+        return [p for p in paths if p.exists()]
+
+    def _drain(self) -> tuple[list[str], bool]:
+        """Read every queued event. Returns (filenames, overflowed)."""
+        names, overflow = [], False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif name:
+                    names.append(os.fsdecode(name))
+        return names, overflow
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+
+class Win32Watcher:
+    """Block on ReadDirectoryChangesW for the folder. Windows only."""
+    mode = 'win32'
+
+    def __init__(self, folder: Path, suffix: str = MFI_SUFFIX,
+                 rescan_interval: float = RESCAN_INTERVAL):
+        if sys.platform != 'win32':
+            raise OSError(errno.ENOSYS, "ReadDirectoryChangesW is Windows only")
+        from ctypes import wintypes
+        self.folder          = Path(folder)
+        self.suffix          = suffix
+        self.rescan_interval = rescan_interval
+
+        k32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        k32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                    wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+        k32.CreateFileW.restype = wintypes.HANDLE
+        k32.CreateEventW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+        k32.CreateEventW.restype = wintypes.HANDLE
+        k32.ReadDirectoryChangesW.argtypes = [wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD,
+                                              wintypes.BOOL, wintypes.DWORD, wintypes.LPDWORD,
+                                              ctypes.POINTER(_OVERLAPPED), wintypes.LPVOID]
+        k32.ReadDirectoryChangesW.restype = wintypes.BOOL
+        k32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        k32.WaitForSingleObject.restype = wintypes.DWORD
+        k32.GetOverlappedResult.argtypes = [wintypes.HANDLE, ctypes.POINTER(_OVERLAPPED),
+                                            wintypes.LPDWORD, wintypes.BOOL]
+        k32.GetOverlappedResult.restype = wintypes.BOOL
+        k32.CancelIoEx.argtypes = [wintypes.HANDLE, ctypes.POINTER(_OVERLAPPED)]
+        k32.CancelIoEx.restype = wintypes.BOOL
+        k32.CloseHandle.argtypes = [wintypes.HANDLE]
+        k32.CloseHandle.restype = wintypes.BOOL
+        self._k32 = k32
+
+        invalid = ctypes.c_void_p(-1).value
+        self._dir = k32.CreateFileW(str(self.folder), FILE_LIST_DIRECTORY, FILE_SHARE_ALL, None,
+                                    OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS | FILE_FLAG_OVERLAPPED, None)
+        if self._dir in (None, invalid):
+            raise ctypes.WinError(ctypes.get_last_error())
+        self._event = k32.CreateEventW(None, True, False, None)
+        if not self._event:
+            err = ctypes.get_last_error()
+            k32.CloseHandle(self._dir)
+            raise ctypes.WinError(err)
+        self._buffer     = ctypes.create_string_buffer(64 * 1024)
+        self._overlapped = _OVERLAPPED(hEvent=self._event)
+        self._transferred = wintypes.DWORD()
+        self._arm()                         # armed before the first listing
+        self._last_rescan = 0.0
+
+    def _arm(self):
+        ok = self._k32.ReadDirectoryChangesW(
+            self._dir, self._buffer, len(self._buffer), False, FILE_NOTIFY_CHANGE_FILE_NAME,
+            None, ctypes.byref(self._overlapped), None)
+        if not ok:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def wait(self, timeout: float = None) -> list[Path]:
+        now = time.monotonic()
+        if now - self._last_rescan >= self.rescan_interval:
+            self._last_rescan = now
+            current = _listing(self.folder, self.suffix)
+            if current:
+                return current
+
+        remaining = self.rescan_interval - (now - self._last_rescan)
+        limit = remaining if timeout is None else min(timeout, remaining)
+        state = self._k32.WaitForSingleObject(self._event, int(max(limit, 0) * 1000))
+        if state == WAIT_TIMEOUT:
+            return []
+        if state != WAIT_OBJECT_0:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        ok = self._k32.GetOverlappedResult(self._dir, ctypes.byref(self._overlapped),
+                                           ctypes.byref(self._transferred), False)
+        err = 0 if ok else ctypes.get_last_error()
+        data = self._buffer.raw[:self._transferred.value] if ok else b''
+        self._arm()
+        if err and err != ERROR_NOTIFY_ENUM_DIR:
+            raise ctypes.WinError(err)
+        if not data:                        # overflow — events were dropped
+            self._last_rescan = time.monotonic()
+            return _listing(self.folder, self.suffix)
+
+        names, offset = set(), 0
+        while True:
+            next_entry, action, length = _NOTIFY.unpack_from(data, offset)
+            if action == FILE_ACTION_RENAMED_NEW_NAME:
+                start = offset + _NOTIFY.size
+                names.add(data[start:start + length].decode('utf-16-le'))
+            if not next_entry:
+                break
+            offset += next_entry
+        paths = sorted(self.folder / n for n in names if n.endswith(self.suffix))
+        return [p for p in paths if p.exists()]
+
+    def close(self):
+        if self._dir is not None:
+            self._k32.CancelIoEx(self._dir, ctypes.byref(self._overlapped))
+            # wait for the cancelled read — it still owns the buffer
+            self._k32.GetOverlappedResult(self._dir, ctypes.byref(self._overlapped),
+                                          ctypes.byref(self._transferred), True)
+            self._k32.CloseHandle(self._dir)
+            self._k32.CloseHandle(self._event)
+            self._dir = None
+
+
+def watch_directory(folder: Path, mode: str = 'auto', suffix: str = MFI_SUFFIX,
+                    interval: float = 2.0, rescan_interval: float = RESCAN_INTERVAL):
+    """
+    Build a watcher for `folder`.
+    mode: 'inotify' | 'win32' | 'poll' | 'auto' (inotify on Linux when
+    available, else polling — Win32Watcher is only used when asked for).
+    """
+    if mode not in ('auto', 'inotify', 'win32', 'poll'):
+        raise ValueError(f"Unknown watch mode: {mode}")
+    if mode == 'auto' and sys.platform == 'win32':
+        mode = 'poll'
+    if mode != 'poll':
+        events = Win32Watcher if mode == 'win32' else InotifyWatcher
+        try:
+            return events(folder, suffix=suffix, rescan_interval=rescan_interval)
+        except (OSError, AttributeError) as e:
+            if mode != 'auto':
+                raise
+            print(f"[mfi_events] {events.mode} unavailable ({e}) — polling {folder}")
+    return PollingWatcher(folder, suffix=suffix, interval=interval,
+                          rescan_interval=rescan_interval)
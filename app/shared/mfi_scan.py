@@ -0,0 +1,308 @@
+"""
+mfi_scan.py — directory scanning for discovery MFIs.
+
+Used by the Windows watcher (handle_discovery). Zero framework dependencies —
+stdlib only.
+
+    scanner = MaskScanner(['busCard', 'BusCard'])
+    for path, mask, stat in scan_directory(source, scanner, recursive=True,
+                                           exclude=['.git', '*.tmp']):
+        ...
+
+- os.scandir walks each folder once; DirEntry type checks come from the
+  directory listing, and stat() is only called for files that match a mask
+  (cached on the entry — free on Windows).
+- Masks are compiled into one regex as a fast reject; only names that contain
+  some mask go through the ordered loop, so the first mask in MFN order still
+  wins, exactly as before.
+- recursive=True walks subdirectories on a thread pool — scandir releases the
+  GIL, so deep trees on slow disks/shares are listed in parallel.
+- include / exclude are fnmatch globs. A glob without '/' matches the entry
+  name, one with '/' matches the path relative to the scan root. include
+  applies to files; exclude applies to files and prunes directories.
+
+Incremental discovery keeps the last scan per (source, masks, options) in a
+local SQLite file (MFI_SCAN_DB, default ~/.mfi_scan.db):
+
+    manifest = ScanManifest()
+    scope = scan_scope(source, masks, recursive, include, exclude)
+    added, modified, removed = manifest.diff(scope, found)
+    ...                                   # emit the result
+    manifest.stage(result_id, scope, added + modified, removed)
+    ...                                   # once the result is confirmed processed
+    manifest.commit(result_id)
+
+A staged diff is only folded into the snapshot by commit(); until then the
+next scan still diffs against the last confirmed snapshot, so files in a
+result that was never processed are reported again.
+
+A file counts as modified when its size, mtime_ns or file id changed. The
+file id is st_ino from the scandir stat — free on POSIX, always 0 on Windows
+(DirEntry.stat() leaves it unset), where size + mtime carry the diff.
+"""
+
+import os
+import re
+import json
+import hashlib
+import sqlite3
+import fnmatch
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+SCAN_WORKERS = int(os.environ.get('MFI_SCAN_WORKERS', min(32, (os.cpu_count() or 1) + 4)))
+SCAN_DB      = os.environ.get('MFI_SCAN_DB') or str(Path.home() / '.mfi_scan.db')
+
+
+class MaskScanner:
+    """filename_contains masks — one combined regex, first-listed mask wins."""
+
+    def __init__(self, masks: list):
+        self.masks = [m for m in masks if m]
+        alternation = "|".join(re.escape(m) for m in self.masks)
+        self._any = re.compile(alternation) if self.masks else None
+
+    def match(self, name: str) -> str | None:
+        if self._any is None or not self._any.search(name):
+            return None
+        for mask in self.masks:
+            if mask in name:
+                return mask
+        return None
+
+
+class _Globs:
+    """A list of fnmatch globs compiled into one regex for names and one for paths."""
+
+    def __init__(self, globs):
+        globs = list(globs or [])
+        names = [g for g in globs if '/' not in g]
+        paths = [g.strip('/') for g in globs if '/' in g]
+        self._names = re.compile("|".join(fnmatch.translate(g) for g in names)) if names else None
+        self._paths = re.compile("|".join(fnmatch.translate(g) for g in paths)) if paths else None
+        self.empty = not globs
+
+    def match(self, name: str, relpath: str) -> bool:
+        return bool((self._names and self._names.match(name))
+                    or (self._paths and self._paths.match(relpath)))
+
+
+def _scan_folder(folder: str, relfolder: str, scanner: MaskScanner, include: _Globs,
+                 exclude: _Globs, recursive: bool):
+    """One directory: (matches, subdirectories, errors)."""
+    matches, subdirs, errors = [], [], []
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                relpath = f"{relfolder}/{entry.name}" if relfolder else entry.name
+                try:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        if not exclude.match(entry.name, relpath):
+                            subdirs.append((entry.path, relpath))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                mask = scanner.match(entry.name)
+                if mask is None:
+                    continue
+                if not include.empty and not include.match(entry.name, relpath):
+                    continue
+                if exclude.match(entry.name, relpath):
+                    continue
+                try:
+                    matches.append((entry.path, mask, entry.stat()))
+                except OSError as e:
+                    errors.append((entry.path, str(e)))
+    except OSError as e:
+        errors.append((folder, str(e)))
+    return matches, subdirs, errors
+
+
+def scan_directory(source, scanner: MaskScanner, recursive: bool = False,
+                   include: list = None, exclude: list = None, workers: int = None,
+                   errors: list = None) -> list:
+    """
+    Matched files under `source` as (path, mask, os.stat_result), sorted by path.
+    Unreadable folders/files are skipped and appended to `errors` as (path, message).
+    """
+    source = os.fspath(source)
+    if not os.path.isdir(source):
+        raise FileNotFoundError(f"Source directory not found: {source}")
+    include, exclude = _Globs(include), _Globs(exclude)
+    errors = [] if errors is None else errors
+    matches = []
+
+    if not recursive:
+        found, _, failed = _scan_folder(source, '', scanner, include, exclude, False)
+        matches.extend(found)
+        errors.extend(failed)
+    else:
+        with ThreadPoolExecutor(max_workers=workers or SCAN_WORKERS,
+                                thread_name_prefix='mfi_scan') as pool:
+            pending = {pool.submit(_scan_folder, source, '', scanner, include, exclude, True)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, subdirs, failed = future.result()
+                    matches.extend(found)
+                    errors.extend(failed)
+                    pending.update(
+                        pool.submit(_scan_folder, path, rel, scanner, include, exclude, True)
+                        for path, rel in subdirs
+                    )
+
+    matches.sort(key=lambda m: m[0])
+    return matches
+
+
+# ---------------------------------------------------------------------------
+# Incremental discovery — persisted snapshot per scan scope
+# ---------------------------------------------------------------------------
+
+def scan_scope(source, masks: list, recursive: bool = False,
+               include: list = None, exclude: list = None, epoch: str = '') -> str:
+    """
+    Stable key for one scan configuration — a different mask set is a different snapshot.
+    epoch is the graph's FileNode load epoch: after a reload or wipe the old snapshot
+    no longer describes the graph, so a new epoch starts from an empty one.
+    """
+    parts = [os.path.abspath(os.fspath(source)), list(masks), bool(recursive),
+             sorted(include or []), sorted(exclude or [])]
+    if epoch:
+        parts.append(epoch)
+    key = json.dumps(parts)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _signature(stat) -> tuple:
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+class ScanManifest:
+    """path → (size, mtime_ns, file_id) per scope, in one SQLite file."""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or SCAN_DB
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_files (
+                scope    TEXT    NOT NULL,
+                path     TEXT    NOT NULL,
+                size     INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                file_id  INTEGER NOT NULL,
+                PRIMARY KEY (scope, path)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_scopes (
+                scope     TEXT PRIMARY KEY,
+                last_scan TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_staged (
+                result_id TEXT PRIMARY KEY,
+                scope     TEXT NOT NULL,
+                changed   TEXT NOT NULL,
+                removed   TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def has_snapshot(self, scope: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM scan_scopes WHERE scope = ?", (scope,)).fetchone() is not None
+
+    def diff(self, scope: str, found: list, errors: list = ()) -> tuple[list, list, list]:
+        """
+        Compare scan_directory() output with the stored snapshot.
+        Returns (added, modified, removed) — the first two as scan tuples, removed as paths.
+        Paths at or under an entry of scan_directory()'s `errors` are never reported
+        removed — an unreadable folder is not an empty one.
+        """
+        with self._lock:
+            previous = {path: (size, mtime_ns, file_id) for path, size, mtime_ns, file_id in
+                        self._conn.execute("SELECT path, size, mtime_ns, file_id "
+                                           "FROM scan_files WHERE scope = ?", (scope,))}
+        added, modified = [], []
+        for item in found:
+            path, _, stat = item
+            before = previous.pop(path, None)
+            if before is None:
+                added.append(item)
+            elif before != _signature(stat):
+                modified.append(item)
+        unreadable = tuple(path for path, _ in errors)
+        removed = [path for path in previous
+                   if not any(path == u or path.startswith(u.rstrip('/\\') + os.sep)
+                              for u in unreadable)]
+        return added, modified, sorted(removed)
+
+    def apply(self, scope: str, changed: list, removed: list):
+        """Record a diff — upsert changed scan tuples, drop removed paths."""
+        rows = [(path, *_signature(stat)) for path, _, stat in changed]
+        with self._lock, self._conn:
+            self._apply(scope, rows, removed)
+
+    def _apply(self, scope: str, rows, removed):
+        # caller holds the lock and the transaction
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO scan_files (scope, path, size, mtime_ns, file_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            ((scope, *row) for row in rows))
+        self._conn.executemany(
+            "DELETE FROM scan_files WHERE scope = ? AND path = ?",
+            ((scope, path) for path in removed))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO scan_scopes (scope, last_scan) VALUES (?, datetime('now'))",
+            (scope,))
+
+    def stage(self, result_id: str, scope: str, changed: list, removed: list):
+        """Hold a diff until the result `result_id` is confirmed processed — see commit()."""
+        rows = [(path, *_signature(stat)) for path, _, stat in changed]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scan_staged (result_id, scope, changed, removed) "
+                "VALUES (?, ?, ?, ?)",
+                (result_id, scope, json.dumps(rows), json.dumps(list(removed))))
+
+    def staged(self) -> list[str]:
+        """Result ids with a staged diff, oldest first."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT result_id FROM scan_staged ORDER BY rowid")]
+
+    def commit(self, result_id: str) -> bool:
+        """Fold a staged diff into its scope's snapshot. False if nothing was staged."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT scope, changed, removed FROM scan_staged WHERE result_id = ?",
+                (result_id,)).fetchone()
+            if row is None:
+                return False
+            scope, changed, removed = row
+            self._apply(scope, json.loads(changed), json.loads(removed))
+            self._conn.execute("DELETE FROM scan_staged WHERE result_id = ?", (result_id,))
+            return True
+
+    def discard(self, result_id: str):
+        """Drop a staged diff — its files are reported again by the next scan."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scan_staged WHERE result_id = ?", (result_id,))
+
+    def reset(self, scope: str):
+        """Forget a scope — the next incremental scan reports every file as added."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scan_files WHERE scope = ?", (scope,))
+            self._conn.execute("DELETE FROM scan_scopes WHERE scope = ?", (scope,))
+            self._conn.execute("DELETE FROM scan_staged WHERE scope = ?", (scope,))
+
+    def close(self):
+        self._conn.close()
@@ -2,12 +2,13 @@
 mfi_service.py — Meta File Instruction messaging layer.
 
 Shared by both the Flask/container side and the Windows host scripts.
-Zero framework dependencies — stdlib and yaml only.
+Zero framework dependencies — stdlib and yaml only (msgpack if installed).
 
 Folder convention (set via MFI_PATH environment variable):
     pending/      UI out-box,     Windows in-box
     processing/   atomic lock,    work in progress
     completed/    Windows out-box, UI in-box
+    processed/    consumed results, archived by the UI side — never rescanned
 
 File convention:
     *.mft  — being written, ignored by both sides
@@ -17,11 +18,14 @@ Filename prefix determines action type:
     discovery_YYYYMMDD_NNN.mfi
     move_YYYYMMDD_NNN.mfi
     archive_YYYYMMDD_NNN.mfi
+    batch_YYYYMMDD_NNN.mfi       many copy/move items, one batch_result back
 """
 
 import os
 import re
+import json
 import yaml
+import threading
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
@@ -53,6 +57,9 @@ def processing_path() -> Path:
 def completed_path() -> Path:
     return get_mfi_root() / 'completed'
 
+def processed_path() -> Path:
+    return get_mfi_root() / 'processed'
+
 
 # ---------------------------------------------------------------------------
 # Base and action-specific dataclasses — data only, no logic
@@ -74,6 +81,11 @@ class DiscoveryMFI(MFIBase):
     mfn_id:   str = ""
     source:   str = ""
     patterns: list = field(default_factory=list)  # e.g. ['busCard', 'BusCard', 'busCardish']
+    recursive: bool = False                        # walk subfolders too
+    include:  list = field(default_factory=list)   # fnmatch globs, e.g. ['*.pdf', '2024/*']
+    exclude:  list = field(default_factory=list)   # fnmatch globs — also prune folders
+    incremental: bool = False                      # opt-in: only files changed since the last scan
+    epoch:    str = ""                             # FileNode load epoch — a reload starts a fresh snapshot
     
 @dataclass
 class DiscoveryResultMFI(MFIBase):
@@ -82,7 +94,9 @@ class DiscoveryResultMFI(MFIBase):
     source_mfi_id: str = ""
     mfn_id:        str = ""
     files:         list = field(default_factory=list)
-    # each file: {filepath, date, mask_matched, descriptor}
+    # each file: {filepath, date, mask_matched, descriptor, change}
+    removed:       list = field(default_factory=list)  # filepaths gone since the last scan
+    incremental:   bool = False                        # files holds only added/modified entries
 
 @dataclass
 class CopyMFI(MFIBase):
@@ -128,6 +142,23 @@ class MoveResultMFI(MFIBase):
     success:       bool = False
     error:         str = ""
     
+@dataclass
+class BatchMFI(MFIBase):
+    """Many copy/move instructions in one file — executed in order, one result file."""
+    action:   str = "batch"
+    mfn_id:   str = ""
+    items:    list = field(default_factory=list)
+    # each item: {item_id, action: 'copy'|'move', source, target, node_id, mfn_id, intent}
+
+@dataclass
+class BatchResultMFI(MFIBase):
+    """Per-item outcomes of a BatchMFI, in item order."""
+    action:        str = "batch_result"
+    source_mfi_id: str = ""
+    mfn_id:        str = ""
+    results:       list = field(default_factory=list)
+    # each result: {item_id, action, node_id, source, target, intent, success, error}
+
 # ---------------------------------------------------------------------------
 # Registry — prefix to class mapping, extend here for new action types
 # ---------------------------------------------------------------------------
@@ -139,6 +170,8 @@ ACTION_REGISTRY = {
     'move_result':           MoveResultMFI,
     'copy':                  CopyMFI,
     'copy_result':           CopyResultMFI,
+    'batch':                 BatchMFI,
+    'batch_result':          BatchResultMFI,
 }    
 
 # ---------------------------------------------------------------------------
@@ -154,37 +187,197 @@ def generate_mfi_id(action: str) -> str:
     timestamp = datetime.now().strftime("%Y_%m%d_%H%M%S_%f")
     return f"{action}_{timestamp}"
 
+# ---------------------------------------------------------------------------
+# Codecs — the wire format of an .mfi body
+# ---------------------------------------------------------------------------
+#
+# New files are written with MFI_CODEC (default json). Readers sniff the first
+# byte, so every side reads every format and old YAML files stay readable:
+#     {          → json     (also valid YAML — an older YAML-only reader copes)
+#     0x80-0x8f, 0xde, 0xdf (msgpack map) → msgpack
+#     anything else → yaml, through libyaml's CSafeLoader when available
+# msgpack is optional — without the package, MFI_CODEC=msgpack falls back to json.
+
+MFI_CODEC = os.environ.get('MFI_CODEC', 'json').lower()
+
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YamlDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _json_encode(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _json_decode(raw: bytes) -> dict:
+    return json.loads(raw)
+
+def _yaml_encode(data: dict) -> bytes:
+    return yaml.dump(data, Dumper=_YamlDumper, default_flow_style=False,
+                     allow_unicode=True).encode('utf-8')
+
+def _yaml_decode(raw: bytes) -> dict:
+    return yaml.load(raw, Loader=_YamlLoader)
+
+def _msgpack_encode(data: dict) -> bytes:
+    return msgpack.packb(data, use_bin_type=True)
+
+def _msgpack_decode(raw: bytes) -> dict:
+    return msgpack.unpackb(raw, raw=False)
+
+
+# name → (encode, decode)
+CODECS = {
+    'json': (_json_encode, _json_decode),
+    'yaml': (_yaml_encode, _yaml_decode),
+}
+if msgpack is not None:
+    CODECS['msgpack'] = (_msgpack_encode, _msgpack_decode)
+
+
+def sniff_codec(raw: bytes) -> str:
+    """Codec name for an .mfi body, from its first byte."""
+    first = raw[:1]
+    if first and (0x80 <= first[0] <= 0x8f or first[0] in (0xde, 0xdf)):
+        return 'msgpack'
+    if raw.lstrip()[:1] == b'{':
+        return 'json'
+    return 'yaml'
+
+
+def _codec(name: str = None) -> str:
+    name = name or MFI_CODEC
+    if name not in CODECS:
+        print(f"[mfi_shared] codec '{name}' unavailable — writing json")
+        return 'json'
+    return name
+
 # ---------------------------------------------------------------------------
 # Encode / decode — outside the classes, operate on them
 # ---------------------------------------------------------------------------
 
-def encode(mfi: MFIBase) -> str:
-    """Serialize an MFI dataclass to a YAML string."""
-    return yaml.dump(asdict(mfi), default_flow_style=False, allow_unicode=True)
+def encode(mfi: MFIBase, codec: str = None) -> bytes:
+    """Serialize an MFI dataclass with `codec` (default MFI_CODEC)."""
+    return CODECS[_codec(codec)][0](asdict(mfi))
 
 
-def decode(filepath: str) -> MFIBase:
+def load_body(raw: bytes) -> dict:
+    """Deserialize an .mfi body in whichever format it was written."""
+    codec = sniff_codec(raw)
+    if codec not in CODECS:
+        raise ValueError(f"MFI is {codec}-encoded but the {codec} package is not installed")
+    try:
+        return CODECS[codec][1](raw)
+    except ValueError:
+        if codec != 'json':
+            raise
+        return _yaml_decode(raw)        # a YAML flow mapping that merely looks like JSON
+
+
+def peek_action(filepath) -> str:
     """
-    Read an .mfi file and deserialize to the appropriate MFI dataclass.
-    Routes by filename prefix via ACTION_REGISTRY.
+    Action name from an MFI filename alone — the file is never opened.
+    e.g. copy_result_2026_0316_101500_123456.mfi → 'copy_result'
     """
-    p = Path(filepath)
     # Strip the timestamp suffix — everything before _YYYY is the action name
-    stem = p.stem
+    stem = Path(filepath).stem
     # Find where the date starts: _YYYY pattern
     match = re.search(r'_\d{4}_', stem)
-    action = stem[:match.start()].lower() if match else stem.lower()
+    return stem[:match.start()].lower() if match else stem.lower()
+
+
+def decode(filepath: str) -> MFIBase:
+    """
+    Read an .mfi file and deserialize to the appropriate MFI dataclass.
+    Routes by filename prefix via ACTION_REGISTRY; the body format is sniffed.
+    """
+    p = Path(filepath)
+    action = peek_action(p)
 
     cls = ACTION_REGISTRY.get(action)
     if not cls:
         raise ValueError(f"Unknown MFI action '{action}' in file: {filepath}")
 
-    with open(p, 'r') as f:
-        data = yaml.safe_load(f)
+    data = load_body(p.read_bytes())
 
     return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
 
+def classify(paths) -> dict[str, list[Path]]:
+    """
+    Group MFI paths by action from their filenames alone — nothing is opened.
+    {'copy_result': [...], 'scan_directory_result': [...], ...}, each list sorted.
+    """
+    groups = {}
+    for path in sorted(Path(p) for p in paths):
+        groups.setdefault(peek_action(path), []).append(path)
+    return groups
+
+
+def list_mfi(folder: Path) -> list[Path]:
+    """Every .mfi in `folder`, sorted — one scandir, no stat per file."""
+    try:
+        with os.scandir(folder) as it:
+            return sorted(Path(e.path) for e in it if e.name.endswith('.mfi'))
+    except FileNotFoundError:
+        return []
+
+
+class ClaimIndex:
+    """
+    mfi_ids a consumer in this process has claimed, plus every id already
+    archived in processed/ — so the broker thread and request-driven sweeps
+    never handle the same completed/ file twice, and a result whose id was
+    already archived is recognised as a duplicate without being opened.
+
+    The processed/ listing is read once, lazily; move_to_processed keeps it
+    current afterwards (nothing else writes processed/).
+    """
+
+    def __init__(self):
+        self._lock      = threading.Lock()
+        self._claimed   = set()
+        self._processed = None
+
+    def _archived(self) -> set:
+        if self._processed is None:
+            self._processed = {p.stem for p in list_mfi(processed_path())}
+        return self._processed
+
+    def claim(self, path) -> bool:
+        """True if the caller now owns `path`; False if claimed or already processed."""
+        mfi_id = Path(path).stem
+        with self._lock:
+            if mfi_id in self._claimed or mfi_id in self._archived():
+                return False
+            self._claimed.add(mfi_id)
+            return True
+
+    def release(self, path):
+        with self._lock:
+            self._claimed.discard(Path(path).stem)
+
+    def archived(self, path):
+        with self._lock:
+            if self._processed is not None:
+                self._processed.add(Path(path).stem)
+
+    def is_processed(self, path) -> bool:
+        with self._lock:
+            return Path(path).stem in self._archived()
+
+    def reset(self):
+        """Forget the processed/ listing — the next call re-reads it."""
+        with self._lock:
+            self._processed = None
+
+
+claims = ClaimIndex()
+
+
 # ---------------------------------------------------------------------------
 # File operations — atomic write, folder transitions
 # ---------------------------------------------------------------------------
@@ -208,7 +401,7 @@ def write_mfi(mfi: MFIBase, folder: Optional[Path] = None) -> Path:
     tmp_path  = folder / f"{mfi.mfi_id}.mft"
     final_path = folder / f"{mfi.mfi_id}.mfi"
 
-    tmp_path.write_text(encode(mfi), encoding='utf-8')
+    tmp_path.write_bytes(encode(mfi))
     tmp_path.rename(final_path)  # atomic on same filesystem
 
     return final_path
@@ -216,10 +409,7 @@ def write_mfi(mfi: MFIBase, folder: Optional[Path] = None) -> Path:
 
 def read_pending() -> list[Path]:
     """Return all .mfi files in pending/, oldest first. Ignores .mft."""
-    folder = pending_path()
-    if not folder.exists():
-        return []
-    return sorted(folder.glob('*.mfi'))
+    return list_mfi(pending_path())
 
 
 def move_to_processing(filepath: Path) -> Path:
@@ -238,6 +428,15 @@ def move_to_completed(filepath: Path) -> Path:
     return dest
 
 
+def move_to_processed(filepath: Path) -> Path:
+    """Archive a consumed result .mfi in processed/ so completed/ only holds new work."""
+    dest = processed_path() / filepath.name
+    processed_path().mkdir(parents=True, exist_ok=True)
+    filepath.rename(dest)
+    claims.archived(dest)
+    return dest
+
+
 def mark_failed(filepath: Path) -> Path:
     """Rename file with .failed extension in processing/ for inspection."""
     dest = filepath.with_suffix('.failed')
@@ -90,14 +90,25 @@ export function initContentTabs() {
         e.preventDefault();
         const formData = new FormData(e.target);
         const mfnId = document.getElementById('mfnSelect').value;
-        const response = await fetch(`/filenode/query/review_filenode`, {
-            method: 'POST',
-            body: formData
-        });
-        const data = await response.json();
         const rootpath = document.querySelector('#filenodeForm input[name="node_path"]')?.value || '';
+        // Keyset paging — render the first page; later pages load on demand
+        formData.set('limit', SEARCH_PAGE_SIZE);
+        const data = await fetchSearchPage(formData);
         updateReviewForm(data, rootpath)
         updateUpdateForms(data, rootpath)
+        searchPage = { formData, rootpath, shown: data.filter(isFnodeItem).length, after: null };
+        setNextCursor(data[0]?.next_cursor);
+    });
+
+    // List view "Load more" — next page after the cursor of the last one
+    document.getElementById('load-more')?.addEventListener('click', async (e) => {
+        if (!searchPage?.after) return;
+        e.target.disabled = true;
+        searchPage.formData.set('after', searchPage.after);
+        const data = await fetchSearchPage(searchPage.formData);
+        searchPage.shown += appendResultsPage(data, searchPage.rootpath, searchPage.shown);
+        setNextCursor(data[0]?.next_cursor);
+        e.target.disabled = false;
     });
 
     document.getElementById('mfnSelect')?.addEventListener('change', function() {
@@ -738,6 +749,43 @@ function createSubTab(record, cnt) {
     return btn
 }
 
+const SEARCH_PAGE_SIZE = 200;
+// Current search: form, root path, records shown and the next page cursor
+let searchPage = null;
+
+async function fetchSearchPage(formData) {
+    const prefix = mfn?.route_prefix || 'buscard';
+    const response = await fetch(`/${prefix}/query/review_filenode`, {
+        method: 'POST',
+        body: formData
+    });
+    return response.json();
+}
+
+function setNextCursor(cursor) {
+    searchPage.after = cursor || null;
+    const loadMore = document.getElementById('load-more');
+    if (loadMore) loadMore.hidden = !searchPage.after;
+}
+
+function isFnodeItem(item) {
+    return !item.debug_query && !item.meta_file_node;
+}
+
+// Later search pages — add list rows and update panels after the first page
+function appendResultsPage(data, rootpath, offset) {
+    const fnodes = data.filter(isFnodeItem);
+    const tableBody = document.querySelector('.list #search-path-rows');
+    const tabContainer = document.getElementById('update-pane');
+    const recordTabs = tabContainer.querySelector('.sub-tabs');
+    fnodes.forEach((fnode, i) => {
+        tableBody.appendChild(createRow(fnode['fnode'], rootpath));
+        recordTabs?.appendChild(createSubTab(fnode['fnode'], offset + i + 1));
+        tabContainer.appendChild(createRecordPanel(fnode['fnode'], rootpath, offset + i + 1, mfn));
+    });
+    return fnodes.length;
+}
+
 function updateUpdateForms(data, rootpath) {
     let debugQuery = null;
     const fnodes = [];
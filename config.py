@@ -5,4 +5,11 @@ class Config:
     NEO4J_URI = os.getenv('NEO4J_URI', 'bolt://mybrain-neo4j:7687')
     NEO4J_USER = os.getenv('NEO4J_USER', 'neo4j')
     NEO4J_PASSWORD = os.getenv('NEO4J_PASSWORD', 'tester11')
+    # Driver connection pool — size for concurrent requests + broker + bots
+    NEO4J_MAX_POOL_SIZE = int(os.getenv('NEO4J_MAX_POOL_SIZE', 100))
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv('NEO4J_CONNECTION_ACQUISITION_TIMEOUT', 60))
+    # connections idle longer than this are pinged before reuse; unset = never
+    NEO4J_LIVENESS_CHECK_TIMEOUT = (float(os.environ['NEO4J_LIVENESS_CHECK_TIMEOUT'])
+                                    if os.environ.get('NEO4J_LIVENESS_CHECK_TIMEOUT') else None)
+    NEO4J_FETCH_SIZE = int(os.getenv('NEO4J_FETCH_SIZE', 1000))
     # Add other configuration settings here
\ No newline at end of file
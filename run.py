@@ -6,6 +6,19 @@ app = create_app()
 with app.app_context():
     import app.models as models
     models.neo4j.init_app(app)
+    # Search/export indexes and label backfills — skipped once marked ready in the graph
+    from app.services.neo4j_service import bootstrap_filenode_schema
+    try:
+        with models.neo4j.get_session() as session:
+            bootstrap_filenode_schema(session)
+    except Exception as e:
+        print(f"[neo4j] schema bootstrap skipped: {e}")
+    # Warm the /bots/execute dispatch table — it builds lazily if Neo4j is not up yet
+    from app.services.bot_dispatch import bot_table
+    try:
+        bot_table.load()
+    except Exception as e:
+        print(f"[bot_dispatch] table not built at startup: {e}")
     
 if __name__ == '__main__':
     # Enable debug mode so the auto-reloader restarts the server on code changes
@@ -0,0 +1,93 @@
+# tests/test_bot_dispatch.py — execute_batch ordering and read-only transactions
+
+import pytest
+
+from app.services import bot_dispatch
+from app.services.bot_dispatch import BotDispatchTable, execute_batch
+
+BOTS = [
+    {'bot_id': 'vera.notes.add',  'module': 'm', 'function': 'add',  'read_only': False},
+    {'bot_id': 'vera.notes.list', 'module': 'm', 'function': 'list', 'read_only': True},
+    {'bot_id': 'vera.notes.echo', 'module': 'm', 'function': 'echo', 'read_only': True},
+]
+
+
+class FakeSession:
+    """Records what each bot was handed: the session itself or a read tx."""
+
+    def __init__(self, notes):
+        self.notes = notes
+        self.reads = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_read(self, work):
+        self.reads += 1
+        return work(('tx', self))
+
+
+@pytest.fixture
+def table(monkeypatch):
+    notes = []
+
+    def add(text, session):
+        assert session is fake
+        notes.append(text)
+        return len(notes)
+
+    def list_(session):
+        assert session == ('tx', fake)
+        return list(notes)
+
+    def echo(value):                    # no session parameter
+        return value
+
+    funcs = {'add': add, 'list': list_, 'echo': echo}
+    fake = FakeSession(notes)
+    monkeypatch.setattr(bot_dispatch, 'get_session', lambda: fake)
+    t = BotDispatchTable(loader=lambda bot_id=None: [b for b in BOTS if bot_id in (None, b['bot_id'])],
+                         versioner=lambda: '1')
+    t._import = lambda bot_id, module, function: funcs[function]
+    t.session = fake
+    return t
+
+
+def test_calls_run_in_request_order(table):
+    outcomes = execute_batch([
+        {'bot_id': 'vera.notes.add',  'params': {'text': 'a'}},
+        {'bot_id': 'vera.notes.list'},
+        {'bot_id': 'vera.notes.add',  'params': {'text': 'b'}},
+        {'bot_id': 'vera.notes.list'},
+    ], table)
+    assert [o['result'] for o in outcomes] == [1, ['a'], 2, ['a', 'b']]
+    assert table.session.reads == 2
+
+
+def test_failures_keep_their_slot(table):
+    outcomes = execute_batch([
+        {'bot_id': 'vera.notes.echo', 'params': {'value': 1}},
+        {'bot_id': 'nobody.home'},
+        {'params': {}},
+        {'bot_id': 'vera.notes.echo', 'params': {'wrong': 1}},
+        {'bot_id': 'vera.notes.echo', 'params': {'value': 2}},
+    ], table)
+    assert [o.get('status') for o in outcomes] == [None, 404, 400, 400, None]
+    assert outcomes[0]['result'] == 1 and outcomes[4]['result'] == 2
+
+
+def test_caller_cannot_pass_session_or_persona(table):
+    outcomes = execute_batch([
+        {'bot_id': 'vera.notes.add', 'params': {'text': 'a', 'session': 'x', 'persona': 'vera'}},
+    ], table)
+    assert outcomes == [{'bot_id': 'vera.notes.add', 'ok': True, 'result': 1}]
+
+
+def test_unknown_bot_is_not_read_only(table):
+    table.load()
+    assert table.is_read_only('vera.notes.list')
+    assert not table.is_read_only('vera.notes.add')
+    assert not table.is_read_only('nobody.home')
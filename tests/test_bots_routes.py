@@ -0,0 +1,47 @@
+# tests/test_bots_routes.py — /bots/list conditional GET against the registry version
+
+import pytest
+from flask import Flask
+
+from app.routes import bots_routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    loads = []
+    monkeypatch.setattr(bots_routes, 'get_bot_registry_version', lambda: 'abc-3')
+    monkeypatch.setattr(bots_routes, 'load_bot_registry',
+                        lambda reason='': loads.append(reason) or {'status': 'ok', 'bots': []})
+    app = Flask(__name__)
+    app.register_blueprint(bots_routes.bots_bp)
+    client = app.test_client()
+    client.loads = loads
+    return client
+
+
+def test_list_bots_sends_version_etag(client):
+    resp = client.get('/bots/list')
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] == '"bots-abc-3"'
+    assert resp.get_json()['version'] == 'abc-3'
+    assert len(client.loads) == 1
+
+
+def test_list_bots_304_when_unchanged(client):
+    resp = client.get('/bots/list', headers={'If-None-Match': '"bots-abc-3"'})
+    assert resp.status_code == 304
+    assert resp.headers['ETag'] == '"bots-abc-3"'
+    assert client.loads == []          # registry never queried
+
+
+def test_list_bots_200_when_version_moved(client):
+    resp = client.get('/bots/list', headers={'If-None-Match': '"bots-abc-2"'})
+    assert resp.status_code == 200
+    assert len(client.loads) == 1
+
+
+def test_registry_version_etag_matches_list(client):
+    version = client.get('/bots/registry/version')
+    listing = client.get('/bots/list')
+    assert version.get_json() == {'version': 'abc-3'}
+    assert version.headers['ETag'] == listing.headers['ETag']
@@ -0,0 +1,49 @@
+# tests/test_export_versioning.py — versioned export names
+
+import threading
+
+from app.services.export_service import _claim_versioned, _next_versioned
+
+
+def test_next_versioned_starts_at_001(tmp_path):
+    assert _next_versioned(tmp_path, 'gfn').name == 'gfn_001.yaml'
+
+
+def test_next_versioned_follows_highest(tmp_path):
+    for name in ('gfn_001.yaml', 'gfn_007.yaml', 'gfn_1000.yaml', 'gfn.yaml', 'gfn_x.yaml'):
+        (tmp_path / name).touch()
+    assert _next_versioned(tmp_path, 'gfn').name == 'gfn_1001.yaml'
+
+
+def test_next_versioned_ignores_other_prefixes(tmp_path):
+    (tmp_path / 'gfn_005.yaml').touch()
+    (tmp_path / 'gfn_delta_009.yaml').touch()
+    assert _next_versioned(tmp_path, 'gfn').name == 'gfn_006.yaml'
+    assert _next_versioned(tmp_path, 'gfn_delta').name == 'gfn_delta_010.yaml'
+
+
+def test_claim_versioned_moves_tmp(tmp_path):
+    tmp = tmp_path / 'export.tmp'
+    tmp.write_text('records')
+    versioned = _claim_versioned(tmp_path, 'gfn', tmp)
+    assert versioned.name == 'gfn_001.yaml'
+    assert versioned.read_text() == 'records'
+    assert not tmp.exists()
+
+
+def test_concurrent_claims_get_distinct_names(tmp_path):
+    claimed, start = [], threading.Barrier(8)
+
+    def export(n):
+        tmp = tmp_path / f"export_{n}.tmp"
+        tmp.write_text(str(n))
+        start.wait()
+        claimed.append(_claim_versioned(tmp_path, 'gfn', tmp))
+
+    threads = [threading.Thread(target=export, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(p.name for p in claimed) == [f"gfn_{n:03d}.yaml" for n in range(1, 9)]
+    assert sorted(p.read_text() for p in claimed) == [str(n) for n in range(8)]
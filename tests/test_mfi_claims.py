@@ -0,0 +1,69 @@
+# tests/test_mfi_claims.py — classify() and ClaimIndex over a temp MFI_PATH
+
+from pathlib import Path
+
+import pytest
+
+from app.shared.mfi_shared import ClaimIndex, classify
+
+
+@pytest.fixture
+def processed(tmp_path, monkeypatch):
+    monkeypatch.setenv('MFI_PATH', str(tmp_path))
+    folder = tmp_path / 'processed'
+    folder.mkdir()
+    return folder
+
+
+def test_classify_groups_by_action_sorted():
+    groups = classify([
+        'completed/scan_directory_result_2026_0316_101500_000002.mfi',
+        'completed/copy_result_2026_0316_101500_000009.mfi',
+        'completed/copy_result_2026_0316_101500_000001.mfi',
+    ])
+    assert sorted(groups) == ['copy_result', 'scan_directory_result']
+    assert [p.name for p in groups['copy_result']] == [
+        'copy_result_2026_0316_101500_000001.mfi',
+        'copy_result_2026_0316_101500_000009.mfi',
+    ]
+    assert all(isinstance(p, Path) for p in groups['scan_directory_result'])
+
+
+def test_classify_empty():
+    assert classify([]) == {}
+
+
+def test_claim_is_exclusive_until_released(processed):
+    claims = ClaimIndex()
+    path = 'completed/copy_result_2026_0316_101500_000001.mfi'
+    assert claims.claim(path)
+    assert not claims.claim(path)
+    claims.release(path)
+    assert claims.claim(path)
+
+
+def test_already_processed_is_never_claimed(processed):
+    (processed / 'copy_result_2026_0316_101500_000001.mfi').touch()
+    claims = ClaimIndex()
+    assert claims.is_processed('completed/copy_result_2026_0316_101500_000001.mfi')
+    assert not claims.claim('completed/copy_result_2026_0316_101500_000001.mfi')
+    assert claims.claim('completed/copy_result_2026_0316_101500_000002.mfi')
+
+
+def test_archived_keeps_listing_current(processed):
+    claims = ClaimIndex()
+    path = 'completed/copy_result_2026_0316_101500_000001.mfi'
+    assert claims.claim(path)            # listing read here, processed/ empty
+    claims.release(path)
+    claims.archived(processed / Path(path).name)
+    assert not claims.claim(path)
+
+
+def test_reset_rereads_processed(processed):
+    claims = ClaimIndex()
+    path = 'completed/copy_result_2026_0316_101500_000001.mfi'
+    assert not claims.is_processed(path)
+    (processed / Path(path).name).touch()
+    assert not claims.is_processed(path)  # listing is cached
+    claims.reset()
+    assert claims.is_processed(path)
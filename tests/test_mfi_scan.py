@@ -0,0 +1,106 @@
+# tests/test_mfi_scan.py — ScanManifest diff / apply / stage / commit
+
+import os
+
+import pytest
+
+from app.shared.mfi_scan import MaskScanner, ScanManifest, scan_directory, scan_scope
+
+MASKS = ['busCard']
+
+
+def _scan(source):
+    return scan_directory(source, MaskScanner(MASKS))
+
+
+@pytest.fixture
+def source(tmp_path):
+    folder = tmp_path / 'src'
+    folder.mkdir()
+    for name in ('a-busCard.pdf', 'b-busCard.pdf', 'notes.txt'):
+        (folder / name).write_text(name)
+    return folder
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    m = ScanManifest(str(tmp_path / 'scan.db'))
+    yield m
+    m.close()
+
+
+def _names(items):
+    return sorted(os.path.basename(i if isinstance(i, str) else i[0]) for i in items)
+
+
+def test_first_scan_reports_everything_added(source, manifest):
+    scope = scan_scope(source, MASKS)
+    assert not manifest.has_snapshot(scope)
+    added, modified, removed = manifest.diff(scope, _scan(source))
+    assert _names(added) == ['a-busCard.pdf', 'b-busCard.pdf']
+    assert modified == [] and removed == []
+
+
+def test_apply_then_diff_reports_only_changes(source, manifest):
+    scope = scan_scope(source, MASKS)
+    added, _, _ = manifest.diff(scope, _scan(source))
+    manifest.apply(scope, added, [])
+    assert manifest.has_snapshot(scope)
+    assert manifest.diff(scope, _scan(source)) == ([], [], [])
+
+    (source / 'a-busCard.pdf').write_text('longer content now')
+    (source / 'b-busCard.pdf').unlink()
+    (source / 'c-busCard.pdf').write_text('c')
+    added, modified, removed = manifest.diff(scope, _scan(source))
+    assert _names(added) == ['c-busCard.pdf']
+    assert _names(modified) == ['a-busCard.pdf']
+    assert _names(removed) == ['b-busCard.pdf']
+
+    manifest.apply(scope, added + modified, removed)
+    assert manifest.diff(scope, _scan(source)) == ([], [], [])
+
+
+def test_unreadable_folder_is_not_removed(source, manifest):
+    scope = scan_scope(source, MASKS)
+    manifest.apply(scope, _scan(source), [])
+    _, _, removed = manifest.diff(scope, [], errors=[(str(source), 'Permission denied')])
+    assert removed == []
+
+
+def test_scopes_are_separate(source, manifest):
+    scope = scan_scope(source, MASKS)
+    manifest.apply(scope, _scan(source), [])
+    other = scan_scope(source, MASKS, epoch='reload-2')
+    assert other != scope
+    assert _names(manifest.diff(other, _scan(source))[0]) == ['a-busCard.pdf', 'b-busCard.pdf']
+
+
+def test_staged_diff_counts_only_after_commit(source, manifest):
+    scope = scan_scope(source, MASKS)
+    added, _, _ = manifest.diff(scope, _scan(source))
+    manifest.stage('scan_directory_result_1', scope, added, [])
+    assert manifest.staged() == ['scan_directory_result_1']
+    assert len(manifest.diff(scope, _scan(source))[0]) == 2   # not yet confirmed
+
+    assert manifest.commit('scan_directory_result_1')
+    assert manifest.staged() == []
+    assert manifest.diff(scope, _scan(source)) == ([], [], [])
+    assert not manifest.commit('scan_directory_result_1')
+
+
+def test_discarded_diff_is_reported_again(source, manifest):
+    scope = scan_scope(source, MASKS)
+    added, _, _ = manifest.diff(scope, _scan(source))
+    manifest.stage('scan_directory_result_1', scope, added, [])
+    manifest.discard('scan_directory_result_1')
+    assert manifest.staged() == []
+    assert len(manifest.diff(scope, _scan(source))[0]) == 2
+
+
+def test_reset_forgets_scope(source, manifest):
+    scope = scan_scope(source, MASKS)
+    manifest.apply(scope, _scan(source), [])
+    manifest.stage('scan_directory_result_1', scope, [], [])
+    manifest.reset(scope)
+    assert not manifest.has_snapshot(scope)
+    assert manifest.staged() == []